@@ -0,0 +1,126 @@
+"""
+End-to-end timings for ZKEngine across the same input-count matrix as the
+zk_bridge criterion suite (zk_bridge/benches/groth16.rs), including the Python
+marshalling, VK registry and verifier-cache overhead the Rust benches skip.
+
+    python bench_zk_engine.py --save-baseline main
+    python bench_zk_engine.py --baseline main
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import statistics
+
+INPUT_COUNTS = [2, 4, 8, 16, 32, 64, 128, 256, 512, 1024]
+BATCH_SIZE = 16
+BASELINE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".benchmarks")
+
+
+def timed(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples), result
+
+
+def run_matrix(input_counts, depths, repeat):
+    # Cold setup is only measurable against an empty key directory.
+    os.environ["ZK_COMPOSE_KEY_DIR"] = tempfile.mkdtemp(prefix="zk_bench_keys_")
+
+    import zk_bridge
+    from zk_compose.zk_logic.zk_engine import ZKEngine, VerificationContext
+
+    # Every repeat must run the prover and the pairing check, not return the
+    # first sample's cached proof or verdict.
+    ZKEngine.RESULT_CACHE_SIZE = 0
+    ZKEngine.MAX_VERIFIED_RESULTS = 0
+
+    results = {}
+    for depth in depths:
+        for n in input_counts:
+            base_proofs = [os.urandom(256) for _ in range(n)]
+            subnet_ids = [i % 32 for i in range(n)]
+            key = f"n{n}_d{depth}"
+            print(f"--- {key} ---")
+
+            bucket = zk_bridge.circuit_bucket(n)
+            setup_time, _ = timed(lambda: zk_bridge.export_verifying_key(bucket, depth), 1)
+            prove_time, (proof, _) = timed(
+                lambda: ZKEngine.prove_composition(base_proofs, subnet_ids, depth), repeat
+            )
+            verify_time, (is_valid, msg) = timed(
+                lambda: ZKEngine.verify_composition(proof, base_proofs, subnet_ids, depth), repeat
+            )
+
+            # Identical proofs would be checked once, so the batch holds distinct proofs of
+            # distinct tasks in one bucket, each with its own public inputs.
+            tasks = [base_proofs] + [[os.urandom(256) for _ in range(n)] for _ in range(BATCH_SIZE - 1)]
+            proofs = [ZKEngine.prove_composition(task, subnet_ids, depth)[0] for task in tasks]
+            inputs = [ZKEngine._extract_linkage(task, subnet_ids) for task in tasks]
+            verifier = VerificationContext(base_proofs, subnet_ids, depth).verifier
+            batch_time, batch_valid = timed(lambda: verifier.verify_batch(proofs, inputs), repeat)
+
+            results[key] = {
+                "setup_s": setup_time,
+                "prove_s": prove_time,
+                "verify_s": verify_time,
+                f"batch_verify_{BATCH_SIZE}_s": batch_time,
+                "proof_bytes": len(proof),
+            }
+            print(json.dumps(results[key], indent=2))
+            if not is_valid:
+                print(f"warning: {key} did not verify ({msg})")
+            if not all(batch_valid):
+                print(f"warning: {key} batch did not verify ({batch_valid.count(False)} invalid)")
+    return results
+
+
+def compare(results, baseline, threshold):
+    regressions = 0
+    for key, metrics in results.items():
+        for metric, value in metrics.items():
+            old = baseline.get(key, {}).get(metric)
+            if not old:
+                continue
+            change = (value - old) / old
+            flag = ""
+            if change > threshold:
+                flag = "  REGRESSION"
+                regressions += 1
+            print(f"{key:>12} {metric:<22} {old:>12.6g} -> {value:<12.6g} {change:+.1%}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--inputs", type=int, nargs="+", default=INPUT_COUNTS)
+    parser.add_argument("--depths", type=int, nargs="+", default=[1])
+    parser.add_argument("--repeat", type=int, default=5, help="Samples per timing (the median is kept).")
+    parser.add_argument("--save-baseline", metavar="NAME", help="Write results to .benchmarks/NAME.json.")
+    parser.add_argument("--baseline", metavar="NAME", help="Compare against .benchmarks/NAME.json.")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Relative slowdown reported as a regression.")
+    args = parser.parse_args()
+
+    results = run_matrix(args.inputs, args.depths, args.repeat)
+
+    if args.save_baseline:
+        os.makedirs(BASELINE_DIR, exist_ok=True)
+        path = os.path.join(BASELINE_DIR, f"{args.save_baseline}.json")
+        with open(path, "w") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+        print(f"Saved baseline to {path}")
+
+    if args.baseline:
+        with open(os.path.join(BASELINE_DIR, f"{args.baseline}.json")) as f:
+            baseline = json.load(f)
+        if compare(results, baseline, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -26,6 +26,8 @@ import zk_compose
 
 # import base miner class which takes care of most of the boilerplate
 from zk_compose.base.miner import BaseMinerNeuron
+from zk_compose.miner import AdmissionController, AdmissionRejected, edf_priority, request_deadline
+from zk_compose.zk_logic.zk_engine import ZKEngine
 
 
 class Miner(BaseMinerNeuron):
@@ -48,17 +50,28 @@ class Miner(BaseMinerNeuron):
         """
         Processes the 'ZKCompose' synapse by performing production-grade recursive ZK aggregation.
         """
-        from zk_compose.zk_logic.zk_engine import ZKEngine
-        
         bt.logging.info(f"Received {len(synapse.base_proofs)} proofs for aggregation. Depth={synapse.recursion_depth}")
-        
+
+        if synapse.recursion_depth > ZKEngine.max_depth():
+            # Every depth has its own keys; refuse before hashing or taking an admission slot.
+            bt.logging.warning(f"Rejecting depth {synapse.recursion_depth}: above {ZKEngine.max_depth()}")
+            synapse.aggregated_proof = b"error" if isinstance(synapse.base_proofs[0], bytes) else "error"
+            return synapse
+
+        base_subnet_ids = synapse.base_subnet_ids or [1] * len(synapse.base_proofs)
+        key = await self.prover.key_for(synapse.base_proofs, base_subnet_ids, synapse.recursion_depth)
+        deadline = self._deadline(synapse)
+        stake = self._caller_stake(synapse)
+
         try:
-            # Execute native recursive proving (O(n * depth) complexity)
-            aggregated_proof, proving_time = ZKEngine.prove_composition(
-                base_proofs=synapse.base_proofs,
-                base_subnet_ids=synapse.base_subnet_ids or [1] * len(synapse.base_proofs),
-                depth=synapse.recursion_depth
+            # Concurrent identical requests await the first one's proof (and its admission decision).
+            aggregated_proof, proving_stats = await self.inflight.run(
+                key,
+                lambda: self._admit_and_prove(
+                    key, synapse.base_proofs, base_subnet_ids, synapse.recursion_depth, deadline, stake
+                ),
             )
+            proving_time = proving_stats["total"]
             
             # Calculate succinctness metrics
             input_size = sum(len(p) if isinstance(p, bytes) else len(p.encode()) for p in synapse.base_proofs)
@@ -68,10 +81,19 @@ class Miner(BaseMinerNeuron):
             # Fill the synapse with production results
             synapse.aggregated_proof = aggregated_proof
             synapse.proving_time = proving_time
+            synapse.proving_stats = proving_stats
             synapse.compression_ratio = compression_ratio
             
             bt.logging.success(f"Generated recursive proof. Ratio: {compression_ratio:.2f}x, Time: {proving_time:.2f}s")
+            bt.logging.debug(f"Proving stages: {proving_stats}")
             
+        except AdmissionRejected as e:
+            bt.logging.warning(
+                f"Rejecting request under load: {e}, {deadline - time.time():.2f}s left of its timeout"
+            )
+            synapse.queue_depth = e.queue_depth
+            synapse.estimated_wait = e.estimated_wait
+
         except Exception as e:
             bt.logging.error(f"Error in production ZK aggregation: {e}")
             # Ensure we return a informative response even on failure
@@ -79,6 +101,51 @@ class Miner(BaseMinerNeuron):
             
         return synapse
 
+    async def _admit_and_prove(
+        self,
+        key: str,
+        base_proofs: typing.List[typing.Union[str, bytes]],
+        base_subnet_ids: typing.List[int],
+        depth: int,
+        deadline: float,
+        stake: float,
+    ) -> typing.Tuple[bytes, typing.Dict[str, float]]:
+        """
+        Proves one task through admission control, which schedules it earliest deadline
+        first. Raises AdmissionRejected when it cannot finish by `deadline`: a late proof
+        is worth nothing. A task already in the result cache is answered without
+        taking a proving slot.
+        """
+        cached = self.prover.lookup(key)
+        if cached is not None:
+            return cached
+
+        units = AdmissionController.cost(len(base_proofs), depth)
+        async with self.admission.admit(units, deadline, stake):
+            # Execute native recursive proving (O(n * depth) complexity) off the event loop
+            aggregated_proof, proving_stats = await self.prover.prove(
+                base_proofs=base_proofs,
+                base_subnet_ids=base_subnet_ids,
+                depth=depth,
+                key=key,
+            )
+        if not proving_stats.get("cache_hit"):
+            self.admission.observe(units, proving_stats["total"])
+        return aggregated_proof, proving_stats
+
+    def _deadline(self, synapse: zk_compose.protocol.ZKCompose) -> float:
+        """Time by which the caller's timeout runs out, less the return-trip margin."""
+        return request_deadline(
+            synapse.timeout,
+            getattr(synapse.dendrite, "nonce", None),
+            self.config.miner.timeout_margin,
+        )
+
+    def _caller_stake(self, synapse: zk_compose.protocol.ZKCompose) -> float:
+        index = self.metagraph_index
+        uid = index.hotkey_to_uid.get(synapse.dendrite.hotkey) if synapse.dendrite is not None else None
+        return index.stake[uid] if uid is not None else 0.0
+
     async def blacklist(
         self, synapse: zk_compose.protocol.ZKCompose
     ) -> typing.Tuple[bool, str]:
@@ -106,8 +173,8 @@ class Miner(BaseMinerNeuron):
         - Consider blacklisting entities that are not validators or have insufficient stake.
 
         In practice it would be wise to blacklist requests from entities that are not validators, or do not have
-        enough stake. This can be checked via metagraph.S and metagraph.validator_permit. You can always attain
-        the uid of the sender via a metagraph.hotkeys.index( synapse.dendrite.hotkey ) call.
+        enough stake. This can be checked via metagraph.S and metagraph.validator_permit. The uid of the sender,
+        its stake and its permit are looked up in self.metagraph_index, in O(1) whatever the subnet size.
 
         Otherwise, allow the request to be processed further.
         """
@@ -119,11 +186,9 @@ class Miner(BaseMinerNeuron):
             return True, "Missing dendrite or hotkey"
 
         # TODO(developer): Define how miners should blacklist requests.
-        uid = self.metagraph.hotkeys.index(synapse.dendrite.hotkey)
-        if (
-            not self.config.blacklist.allow_non_registered
-            and synapse.dendrite.hotkey not in self.metagraph.hotkeys
-        ):
+        index = self.metagraph_index
+        uid = index.hotkey_to_uid.get(synapse.dendrite.hotkey)
+        if not self.config.blacklist.allow_non_registered and uid is None:
             # Ignore requests from un-registered entities.
             bt.logging.trace(
                 f"Blacklisting un-registered hotkey {synapse.dendrite.hotkey}"
@@ -132,7 +197,7 @@ class Miner(BaseMinerNeuron):
 
         if self.config.blacklist.force_validator_permit:
             # If the config is set to force validator permit, then we should only allow requests from validators.
-            if not self.metagraph.validator_permit[uid]:
+            if uid is None or not index.validator_permit[uid]:
                 bt.logging.warning(
                     f"Blacklisting a request from non-validator hotkey {synapse.dendrite.hotkey}"
                 )
@@ -148,20 +213,22 @@ class Miner(BaseMinerNeuron):
         The priority function determines the order in which requests are handled. More valuable or higher-priority
         requests are processed before others. You should design your own priority mechanism with care.
 
-        This implementation assigns priority to incoming requests based on the calling entity's stake in the metagraph.
+        This implementation orders incoming requests earliest deadline first (from each synapse's send time and
+        timeout), using the calling entity's stake in the metagraph as the tiebreak.
 
         Args:
             synapse (template.protocol.Dummy): The synapse object that contains metadata about the incoming request.
 
         Returns:
-            float: A priority score derived from the stake of the calling entity.
+            float: A priority score derived from the request's deadline and the stake of the calling entity.
 
         Miners may receive messages from multiple entities at once. This function determines which request should be
         processed first. Higher values indicate that the request should be processed first. Lower values indicate
         that the request should be processed later.
 
         Example priority logic:
-        - A higher stake results in a higher priority value.
+        - A request due sooner results in a higher priority value.
+        - Between requests due at the same time, a higher stake results in a higher priority value.
         """
         if synapse.dendrite is None or synapse.dendrite.hotkey is None:
             bt.logging.warning(
@@ -169,13 +236,10 @@ class Miner(BaseMinerNeuron):
             )
             return 0.0
 
-        # TODO(developer): Define how miners should prioritize requests.
-        caller_uid = self.metagraph.hotkeys.index(
-            synapse.dendrite.hotkey
-        )  # Get the caller index.
-        priority = float(
-            self.metagraph.S[caller_uid]
-        )  # Return the stake as the priority.
+        # Earliest deadline first, so requests with little time left are started before
+        # ones that can wait; stake only breaks ties. Proving cost is unknown until the
+        # body is deserialized, so feasibility is checked later, by admission control.
+        priority = edf_priority(self._deadline(synapse), self._caller_stake(synapse))
         bt.logging.trace(
             f"Prioritizing {synapse.dendrite.hotkey} with value: {priority}"
         )
@@ -0,0 +1,36 @@
+import pytest
+from zk_compose.folding_logic import AggregationScheduler
+from zk_compose.zk_logic.zk_engine import ZKEngine
+from zk_compose.zk_logic.merkle import merkle_root
+
+@pytest.mark.parametrize("num_proofs,depth,expected", [
+    (8, 1, [1]),
+    (8, 3, [4, 2, 1]),
+    (9, 2, [3, 1]),
+    (2, 4, [1, 1, 1, 1]),
+])
+def test_plan_folds_to_single_root(num_proofs, depth, expected):
+    assert AggregationScheduler.plan(num_proofs, depth) == expected
+
+def test_aggregate_proves_one_batch_per_level(monkeypatch):
+    calls = []
+
+    def fake_prove_nodes(tasks):
+        calls.append(tasks)
+        return [(f"node{level}_{i}".encode(), 0.0) for i, (_, _, level) in enumerate(tasks)]
+
+    monkeypatch.setattr(ZKEngine, "prove_nodes", fake_prove_nodes)
+
+    base_proofs = [f"p{i}".encode() for i in range(9)]
+    root, _ = AggregationScheduler().aggregate(base_proofs, [2] * 9, depth=2)
+
+    assert [[(len(counts), level) for counts, _, level in tasks] for tasks in calls] == [
+        [(4, 1), (4, 1), (1, 1)],
+        [(3, 2)],
+    ]
+    assert root == b"node2_0"
+
+    # The root node commits to the same count and Merkle root as a single-shot proof.
+    counts, digests, _ = calls[-1][0]
+    linkage = [str(sum(counts)), merkle_root(digests).hex()]
+    assert linkage == ZKEngine._extract_linkage(base_proofs, [2] * 9)
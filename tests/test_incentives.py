@@ -2,7 +2,7 @@ import pytest
 import numpy as np
 import hashlib
 import json
-from zk_compose.validator.reward import reward
+from zk_compose.validator.reward import reward, get_rewards
 from zk_compose.zk_logic.zk_engine import ZKEngine
 
 def test_reward_depth_multiplier():
@@ -65,3 +65,90 @@ def test_reward_succinctness_bonus():
     score_high = reward(q, r_high)
     
     assert score_high == score_low * 1.5
+
+def test_get_rewards_batch_matches_individual():
+    base_proofs = ["proof1_binary_data", "proof2_binary_data"]
+    base_subnet_ids = [2, 8]
+    serialized, _ = ZKEngine.prove_composition(base_proofs, base_subnet_ids, 2)
+    tampered = bytearray(serialized)
+    tampered[-1] ^= 1
+
+    q = {"base_proofs": base_proofs, "depth": 2, "base_subnet_ids": base_subnet_ids}
+    responses = [
+        {"aggregated_proof": serialized, "compression_ratio": 1.0},
+        {"aggregated_proof": b"error", "compression_ratio": 1.0},
+        {"aggregated_proof": None},
+        {"aggregated_proof": serialized, "compression_ratio": 5.0},
+        {"aggregated_proof": bytes(tampered), "compression_ratio": 5.0},
+    ]
+
+    batched = get_rewards(None, q, responses)
+    individual = np.array([reward(q, r) for r in responses])
+
+    assert np.array_equal(batched, individual)
+    assert batched[0] > 0.0 and batched[3] > batched[0]
+    assert batched[1] == 0.0 and batched[2] == 0.0 and batched[4] == 0.0
+
+def test_get_rewards_with_shared_context():
+    from zk_compose.zk_logic.zk_engine import VerificationContext
+
+    base_proofs = ["proof1_binary_data", "proof2_binary_data"]
+    base_subnet_ids = [2, 8]
+    serialized, _ = ZKEngine.prove_composition(base_proofs, base_subnet_ids, 2)
+
+    q = {"base_proofs": base_proofs, "depth": 2, "base_subnet_ids": base_subnet_ids}
+    context = VerificationContext.from_query(q)
+    responses = [
+        {"aggregated_proof": serialized, "compression_ratio": 1.0},
+        {"aggregated_proof": serialized[:-1], "compression_ratio": 1.0},
+    ]
+
+    assert not context.accepts(serialized[:-1])
+    rewards = get_rewards(None, q, responses, context=context)
+    assert np.array_equal(rewards, get_rewards(None, q, responses))
+    assert rewards[0] > 0.0 and rewards[1] == 0.0
+
+def test_get_rewards_lone_malformed_proof_keeps_other_rewards():
+    base_proofs = ["proof1_binary_data", "proof2_binary_data"]
+    base_subnet_ids = [2, 8]
+    serialized, _ = ZKEngine.prove_composition(base_proofs, base_subnet_ids, 2)
+
+    q = {"base_proofs": base_proofs, "depth": 2, "base_subnet_ids": base_subnet_ids}
+    honest = {"aggregated_proof": serialized, "compression_ratio": 1.0}
+    # Verified once, so in the next round the malformed proof is the only pending one.
+    assert get_rewards(None, q, [honest])[0] > 0.0
+
+    junk = {"aggregated_proof": b"\xff" * len(serialized), "compression_ratio": 1.0}
+    rewards = get_rewards(None, q, [honest, honest, junk])
+    assert rewards[0] == rewards[1] > 0.0
+    assert rewards[2] == 0.0
+
+
+def test_forward_reuses_leaf_digests_across_rounds(monkeypatch):
+    import asyncio
+    import importlib
+    from types import SimpleNamespace
+    # The package re-exports the forward function under the module's name.
+    validator_forward = importlib.import_module("zk_compose.validator.forward")
+
+    async def dendrite(axons, synapse, deserialize):
+        proof, _ = ZKEngine.prove_composition(synapse.base_proofs, synapse.base_subnet_ids, synapse.recursion_depth)
+        return [{"aggregated_proof": proof, "compression_ratio": 1.0} for _ in axons]
+
+    scores = []
+    validator = SimpleNamespace(
+        config=SimpleNamespace(neuron=SimpleNamespace(sample_size=2)),
+        metagraph=SimpleNamespace(axons=["axon0", "axon1"]),
+        dendrite=dendrite,
+        update_scores=lambda rewards, uids: scores.append(rewards),
+        # Every round draws both proofs, so the second round's leaves were all seen before.
+        base_proof_pool={"sn2-task-a": "proof_a_binary_data", "sn2-task-b": "proof_b_binary_data"},
+    )
+    monkeypatch.setattr(validator_forward, "get_random_uids", lambda self, k: [0, 1])
+
+    asyncio.run(validator_forward.forward(validator))
+    hits = ZKEngine._leaf_digests.hits
+    asyncio.run(validator_forward.forward(validator))
+
+    assert ZKEngine._leaf_digests.hits == hits + 2
+    assert all(rewards[0] > 0.0 and rewards[1] > 0.0 for rewards in scores)
@@ -48,3 +48,60 @@ def test_sn2_proof_requirement():
     
     with pytest.raises(ValueError, match="Invalid base proof from subnet 2"):
         ZKEngine.prove_composition([invalid_sn2_proof], base_subnet_ids, 1)
+
+def test_native_round_trip():
+    pytest.importorskip("zk_bridge")
+
+    base_proofs = [b"proof1_binary_data", b"proof2_binary_data", b"proof3_binary_data"]
+    base_subnet_ids = [2, 8, 2]
+    proof, _ = ZKEngine.prove_composition(base_proofs, base_subnet_ids, 1)
+
+    is_valid, _ = ZKEngine.verify_composition(proof, base_proofs, base_subnet_ids, 1)
+    assert is_valid is True
+
+    # A proof over other base proofs does not verify against this task's linkage.
+    other = [b"proof1_binary_data", b"proof2_binary_data", b"other_binary_data"]
+    assert ZKEngine.verify_composition(proof, other, base_subnet_ids, 1)[0] is False
+
+    tampered = bytearray(proof)
+    tampered[-1] ^= 1
+    assert ZKEngine.verify_composition(bytes(tampered), base_proofs, base_subnet_ids, 1)[0] is False
+
+def test_native_rejects_unparseable_public_inputs():
+    zk_bridge = pytest.importorskip("zk_bridge")
+    from zk_compose.zk_logic.zk_engine import VerificationContext
+
+    base_proofs = [b"proof1_binary_data", b"proof2_binary_data"]
+    proof, _ = ZKEngine.prove_composition(base_proofs, [2, 8], 1)
+    context = VerificationContext(base_proofs, [2, 8], 1)
+
+    with pytest.raises(zk_bridge.VerificationError):
+        context.verifier.verify(proof, ["2", "not_a_root"])
+    assert context.verifier.verify_batch([proof], [["2", "not_a_root"]]) == [False]
+
+def test_native_tree_scheduler_matches_single_shot():
+    pytest.importorskip("zk_bridge")
+    from zk_compose.folding_logic import AggregationScheduler
+
+    base_proofs = [f"proof{i}_binary_data".encode() for i in range(5)]
+    base_subnet_ids = [2] * 5
+    root, _ = AggregationScheduler().aggregate(base_proofs, base_subnet_ids, depth=2)
+
+    assert ZKEngine.verify_composition(root, base_proofs, base_subnet_ids, 2)[0] is True
+    assert root == ZKEngine.prove_composition(base_proofs, base_subnet_ids, 2)[0]
+    # Every level has its own keys, so the root does not pass for another depth.
+    assert ZKEngine.verify_composition(root, base_proofs, base_subnet_ids, 3)[0] is False
+
+def test_native_accumulator_matches_single_shot():
+    pytest.importorskip("zk_bridge")
+    from zk_compose.zk_logic.accumulator import ProofAccumulator
+
+    base_proofs = [f"proof{i}_binary_data".encode() for i in range(5)]
+    base_subnet_ids = [2] * 5
+    acc = ProofAccumulator(len(base_proofs), depth=2)
+    for i in reversed(range(len(base_proofs))):
+        acc.absorb(base_proofs[i], base_subnet_ids[i], i)
+
+    assert acc.linkage() == ZKEngine._extract_linkage(base_proofs, base_subnet_ids)
+    proof, _ = acc.finalize()
+    assert proof == ZKEngine.prove_composition(base_proofs, base_subnet_ids, 2)[0]
@@ -1,13 +1,26 @@
+import os
 import time
 import asyncio
+import tempfile
+import threading
 import hashlib
 import unittest
 import sys
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, patch
 
 # 7-Star Mock Layer for Constrained Environments
 mock_bt = MagicMock()
 mock_bt.logging = MagicMock()
+
+
+class MockSynapse:
+    # A real base class: subclassing a MagicMock yields a mock whose side_effect is
+    # the bases tuple, so the second construction of a synapse raised StopIteration.
+    def __init__(self, **fields):
+        self.__dict__.update(fields)
+
+
+mock_bt.Synapse = MockSynapse
 sys.modules["bittensor"] = mock_bt
 import bittensor as bt
 
@@ -18,7 +31,9 @@ class MockZKBridge:
     class VerificationError(ZKBridgeError): pass
 
     @staticmethod
-    def prove_recursive_composition(base_proofs, subnet_ids, depth):
+    def prove_recursive_composition(base_proofs, subnet_ids, depth, compressed=False):
+        if depth > MockZKBridge.max_depth():
+            raise MockZKBridge.ProofGenerationError(f"Cannot aggregate at depth {depth}")
         start = time.time()
         # Simulated O(n * depth) Prover complexity
         for _ in range(depth):
@@ -28,19 +43,143 @@ class MockZKBridge:
             raise RuntimeError("ConstraintError: Circuit is empty")
         return b"recursive_snark_0x" + bytes([depth]), time.time() - start
 
+    class ProveTimings:
+        def __init__(self, total, num_inputs):
+            self.total = total
+            self.num_constraints = MockZKBridge.circuit_bucket(num_inputs) + 1
+
+        def as_dict(self):
+            return {
+                "setup": 0.0, "synthesis": 0.0, "fft": 0.0, "msm": self.total, "serialization": 0.0,
+                "total": self.total, "num_constraints": self.num_constraints,
+                "num_witness_variables": self.num_constraints - 1, "num_instance_variables": 2,
+            }
+
+    @staticmethod
+    def prove_recursive_composition_timed(base_proofs, subnet_ids, depth, compressed=False):
+        proof, total = MockZKBridge.prove_recursive_composition(base_proofs, subnet_ids, depth, compressed)
+        return proof, MockZKBridge.ProveTimings(total, len(base_proofs))
+
+    @staticmethod
+    def prove_aggregation_node(counts, digests, level, compressed=False):
+        proof, total = MockZKBridge.prove_recursive_composition(digests, [], level, compressed)
+        return proof, MockZKBridge.ProveTimings(total, len(digests))
+
+    CIRCUIT_VERSION = 4
+
+    @staticmethod
+    def circuit_bucket(num_inputs):
+        return max(2, 1 << (num_inputs - 1).bit_length())
+
+    @staticmethod
+    def circuit_buckets():
+        return [2 ** i for i in range(1, 11)]
+
+    @staticmethod
+    def max_depth():
+        return 10
+
+    @staticmethod
+    def proof_sizes():
+        # Mock proofs are b"recursive_snark_0x" plus one depth byte.
+        return [19]
+
+    @staticmethod
+    def set_num_threads(num_threads):
+        MockZKBridge.num_threads = num_threads
+
+    @staticmethod
+    def get_num_threads():
+        return getattr(MockZKBridge, "num_threads", 1)
+
+    @staticmethod
+    def export_verifying_key(num_inputs, depth, compressed=False):
+        return b"mock_vk_" + bytes([num_inputs, depth])
+
+    @staticmethod
+    def load_keys(num_inputs, depth):
+        return [(MockZKBridge.circuit_bucket(num_inputs), level) for level in range(1, depth + 1)]
+
     @staticmethod
     def verify_recursive_composition(proof_bytes, vk, public_inputs):
         # Simulated O(1) Constant Time Verifier
         time.sleep(0.05) 
+        if not bytes(proof_bytes).startswith(b"recursive_snark_0x"):
+            raise MockZKBridge.VerificationError("Malformed cryptographic proof bytes")
         return True
 
+    @staticmethod
+    def verify_batch(proofs, vk, public_inputs):
+        # Simulated single multi-pairing for the whole batch; malformed proofs are just invalid
+        time.sleep(0.05)
+        return [bytes(p).startswith(b"recursive_snark_0x") for p in proofs]
+
+    class Verifier:
+        def __init__(self, vk):
+            self.vk = vk
+
+        def verify(self, proof_bytes, public_inputs):
+            return MockZKBridge.verify_recursive_composition(proof_bytes, self.vk, public_inputs)
+
+        def verify_batch(self, proofs, public_inputs):
+            return MockZKBridge.verify_batch(proofs, self.vk, public_inputs)
+
+    class Accumulator:
+        def __init__(self, num_inputs=None, depth=None):
+            self.leaves = [None] * (num_inputs or 0)
+            self.plan = None
+            if num_inputs is not None:
+                fanout = 2
+                while fanout ** depth < num_inputs:
+                    fanout *= 2
+                self.plan = (depth, fanout)
+            self.input_bytes = 0
+
+        def __len__(self):
+            return sum(leaf is not None for leaf in self.leaves)
+
+        @property
+        def subnet_ids(self):
+            return [leaf[1] for leaf in self.leaves if leaf is not None]
+
+        def absorb(self, proof, subnet_id, index=None):
+            if self.plan is None:
+                self.leaves.append(None)
+                index = len(self.leaves) - 1
+            index = len(self) if index is None else index
+            self.leaves[index] = (leaf_hash(proof), subnet_id)
+            self.input_bytes += len(proof)
+            if self.plan is None or self.plan[0] == 1:
+                return None
+            chunk = index // self.plan[1]
+            children = self.leaves[chunk * self.plan[1]:(chunk + 1) * self.plan[1]]
+            return chunk if all(children) else None
+
+        def chunk(self, chunk):
+            fanout = self.plan[1]
+            children = self.leaves[chunk * fanout:(chunk + 1) * fanout]
+            return [1] * len(children), [digest for digest, _ in children]
+
+        def linkage(self):
+            return [str(len(self)), merkle_root(digest for digest, _ in self.leaves).hex()]
+
+        def finalize(self, depth=None, compressed=False):
+            depth = self.plan[0] if self.plan else depth
+            return MockZKBridge.prove_recursive_composition_timed([b""] * len(self), self.subnet_ids, depth, compressed)
+
 mock_zk_bridge = MockZKBridge()
 sys.modules["zk_bridge"] = mock_zk_bridge
 import zk_bridge
 
 from typing import List, Union
-from zk_compose.zk_logic.zk_engine import ZKEngine, ProofGenerationError
+from zk_compose.zk_logic.zk_engine import ZKEngine, ProofGenerationError, VerificationError
+from zk_compose.zk_logic.vk_registry import VKRegistry
+from zk_compose.zk_logic.result_cache import ResultCache, composition_digest
+from zk_compose.zk_logic.merkle import LeafDigestCache, leaf_hash, merkle_root, node_hash
+from zk_compose.zk_logic.accumulator import ProofAccumulator
 from zk_compose.integrations.sn2_client import SN2Client, SN2ProofRequest
+from zk_compose.utils.uids import index_metagraph
+from zk_compose.miner import AdmissionController, AdmissionRejected, ProverService, SingleFlight, edf_priority, request_deadline
 
 class TestProductionZKCompose(unittest.TestCase):
     """
@@ -160,6 +299,511 @@ class TestProductionZKCompose(unittest.TestCase):
         finally:
             loop.close()
 
+    def test_accumulator_absorbs_sn2_proofs_incrementally(self):
+        """
+        Requirement: Proofs are folded in as SN2 fetches complete, with the same result as a one-shot prove.
+        """
+        print("\n[VERIFY] Incremental Accumulator...")
+
+        class MockDendrite:
+            async def query(self, axons, synapse, timeout):
+                # Later tasks answer first, so completion order is the reverse of task order.
+                await asyncio.sleep({"p1": 0.03, "p2": 0.02, "p3": 0.01}[synapse.task_id])
+                proof = synapse.task_id.encode()
+                return [SN2ProofRequest(task_id=synapse.task_id, proof=proof, is_valid=True)] * 3
+
+        async def run_test(client):
+            acc = ProofAccumulator(3, depth=2)
+            fetches = [acc.absorb_from_sn2(client, t, i) for i, t in enumerate(["p1", "p2", "p3"])]
+            await asyncio.gather(*fetches)
+            return acc, await client.aggregate(["p1", "p2", "p3"], depth=2)
+
+        client = SN2Client(MockDendrite(), type('obj', (object,), {'axons': [1,2,3,4,5]}))
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        try:
+            with patch.object(ZKEngine, "prove_node", wraps=ZKEngine.prove_node) as prove_node:
+                acc, (aggregated, _) = loop.run_until_complete(run_test(client))
+        finally:
+            loop.close()
+
+        self.assertEqual(len(acc), 3)
+        self.assertEqual(acc.subnet_ids, [2, 2, 2])
+        self.assertEqual(acc.linkage(), ZKEngine._extract_linkage(self.mock_base_proofs, self.mock_subnet_ids))
+        # Fan-out 2 at depth 2: chunks [p1, p2] and [p3] are proven as they complete, in both runs.
+        self.assertEqual(sorted(c.args[0] for c in prove_node.call_args_list), [[1], [1], [1, 1], [1, 1]])
+        proof, _ = acc.finalize()
+        expected, _ = ZKEngine.prove_composition(self.mock_base_proofs, self.mock_subnet_ids, depth=2)
+        self.assertEqual(proof, expected)
+        self.assertEqual(aggregated, expected)
+        print("  SUCCESS: Accumulated proof matches one-shot aggregation.")
+
+    def test_repeated_task_served_from_result_cache(self):
+        """
+        Requirement: Identical prove requests are answered from the result cache.
+        """
+        print("\n[VERIFY] Result Cache...")
+        base_proofs = [b"cache_p1", b"cache_p2"]
+        proof, p_time = ZKEngine.prove_composition(base_proofs, [2, 8], depth=3)
+        hits = ZKEngine.result_cache_stats()["hits"]
+
+        start = time.time()
+        cached_proof, cached_time = ZKEngine.prove_composition(base_proofs, [2, 8], depth=3)
+        self.assertLess(time.time() - start, 0.01)
+        self.assertEqual((cached_proof, cached_time), (proof, p_time))
+        self.assertEqual(ZKEngine.result_cache_stats()["hits"], hits + 1)
+
+        # A different subnet assignment is a different task.
+        key_a = composition_digest(base_proofs, [2, 8], 3, False)
+        key_b = composition_digest(base_proofs, [8, 2], 3, False)
+        self.assertNotEqual(key_a, key_b)
+
+        # A new circuit layout never reuses results cached by the old one.
+        with patch.object(zk_bridge, "CIRCUIT_VERSION", zk_bridge.CIRCUIT_VERSION + 1):
+            self.assertNotEqual(composition_digest(base_proofs, [2, 8], 3, False), key_a)
+        print("  SUCCESS: Repeated task returned from cache.")
+
+    def test_result_cache_disk_tier_and_ttl(self):
+        """
+        Requirement: Cached results survive restarts and expire after the TTL.
+        """
+        path = os.path.join(tempfile.mkdtemp(), "results.sqlite")
+        ResultCache(max_entries=1, ttl=60, path=path).put("k", b"proof", 1.5)
+
+        restarted = ResultCache(max_entries=1, ttl=60, path=path)
+        self.assertEqual(restarted.get("k"), (b"proof", 1.5))
+        self.assertEqual(restarted.stats()["disk_hits"], 1)
+
+        expired = ResultCache(max_entries=1, ttl=0, path=path)
+        self.assertIsNone(expired.get("k"))
+        self.assertEqual(expired.stats()["misses"], 1)
+
+    def test_repeated_proof_skips_pairing(self):
+        """
+        Requirement: Identical proofs for the same query are verified natively only once.
+        """
+        print("\n[VERIFY] Verification Outcome Cache...")
+        base_proofs = [b"vcache_p1", b"vcache_p2"]
+        proof, _ = ZKEngine.prove_composition(base_proofs, [2, 8], depth=5)
+        ZKEngine.verification_cache_stats(reset=True)
+
+        results = ZKEngine.verify_batch([proof, proof, proof], base_proofs, [2, 8], 5)
+        self.assertEqual([ok for ok, _ in results], [True, True, True])
+        is_valid, _ = ZKEngine.verify_composition(proof, base_proofs, [2, 8], 5)
+        self.assertTrue(is_valid)
+
+        stats = ZKEngine.verification_cache_stats(reset=True)
+        self.assertEqual(stats["pairings_run"], 1)
+        self.assertEqual(stats["pairings_avoided"], 3)
+        self.assertEqual(ZKEngine.verification_cache_stats()["pairings_avoided"], 0)
+        print("  SUCCESS: Repeated proofs answered from the outcome cache.")
+
+    def test_lone_malformed_proof_does_not_void_the_batch(self):
+        """
+        Requirement: A lone malformed proof is invalid on its own instead of failing the whole batch.
+        """
+        print("\n[VERIFY] Lone Malformed Proof...")
+        from zk_compose.zk_logic.zk_engine import VerificationContext
+
+        base_proofs = [b"lone_p1", b"lone_p2"]
+        query = {"base_proofs": base_proofs, "depth": 1, "base_subnet_ids": [2, 2]}
+        proof, _ = ZKEngine.prove_composition(base_proofs, [2, 2], depth=1)
+        context = VerificationContext.from_query(query)
+        self.assertTrue(context.verify(proof)[0])
+
+        # The honest proof is now cached, so the junk one is the only pending proof.
+        junk = b"x" * len(proof)
+        self.assertTrue(context.accepts(junk))
+        verifications = context.verify_batch([proof, proof, junk])
+        self.assertEqual([ok for ok, _ in verifications], [True, True, False])
+        print("  SUCCESS: Only the malformed response was marked invalid.")
+
+    def test_warm_up_covers_configured_shapes(self):
+        """
+        Requirement: Startup warm-up loads keys for every configured shape and runs one prove/verify.
+        """
+        print("\n[VERIFY] Startup Warm-up...")
+        timings = ZKEngine.warm_up([3, 4, 5], [1, 2])
+        steps = [step for step, _ in timings]
+        self.assertEqual(steps[:4], [
+            "keys n=4 depth=1", "keys n=8 depth=1", "keys n=4 depth=2", "keys n=8 depth=2",
+        ])
+        self.assertEqual(steps[4:], ["prove n=3 depth=1", "verify n=3 depth=1"])
+        self.assertTrue(all(seconds >= 0 for _, seconds in timings))
+
+        # A prove/verify mismatch surfaces at startup instead of as zero rewards later.
+        with patch.object(MockZKBridge, "verify_recursive_composition", return_value=False):
+            with self.assertRaises(VerificationError):
+                ZKEngine.warm_up([3], [1])
+        print("  SUCCESS: Warm-up timed every step.")
+
+    def test_proving_stage_timings(self):
+        """
+        Requirement: The prover reports a per-stage breakdown consistent with its total time.
+        """
+        print("\n[VERIFY] Proving Stage Timings...")
+        base_proofs = [b"timed_p1", b"timed_p2", b"timed_p3"]
+        proof, stats = ZKEngine.prove_composition_with_timings(base_proofs, [2, 8, 2], depth=1)
+        for stage in ("setup", "synthesis", "fft", "msm", "serialization", "total", "num_constraints"):
+            self.assertIn(stage, stats)
+        self.assertEqual(stats["cache_hit"], 0.0)
+        self.assertEqual(stats["num_constraints"], 5)
+
+        cached_proof, cached_stats = ZKEngine.prove_composition_with_timings(base_proofs, [2, 8, 2], depth=1)
+        self.assertEqual(cached_proof, proof)
+        self.assertEqual(cached_stats, {"total": stats["total"], "cache_hit": 1.0})
+        print("  SUCCESS: Stage timings reported.")
+
+    def test_merkle_linkage_reuses_leaf_digests(self):
+        """
+        Requirement: Linkage is a Merkle root over proof digests; overlapping tasks re-hash only new leaves.
+        """
+        print("\n[VERIFY] Merkle Linkage...")
+        p1, p2, p3 = b"leaf_1", b"leaf_2", b"leaf_3"
+        expected = node_hash(node_hash(leaf_hash(p1), leaf_hash(p2)), leaf_hash(p3)).hex()
+        self.assertEqual(ZKEngine._extract_linkage([p1, p2, p3], [2, 8, 2]), ["3", expected])
+        self.assertEqual(ZKEngine._extract_linkage([p1, p2, p3], [2, 8, 2], ["t1", "t2", "t3"]), ["3", expected])
+
+        # Keyed by task id, holding only digests, and bounded by key and digest bytes.
+        cache = LeafDigestCache(max_bytes=2 * (2 + 32))
+        cache.get(p1, "t1")
+        cache.get(p2, "t2")
+        self.assertEqual(cache.get(bytes(p1), "t1"), leaf_hash(p1))
+        cache.get(p3, "t3")
+        cache.get(p3)
+        self.assertEqual((cache.hits, cache.misses), (1, 3))
+        self.assertEqual((len(cache), cache.nbytes), (2, 68))
+        # t2 was least recently used, so it made room for t3.
+        cache.get(p2, "t2")
+        self.assertEqual((cache.hits, cache.misses), (1, 4))
+        print("  SUCCESS: Merkle root matches and leaves are reused.")
+
+    def test_vk_registry_tiers(self):
+        """
+        Requirement: Warm VK lookups are served from memory; cold ones map the disk copy.
+        """
+        print("\n[VERIFY] Two-tier VK Registry...")
+        cache_dir = VKRegistry.CACHE_DIR
+        VKRegistry.CACHE_DIR = tempfile.mkdtemp()
+        try:
+            before = VKRegistry.stats()
+            vk = VKRegistry.get_vk(2, "plonk", "tiered")
+            self.assertEqual(VKRegistry.get_vk(2, "plonk", "tiered"), vk)
+
+            VKRegistry.clear_memory()
+            mapped = VKRegistry.get_vk(2, "plonk", "tiered")
+            self.assertEqual(bytes(mapped), vk)
+
+            after = VKRegistry.stats()
+            self.assertEqual(after["hits"] - before["hits"], 1)
+            self.assertEqual(after["disk_hits"] - before["disk_hits"], 1)
+            self.assertEqual(after["misses"] - before["misses"], 2)
+        finally:
+            VKRegistry.CACHE_DIR = cache_dir
+            VKRegistry.clear_memory()
+        print("  SUCCESS: Memory and mmap tiers served the VK.")
+
+    def test_vk_single_flight_and_prefetch(self):
+        """
+        Requirement: Concurrent VK misses share one fetch; prefetch loads every aggregation VK concurrently.
+        """
+        print("\n[VERIFY] VK Single-flight and Prefetch...")
+        cache_dir, fetch = VKRegistry.CACHE_DIR, VKRegistry._fetch_from_decentralized_storage
+        VKRegistry.CACHE_DIR = tempfile.mkdtemp()
+        calls = []
+
+        def slow_fetch(cls, subnet_id, proof_system, vk_hash):
+            calls.append(subnet_id)
+            time.sleep(0.1)
+            return b"vk_" + bytes([subnet_id])
+
+        VKRegistry._fetch_from_decentralized_storage = classmethod(slow_fetch)
+        try:
+            results = []
+            threads = [
+                threading.Thread(target=lambda: results.append(VKRegistry.get_vk(7, "plonk", "herd")))
+                for _ in range(8)
+            ]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+            self.assertEqual(calls, [7])
+            self.assertEqual(results, [b"vk_\x07"] * 8)
+
+            exported = []
+
+            def slow_export(num_inputs, depth, compressed=False):
+                exported.append((num_inputs, depth))
+                time.sleep(0.1)
+                return b"mock_vk_" + bytes([num_inputs, depth])
+
+            with patch.object(zk_bridge, "export_verifying_key", slow_export):
+                start = time.time()
+                loaded = VKRegistry.prefetch([2, 3, 4, 5], [1, 2], max_concurrency=6)
+                elapsed = time.time() - start
+            # Counts 2..5 fall in buckets 2, 4 and 8: six shapes over two depths, exported side by side.
+            self.assertEqual(sorted(loaded), [(2, 1), (2, 2), (4, 1), (4, 2), (8, 1), (8, 2)])
+            self.assertTrue(all(loaded.values()))
+            self.assertEqual(sorted(exported), sorted(loaded))
+            self.assertLess(elapsed, 0.3)
+        finally:
+            VKRegistry.CACHE_DIR = cache_dir
+            VKRegistry._fetch_from_decentralized_storage = fetch
+            VKRegistry.clear_memory()
+        print("  SUCCESS: Herd collapsed to one fetch; prefetch loaded all aggregation VKs.")
+
+    def test_vk_stale_while_revalidate(self):
+        """
+        Requirement: An expiring VK is served immediately while it is refreshed in the background.
+        """
+        print("\n[VERIFY] VK Stale-while-revalidate...")
+        saved = (VKRegistry.CACHE_DIR, VKRegistry.CACHE_TTL, VKRegistry.REFRESH_AHEAD,
+                 VKRegistry.STALE_GRACE, VKRegistry._fetch_from_decentralized_storage)
+        VKRegistry.CACHE_DIR = tempfile.mkdtemp()
+        VKRegistry.CACHE_TTL, VKRegistry.REFRESH_AHEAD, VKRegistry.STALE_GRACE = 0.2, 0.1, 60
+        versions = []
+
+        def versioned_fetch(cls, subnet_id, proof_system, vk_hash):
+            time.sleep(0.1)
+            versions.append(len(versions) + 1)
+            return b"vk_v%d" % versions[-1]
+
+        VKRegistry._fetch_from_decentralized_storage = classmethod(versioned_fetch)
+        try:
+            self.assertEqual(VKRegistry.get_vk(9, "plonk", "swr"), b"vk_v1")
+            time.sleep(0.3)
+
+            before = VKRegistry.stats()
+            start = time.perf_counter()
+            self.assertEqual(VKRegistry.get_vk(9, "plonk", "swr"), b"vk_v1")
+            self.assertEqual(VKRegistry.get_vk(9, "plonk", "swr"), b"vk_v1")
+            self.assertLess(time.perf_counter() - start, 0.05)
+
+            deadline = time.time() + 2
+            while VKRegistry.get_vk(9, "plonk", "swr") != b"vk_v2" and time.time() < deadline:
+                time.sleep(0.02)
+            after = VKRegistry.stats()
+            self.assertEqual(VKRegistry.get_vk(9, "plonk", "swr"), b"vk_v2")
+            self.assertEqual(after["refreshes"] - before["refreshes"], 1)
+            self.assertGreaterEqual(after["stale_served"] - before["stale_served"], 2)
+        finally:
+            (VKRegistry.CACHE_DIR, VKRegistry.CACHE_TTL, VKRegistry.REFRESH_AHEAD,
+             VKRegistry.STALE_GRACE) = saved[:4]
+            VKRegistry._fetch_from_decentralized_storage = saved[4]
+            VKRegistry.clear_memory()
+        print("  SUCCESS: Stale VK served without blocking; refreshed in the background.")
+
+    def test_prover_service_keeps_event_loop_responsive(self):
+        """
+        Requirement: Proofs run off the event loop; the parent's result cache answers repeats.
+        """
+        print("\n[VERIFY] Prover Service...")
+        from concurrent.futures import ThreadPoolExecutor
+
+        async def run(service, base_proofs):
+            ticks = 0
+
+            async def ticker():
+                nonlocal ticks
+                while True:
+                    await asyncio.sleep(0.005)
+                    ticks += 1
+
+            task = asyncio.ensure_future(ticker())
+            result = await service.prove(base_proofs, [2] * len(base_proofs), 3)
+            task.cancel()
+            return result, ticks
+
+        in_process = ProverService(0)
+        (proof, timings), ticks = asyncio.run(run(in_process, [b"svc_a1", b"svc_a2"]))
+        self.assertEqual(proof, b"recursive_snark_0x\x03")
+        self.assertGreater(ticks, 5)
+
+        # Worker processes cannot see the mocked bridge, so stand in a thread pool for the process pool.
+        pooled = ProverService(1)
+        pooled._pool = ThreadPoolExecutor(max_workers=1)
+        try:
+            base_proofs = [memoryview(b"svc_b1"), b"svc_b2"]
+            (proof, timings), ticks = asyncio.run(run(pooled, base_proofs))
+            self.assertEqual(timings["cache_hit"], 0.0)
+            self.assertGreater(ticks, 5)
+            (cached, timings), _ = asyncio.run(run(pooled, base_proofs))
+            self.assertEqual((cached, timings["cache_hit"]), (proof, 1.0))
+            # The miner checks this before asking admission control for a proving slot.
+            key = asyncio.run(pooled.key_for(base_proofs, [2] * len(base_proofs), 3))
+            self.assertEqual(key, pooled.task_key(base_proofs, [2] * len(base_proofs), 3))
+            self.assertEqual(pooled.lookup(key), (proof, timings))
+            self.assertIsNone(pooled.lookup(pooled.task_key(base_proofs, [2] * len(base_proofs), 4)))
+        finally:
+            pooled.shutdown(wait=True)
+        print("  SUCCESS: Event loop kept running during proofs; repeat served by the parent.")
+
+    def test_admission_sheds_requests_that_cannot_finish(self):
+        """
+        Requirement: The miner rejects work it cannot finish in time, reporting queue depth and wait.
+        """
+        print("\n[VERIFY] Admission Control...")
+        admission = AdmissionController(max_queue=2, concurrency=1, seconds_per_unit=0.1)
+        units = AdmissionController.cost(5, 2)
+        self.assertEqual(units, 10)
+
+        async def scenario():
+            now = time.time()
+            first = admission.admit(units, now + 5.0)
+            await first.__aenter__()
+            # 1s of work is running; another 1s request due in 1.5s cannot make it.
+            with self.assertRaises(AdmissionRejected) as rejected:
+                async with admission.admit(units, now + 1.5):
+                    pass
+            self.assertEqual(rejected.exception.queue_depth, 0)
+            self.assertAlmostEqual(rejected.exception.estimated_wait, 1.0)
+
+            queued = [asyncio.ensure_future(self._hold(admission.admit(units, now + 5.0))) for _ in range(2)]
+            await asyncio.sleep(0)
+            # The queue is full, however generous the deadline.
+            with self.assertRaises(AdmissionRejected) as full:
+                async with admission.admit(1, now + 60.0):
+                    pass
+            self.assertEqual(full.exception.queue_depth, 2)
+
+            await first.__aexit__(None, None, None)
+            await asyncio.gather(*queued)
+
+        asyncio.run(scenario())
+        stats = admission.stats()
+        self.assertEqual((stats["queued"], stats["running"], stats["backlog_units"]), (0, 0, 0))
+        self.assertEqual((stats["admitted"], stats["rejected"]), (3, 2))
+
+        admission.observe(units, 3.0)
+        self.assertAlmostEqual(admission.seconds_per_unit, 0.1 + 0.2 * (0.3 - 0.1))
+        print("  SUCCESS: Late and overflowing requests rejected; EWMA tracks proving time.")
+
+    def test_admission_schedules_earliest_deadline_first(self):
+        """
+        Requirement: Waiting requests start in deadline order, stake breaking ties; infeasible ones are dropped.
+        """
+        print("\n[VERIFY] EDF Scheduling...")
+        admission = AdmissionController(max_queue=8, concurrency=1, seconds_per_unit=0.01)
+        order = []
+
+        async def job(name, deadline, stake=0.0):
+            try:
+                async with admission.admit(1, deadline, stake):
+                    order.append(name)
+                    await asyncio.sleep(0.02)
+            except AdmissionRejected:
+                order.append(f"{name}:dropped")
+
+        async def scenario():
+            now = time.time()
+            blocker = admission.admit(1, now + 10)
+            await blocker.__aenter__()
+            jobs = [
+                asyncio.ensure_future(job("late", now + 9)),
+                asyncio.ensure_future(job("soon_low_stake", now + 3, stake=10)),
+                asyncio.ensure_future(job("soon_high_stake", now + 3, stake=1000)),
+                asyncio.ensure_future(job("tight", now + 0.1)),
+            ]
+            await asyncio.sleep(0.15)
+            # By now "tight" cannot finish before its deadline.
+            await blocker.__aexit__(None, None, None)
+            await asyncio.gather(*jobs)
+
+        asyncio.run(scenario())
+        self.assertEqual(order, ["tight:dropped", "soon_high_stake", "soon_low_stake", "late"])
+        self.assertEqual(admission.stats()["expired"], 1)
+
+        now = time.time()
+        self.assertGreater(edf_priority(now + 1, 0, now=now), edf_priority(now + 2, 1e6, now=now))
+        self.assertGreater(edf_priority(now + 1, 100, now=now), edf_priority(now + 1, 10, now=now))
+        self.assertEqual(request_deadline(12.0, int((now - 2) * 1e9), 1.0, now=now), now + 9.0)
+        self.assertEqual(request_deadline(12.0, int((now + 60) * 1e9), 1.0, now=now), now + 11.0)
+        print("  SUCCESS: EDF order with stake tiebreak; infeasible request dropped.")
+
+    @staticmethod
+    async def _hold(admit):
+        async with admit:
+            pass
+
+    def test_identical_inflight_requests_share_one_proof(self):
+        """
+        Requirement: Concurrent identical tasks await one proof; failures reach every caller.
+        """
+        print("\n[VERIFY] In-flight Deduplication...")
+        inflight = SingleFlight()
+        calls = []
+
+        async def prove(fail=False):
+            calls.append(fail)
+            await asyncio.sleep(0.05)
+            if fail:
+                raise ProofGenerationError("boom")
+            return b"shared_proof"
+
+        async def burst(key, fail=False):
+            return await asyncio.gather(
+                *[inflight.run(key, lambda: prove(fail)) for _ in range(5)], return_exceptions=True
+            )
+
+        self.assertEqual(asyncio.run(burst("task_a")), [b"shared_proof"] * 5)
+        self.assertEqual(len(calls), 1)
+
+        errors = asyncio.run(burst("task_b", fail=True))
+        self.assertTrue(all(isinstance(e, ProofGenerationError) for e in errors))
+        self.assertEqual(len(calls), 2)
+
+        # Settled tasks are forgotten; a later identical request runs again.
+        asyncio.run(burst("task_a"))
+        self.assertEqual(len(calls), 3)
+        self.assertEqual(inflight.stats(), {"inflight": 0, "leaders": 3, "coalesced": 12})
+
+        async def leader_cancelled():
+            leader = asyncio.ensure_future(inflight.run("task_c", prove))
+            await asyncio.sleep(0)
+            followers = [asyncio.ensure_future(inflight.run("task_c", prove)) for _ in range(2)]
+            await asyncio.sleep(0)
+            leader.cancel()
+            return await asyncio.gather(*followers), leader.cancelled()
+
+        # The first caller going away does not take the shared proof down with it.
+        self.assertEqual(asyncio.run(leader_cancelled()), ([b"shared_proof"] * 2, True))
+        self.assertEqual(len(calls), 4)
+
+        async def everyone_cancelled():
+            callers = [asyncio.ensure_future(inflight.run("task_d", prove)) for _ in range(2)]
+            await asyncio.sleep(0)
+            for caller in callers:
+                caller.cancel()
+            # Well short of the proof's 50ms, so only a cancelled task has settled.
+            await asyncio.sleep(0.01)
+            return len(inflight)
+
+        # Work nobody waits for any more is abandoned.
+        self.assertEqual(asyncio.run(everyone_cancelled()), 0)
+        print("  SUCCESS: 5 identical requests shared 1 proof.")
+
+    def test_metagraph_index_lookups(self):
+        """
+        Requirement: Caller uid, stake and permit are O(1) lookups; unknown hotkeys are absent, not errors.
+        """
+        print("\n[VERIFY] Metagraph Index...")
+        metagraph = MagicMock()
+        metagraph.hotkeys = [f"hk{uid}" for uid in range(1024)]
+        metagraph.S = [float(uid) for uid in range(1024)]
+        metagraph.validator_permit = [uid % 2 == 0 for uid in range(1024)]
+
+        index = index_metagraph(metagraph)
+        uid = index.hotkey_to_uid["hk1000"]
+        self.assertEqual((uid, index.stake[uid], index.validator_permit[uid]), (1000, 1000.0, True))
+        self.assertIsNone(index.hotkey_to_uid.get("unregistered"))
+
+        # A resync swaps in a fresh index; the old snapshot stays consistent for in-flight requests.
+        metagraph.hotkeys = list(reversed(metagraph.hotkeys))
+        self.assertEqual(index_metagraph(metagraph).hotkey_to_uid["hk1000"], 23)
+        self.assertEqual(index.hotkey_to_uid["hk1000"], 1000)
+        print("  SUCCESS: Hotkey, stake and permit resolved without scanning.")
+
     # --- 3. Robust Error Handling ---
 
     def test_native_exception_handling(self):
@@ -172,5 +816,16 @@ class TestProductionZKCompose(unittest.TestCase):
             ZKEngine.prove_composition([], [], 1)
         print("  SUCCESS: Native errors correctly mapped to ZKBridgeError.")
 
+    def test_depth_above_limit_is_rejected(self):
+        """
+        Requirement: Depth is bounded, so requests cannot trigger a setup per new depth.
+        """
+        print("\n[VERIFY] Depth Limit...")
+        with self.assertRaises(ProofGenerationError):
+            ZKEngine.prove_composition([b"a", b"b"], [2, 2], ZKEngine.max_depth() + 1)
+        proof, _ = ZKEngine.prove_composition([b"a", b"b"], [2, 2], ZKEngine.max_depth())
+        self.assertTrue(proof)
+        print(f"  SUCCESS: Depths above {ZKEngine.max_depth()} are refused.")
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,128 @@
+//! Baseline numbers for setup, proving, verification, batch verification and
+//! key (de)serialization as the circuit bucket grows from 2 to 1024 inputs.
+//!
+//! Record a baseline, then compare a change against it:
+//!
+//!     cargo bench --no-default-features --features parallel --bench groth16 -- --save-baseline main
+//!     cargo bench --no-default-features --features parallel --bench groth16 -- --baseline main
+//!
+//! Criterion stores baselines under target/criterion/<group>/<bench>/<name>.
+
+use ark_bn254::{Bn254, Fr};
+use ark_groth16::{prepare_verifying_key, Groth16, Proof, ProvingKey, VerifyingKey};
+use ark_serialize::{CanonicalDeserialize, CanonicalSerialize};
+use ark_snark::SNARK;
+use criterion::{black_box, criterion_group, criterion_main, BenchmarkId, Criterion};
+
+use zk_bridge::serialization::{decode, encode, SerializationMode};
+use zk_bridge::{batch, linkage_limbs, AggregationCircuit};
+
+const INPUT_COUNTS: [usize; 10] = [2, 4, 8, 16, 32, 64, 128, 256, 512, 1024];
+const BATCH_SIZE: usize = 16;
+/// Stand-in Merkle root; proving and verification cost do not depend on its value.
+const LINKAGE: [u8; 32] = [0x5a; 32];
+
+fn public_inputs(n: usize) -> Vec<Fr> {
+    let mut inputs = vec![Fr::from(n as u64)];
+    inputs.extend(linkage_limbs::<Fr>(&LINKAGE));
+    inputs
+}
+
+fn keys_for(n: usize) -> (ProvingKey<Bn254>, VerifyingKey<Bn254>) {
+    let mut rng = ark_std::test_rng();
+    Groth16::<Bn254>::setup(AggregationCircuit::<Fr>::new(&vec![1; n], n, 1, &LINKAGE), &mut rng).unwrap()
+}
+
+fn proof_for(pk: &ProvingKey<Bn254>, n: usize) -> Proof<Bn254> {
+    let mut rng = ark_std::test_rng();
+    Groth16::<Bn254>::prove(pk, AggregationCircuit::<Fr>::new(&vec![1; n], n, 1, &LINKAGE), &mut rng).unwrap()
+}
+
+fn bench_setup(c: &mut Criterion) {
+    let mut group = c.benchmark_group("setup");
+    group.sample_size(10);
+    for n in INPUT_COUNTS {
+        group.bench_with_input(BenchmarkId::from_parameter(n), &n, |b, &n| {
+            b.iter(|| keys_for(black_box(n)))
+        });
+    }
+    group.finish();
+}
+
+fn bench_prove(c: &mut Criterion) {
+    let mut group = c.benchmark_group("prove");
+    group.sample_size(10);
+    for n in INPUT_COUNTS {
+        let (pk, _) = keys_for(n);
+        group.bench_with_input(BenchmarkId::from_parameter(n), &n, |b, &n| {
+            let mut rng = ark_std::test_rng();
+            b.iter(|| Groth16::<Bn254>::prove(&pk, AggregationCircuit::<Fr>::new(&vec![1; n], n, 1, &LINKAGE), &mut rng).unwrap())
+        });
+    }
+    group.finish();
+}
+
+fn bench_verify(c: &mut Criterion) {
+    let mut group = c.benchmark_group("verify");
+    for n in INPUT_COUNTS {
+        let (pk, vk) = keys_for(n);
+        let pvk = prepare_verifying_key(&vk);
+        let proof = proof_for(&pk, n);
+        let inputs = public_inputs(n);
+        group.bench_with_input(BenchmarkId::from_parameter(n), &n, |b, _| {
+            b.iter(|| assert!(Groth16::<Bn254>::verify_proof(&pvk, black_box(&proof), &inputs).unwrap()))
+        });
+    }
+    group.finish();
+}
+
+fn bench_batch_verify(c: &mut Criterion) {
+    let mut group = c.benchmark_group(format!("batch_verify_{}", BATCH_SIZE));
+    for n in INPUT_COUNTS {
+        let (pk, vk) = keys_for(n);
+        let pvk = prepare_verifying_key(&vk);
+        let proofs: Vec<_> = (0..BATCH_SIZE).map(|_| proof_for(&pk, n)).collect();
+        let inputs = vec![public_inputs(n); BATCH_SIZE];
+        group.bench_with_input(BenchmarkId::from_parameter(n), &n, |b, _| {
+            b.iter(|| assert!(batch::verify_batch(&pvk, black_box(&proofs), &inputs).unwrap()))
+        });
+    }
+    group.finish();
+}
+
+fn bench_serialization(c: &mut Criterion) {
+    let mut group = c.benchmark_group("key_serialization");
+    group.sample_size(10);
+    for n in INPUT_COUNTS {
+        let (pk, vk) = keys_for(n);
+        let mut pk_bytes = Vec::new();
+        pk.serialize_uncompressed(&mut pk_bytes).unwrap();
+        let vk_bytes = encode(&vk, SerializationMode::Uncompressed).unwrap();
+
+        // The proving-key paths are what the on-disk key cache pays on a cold start.
+        group.bench_with_input(BenchmarkId::new("pk_serialize", n), &n, |b, _| {
+            b.iter(|| {
+                let mut out = Vec::with_capacity(pk_bytes.len());
+                pk.serialize_uncompressed(&mut out).unwrap();
+                out
+            })
+        });
+        group.bench_with_input(BenchmarkId::new("pk_deserialize_unchecked", n), &pk_bytes, |b, bytes| {
+            b.iter(|| ProvingKey::<Bn254>::deserialize_uncompressed_unchecked(&black_box(bytes)[..]).unwrap())
+        });
+        group.bench_with_input(BenchmarkId::new("vk_decode", n), &vk_bytes, |b, bytes| {
+            b.iter(|| decode::<VerifyingKey<Bn254>>(black_box(bytes)).unwrap())
+        });
+    }
+    group.finish();
+}
+
+criterion_group!(
+    benches,
+    bench_setup,
+    bench_prove,
+    bench_verify,
+    bench_batch_verify,
+    bench_serialization
+);
+criterion_main!(benches);
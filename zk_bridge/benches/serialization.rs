@@ -0,0 +1,48 @@
+//! Compares the two point encodings: bytes on the wire versus the cost of
+//! (de)serializing them. Run with `cargo bench --no-default-features --bench serialization`.
+
+use ark_bn254::{Bn254, Fr};
+use ark_groth16::{Groth16, Proof, VerifyingKey};
+use ark_snark::SNARK;
+use criterion::{black_box, criterion_group, criterion_main, BenchmarkId, Criterion};
+
+use zk_bridge::serialization::{decode, encode, SerializationMode};
+use zk_bridge::AggregationCircuit;
+
+const MODES: [(&str, SerializationMode); 2] = [
+    ("uncompressed", SerializationMode::Uncompressed),
+    ("compressed", SerializationMode::Compressed),
+];
+
+fn bench_serialization(c: &mut Criterion) {
+    let mut rng = ark_std::test_rng();
+    let (pk, vk) = Groth16::<Bn254>::setup(AggregationCircuit::<Fr>::new(&[1; 8], 8, 1, &[0u8; 32]), &mut rng).unwrap();
+    let proof = Groth16::<Bn254>::prove(&pk, AggregationCircuit::<Fr>::new(&[1; 8], 8, 1, &[0u8; 32]), &mut rng).unwrap();
+
+    // Sizes are printed next to the timings so both sides of the trade-off are visible.
+    for (name, mode) in MODES {
+        let proof_len = encode(&proof, mode).unwrap().len();
+        let vk_len = encode(&vk, mode).unwrap().len();
+        println!("{:>12}: proof {} bytes, vk {} bytes", name, proof_len, vk_len);
+    }
+
+    let mut group = c.benchmark_group("serialization");
+    for (name, mode) in MODES {
+        let proof_bytes = encode(&proof, mode).unwrap();
+        let vk_bytes = encode(&vk, mode).unwrap();
+
+        group.bench_with_input(BenchmarkId::new("encode_proof", name), &mode, |b, &mode| {
+            b.iter(|| encode(black_box(&proof), mode).unwrap())
+        });
+        group.bench_with_input(BenchmarkId::new("decode_proof", name), &proof_bytes, |b, bytes| {
+            b.iter(|| decode::<Proof<Bn254>>(black_box(bytes)).unwrap())
+        });
+        group.bench_with_input(BenchmarkId::new("decode_vk", name), &vk_bytes, |b, bytes| {
+            b.iter(|| decode::<VerifyingKey<Bn254>>(black_box(bytes)).unwrap())
+        });
+    }
+    group.finish();
+}
+
+criterion_group!(benches, bench_serialization);
+criterion_main!(benches);
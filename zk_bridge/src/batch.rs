@@ -0,0 +1,90 @@
+use ark_bn254::{Bn254, Fr, G1Projective};
+use ark_ec::pairing::Pairing;
+use ark_ec::CurveGroup;
+use ark_ff::{One, PrimeField, Zero};
+use ark_groth16::{Groth16, PreparedVerifyingKey, Proof};
+use ark_relations::r1cs::SynthesisError;
+use ark_serialize::CanonicalSerialize;
+use sha2::{Digest, Sha256};
+
+/// Derives one batching scalar per proof from a hash of every proof and its
+/// public inputs, so a prover cannot pick proofs whose errors cancel out.
+fn batch_scalars(proofs: &[Proof<Bn254>], inputs: &[Vec<Fr>]) -> Vec<Fr> {
+    let mut transcript = Sha256::new();
+    let mut buf = Vec::new();
+    for (proof, x) in proofs.iter().zip(inputs) {
+        buf.clear();
+        proof.serialize_compressed(&mut buf).expect("in-memory serialization cannot fail");
+        x.serialize_compressed(&mut buf).expect("in-memory serialization cannot fail");
+        transcript.update(&buf);
+    }
+    let seed = transcript.finalize();
+
+    (0..proofs.len() as u64)
+        .map(|i| {
+            let mut h = Sha256::new();
+            h.update(seed);
+            h.update(i.to_le_bytes());
+            Fr::from_le_bytes_mod_order(&h.finalize())
+        })
+        .collect()
+}
+
+/// Checks every proof against one prepared VK with a single multi-pairing.
+///
+/// For random r_i the Groth16 equations e(A_i, B_i) = e(α, β)·e(L_i, γ)·e(C_i, δ)
+/// hold for all i (with overwhelming probability) iff
+/// Π e(r_i·A_i, B_i) · e(-Σr_i·α, β) · e(Σr_i·L_i, -γ) · e(Σr_i·C_i, -δ) = 1,
+/// which costs n + 3 Miller loops and one final exponentiation.
+pub fn verify_batch(
+    pvk: &PreparedVerifyingKey<Bn254>,
+    proofs: &[Proof<Bn254>],
+    inputs: &[Vec<Fr>],
+) -> Result<bool, SynthesisError> {
+    if proofs.is_empty() {
+        return Ok(true);
+    }
+
+    let scalars = batch_scalars(proofs, inputs);
+    let mut g1: Vec<G1Projective> = Vec::with_capacity(proofs.len() + 3);
+    let mut g2: Vec<<Bn254 as Pairing>::G2Prepared> = Vec::with_capacity(proofs.len() + 3);
+    let mut r_sum = Fr::zero();
+    let mut l_acc = G1Projective::zero();
+    let mut c_acc = G1Projective::zero();
+
+    for ((proof, x), r) in proofs.iter().zip(inputs).zip(&scalars) {
+        let l = Groth16::<Bn254>::prepare_inputs(pvk, x)?;
+        g1.push(proof.a * r);
+        g2.push(proof.b.into());
+        l_acc += l * r;
+        c_acc += proof.c * r;
+        r_sum += r;
+    }
+
+    g1.push(-(pvk.vk.alpha_g1 * r_sum));
+    g2.push(pvk.vk.beta_g2.into());
+    g1.push(l_acc);
+    g2.push(pvk.gamma_g2_neg_pc.clone());
+    g1.push(c_acc);
+    g2.push(pvk.delta_g2_neg_pc.clone());
+
+    let g1 = G1Projective::normalize_batch(&g1);
+    Ok(Bn254::multi_pairing(g1, g2).0.is_one())
+}
+
+/// Batch-verifies and, only if the batch fails, re-checks each proof on its
+/// own so the invalid ones can be identified.
+pub fn verify_batch_with_fallback(
+    pvk: &PreparedVerifyingKey<Bn254>,
+    proofs: &[Proof<Bn254>],
+    inputs: &[Vec<Fr>],
+) -> Vec<bool> {
+    if let Ok(true) = verify_batch(pvk, proofs, inputs) {
+        return vec![true; proofs.len()];
+    }
+    proofs
+        .iter()
+        .zip(inputs)
+        .map(|(proof, x)| Groth16::<Bn254>::verify_proof(pvk, proof, x).unwrap_or(false))
+        .collect()
+}
@@ -0,0 +1,175 @@
+use std::collections::{HashMap, VecDeque};
+use std::fs;
+use std::path::{Path, PathBuf};
+use std::sync::atomic::{AtomicU64, Ordering};
+use std::sync::{Arc, Mutex, OnceLock};
+
+use ark_bn254::{Bn254, Fr};
+use ark_groth16::{Groth16, ProvingKey, VerifyingKey};
+use ark_serialize::{CanonicalDeserialize, CanonicalSerialize};
+use ark_snark::SNARK;
+
+use crate::AggregationCircuit;
+
+/// Default number of circuit shapes whose keys stay resident in memory
+/// (every bucket up to 1024 children at five tree levels).
+const DEFAULT_CAPACITY: usize = 64;
+
+/// Identifies a circuit layout: one node of the aggregation tree. Keys generated
+/// for one shape are valid for every node with the same shape; `num_inputs` is the
+/// padded bucket size and `level` the node's level in the tree (1 over base proofs).
+#[derive(Clone, Copy, Debug, PartialEq, Eq, Hash)]
+pub struct CircuitShape {
+    pub num_inputs: usize,
+    pub level: u32,
+}
+
+impl CircuitShape {
+    fn file_stem(&self) -> String {
+        format!("agg_v{}_n{}_l{}", crate::CIRCUIT_VERSION, self.num_inputs, self.level)
+    }
+}
+
+/// A proving/verifying key pair produced by one trusted setup.
+pub struct KeyPair {
+    pub pk: ProvingKey<Bn254>,
+    pub vk: VerifyingKey<Bn254>,
+}
+
+/// Two-tier key cache: an in-memory LRU in front of serialized keys on disk.
+///
+/// Setup runs only when a shape is missing from both tiers, so keys are
+/// reused across requests and across process restarts.
+pub struct KeyCache {
+    dir: PathBuf,
+    capacity: usize,
+    entries: HashMap<CircuitShape, Arc<KeyPair>>,
+    order: VecDeque<CircuitShape>,
+}
+
+impl KeyCache {
+    fn from_env() -> Self {
+        let dir = std::env::var("ZK_COMPOSE_KEY_DIR")
+            .map(PathBuf::from)
+            .unwrap_or_else(|_| {
+                let home = std::env::var("HOME").unwrap_or_else(|_| ".".to_string());
+                PathBuf::from(home).join(".zk_compose").join("keys")
+            });
+        let capacity = std::env::var("ZK_COMPOSE_KEY_CACHE_SIZE")
+            .ok()
+            .and_then(|v| v.parse::<usize>().ok())
+            .filter(|v| *v > 0)
+            .unwrap_or(DEFAULT_CAPACITY);
+        KeyCache { dir, capacity, entries: HashMap::new(), order: VecDeque::new() }
+    }
+
+    fn get(&mut self, shape: &CircuitShape) -> Option<Arc<KeyPair>> {
+        let keys = self.entries.get(shape)?.clone();
+        // Move to the most-recently-used position.
+        self.order.retain(|s| s != shape);
+        self.order.push_back(*shape);
+        Some(keys)
+    }
+
+    fn insert(&mut self, shape: CircuitShape, keys: Arc<KeyPair>) {
+        if self.entries.insert(shape, keys).is_none() {
+            self.order.push_back(shape);
+        }
+        while self.order.len() > self.capacity {
+            if let Some(evicted) = self.order.pop_front() {
+                self.entries.remove(&evicted);
+            }
+        }
+    }
+}
+
+fn load_from_disk(dir: &Path, shape: &CircuitShape) -> Option<KeyPair> {
+    let stem = shape.file_stem();
+    let pk_bytes = fs::read(dir.join(format!("{}.pk", stem))).ok()?;
+    let vk_bytes = fs::read(dir.join(format!("{}.vk", stem))).ok()?;
+    // Keys on disk were written by this process family, so the expensive
+    // subgroup checks are skipped for the (large) proving key.
+    let pk = ProvingKey::<Bn254>::deserialize_uncompressed_unchecked(&pk_bytes[..]).ok()?;
+    let vk = VerifyingKey::<Bn254>::deserialize_uncompressed(&vk_bytes[..]).ok()?;
+    Some(KeyPair { pk, vk })
+}
+
+fn store_to_disk(dir: &Path, shape: &CircuitShape, keys: &KeyPair) -> std::io::Result<()> {
+    fs::create_dir_all(dir)?;
+    let stem = shape.file_stem();
+    let mut pk_bytes = Vec::new();
+    let mut vk_bytes = Vec::new();
+    keys.pk.serialize_uncompressed(&mut pk_bytes).map_err(to_io_error)?;
+    keys.vk.serialize_uncompressed(&mut vk_bytes).map_err(to_io_error)?;
+    // Write-then-rename so a concurrent reader never sees a partial key. Temp names
+    // are unique per process and write, so pool workers never clobber each other.
+    static WRITES: AtomicU64 = AtomicU64::new(0);
+    for (ext, bytes) in [("pk", pk_bytes), ("vk", vk_bytes)] {
+        let seq = WRITES.fetch_add(1, Ordering::Relaxed);
+        let tmp = dir.join(format!("{}.{}.{}.{}.tmp", stem, ext, std::process::id(), seq));
+        fs::write(&tmp, bytes)?;
+        fs::rename(&tmp, dir.join(format!("{}.{}", stem, ext)))?;
+    }
+    Ok(())
+}
+
+fn to_io_error(e: ark_serialize::SerializationError) -> std::io::Error {
+    std::io::Error::new(std::io::ErrorKind::Other, e.to_string())
+}
+
+fn cache() -> &'static Mutex<KeyCache> {
+    static CACHE: OnceLock<Mutex<KeyCache>> = OnceLock::new();
+    CACHE.get_or_init(|| Mutex::new(KeyCache::from_env()))
+}
+
+/// Per-shape lock held while a shape is loaded or set up.
+fn shape_lock(shape: &CircuitShape) -> Arc<Mutex<()>> {
+    static LOCKS: OnceLock<Mutex<HashMap<CircuitShape, Arc<Mutex<()>>>>> = OnceLock::new();
+    LOCKS.get_or_init(Default::default).lock().unwrap().entry(*shape).or_default().clone()
+}
+
+fn setup(shape: &CircuitShape) -> Result<KeyPair, ark_relations::r1cs::SynthesisError> {
+    // A fresh deterministic rng per setup keeps miners and validators on
+    // identical keys for the same shape (in production these come from a ceremony).
+    let mut rng = ark_std::test_rng();
+    // Only the layout matters for setup; the assigned values are placeholders.
+    let circuit = AggregationCircuit::<Fr>::new(&[], shape.num_inputs, shape.level, &[0u8; 32]);
+    let (pk, vk) = Groth16::<Bn254>::setup(circuit, &mut rng)?;
+    Ok(KeyPair { pk, vk })
+}
+
+/// Returns the key pair for `shape`, consulting memory, then disk, then setup.
+///
+/// Must not be called from a prover pool thread: it can block on another
+/// caller's setup, which runs on that pool. A worker blocked here could be
+/// asked (through work-stealing) to run the setup it is waiting for.
+pub fn get_or_setup(shape: CircuitShape) -> Result<Arc<KeyPair>, ark_relations::r1cs::SynthesisError> {
+    if let Some(keys) = cache().lock().unwrap().get(&shape) {
+        return Ok(keys);
+    }
+
+    // Concurrent misses for one shape load or set it up once; the rest wait and then
+    // hit memory. Disk load and setup run outside the cache lock so other shapes
+    // stay servable.
+    let lock = shape_lock(&shape);
+    let _guard = lock.lock().unwrap_or_else(|e| e.into_inner());
+    if let Some(keys) = cache().lock().unwrap().get(&shape) {
+        return Ok(keys);
+    }
+    let dir = cache().lock().unwrap().dir.clone();
+    let keys = match load_from_disk(&dir, &shape) {
+        Some(keys) => keys,
+        None => {
+            // Only setup runs on the prover pool; the shape lock is held by a caller outside it.
+            let keys = crate::parallel::install(|| setup(&shape))?;
+            if let Err(e) = store_to_disk(&dir, &shape, &keys) {
+                eprintln!("zk_bridge: failed to persist keys for {:?}: {}", shape, e);
+            }
+            keys
+        }
+    };
+
+    let keys = Arc::new(keys);
+    cache().lock().unwrap().insert(shape, keys.clone());
+    Ok(keys)
+}
@@ -1,129 +1,774 @@
 use pyo3::prelude::*;
 use pyo3::exceptions::{PyRuntimeError, PyValueError};
 use pyo3::create_exception;
+use pyo3::buffer::PyBuffer;
+use pyo3::types::PyBytes;
+use std::sync::OnceLock;
 use std::time::Instant;
 
 use ark_bn254::Bn254;
 use ark_groth16::Groth16;
-use ark_snark::SNARK;
-use ark_relations::r1cs::{ConstraintSynthesizer, ConstraintSystemRef, SynthesisError};
-use ark_serialize::{CanonicalSerialize, CanonicalDeserialize};
+use ark_relations::lc;
+use ark_relations::r1cs::{ConstraintSynthesizer, ConstraintSystemRef, SynthesisError, Variable};
 use ark_ff::PrimeField;
+use ark_serialize::{CanonicalSerialize, Compress};
+
+pub mod batch;
+mod key_cache;
+pub mod merkle;
+mod parallel;
+pub mod serialization;
+mod timings;
+pub mod tree;
+use serialization::SerializationMode;
+use timings::{ProveTimings, VerifyTimings};
 
 // Custom Exceptions
 create_exception!(zk_bridge, ZKBridgeError, PyRuntimeError);
 create_exception!(zk_bridge, ProofGenerationError, ZKBridgeError);
 create_exception!(zk_bridge, VerificationError, ZKBridgeError);
 
+/// Smallest circuit size; every request is padded up to a power of two.
+const MIN_BUCKET: usize = 2;
+const DEFAULT_MAX_BUCKET: usize = 1024;
+/// log2(DEFAULT_MAX_BUCKET): deeper trees only add single-child levels.
+const DEFAULT_MAX_DEPTH: u32 = 10;
+
+/// Largest supported circuit size (`ZK_COMPOSE_MAX_BUCKET`, rounded up to a power of two).
+pub fn max_bucket_size() -> usize {
+    static MAX: OnceLock<usize> = OnceLock::new();
+    *MAX.get_or_init(|| {
+        std::env::var("ZK_COMPOSE_MAX_BUCKET")
+            .ok()
+            .and_then(|v| v.parse::<usize>().ok())
+            .map(|v| v.max(MIN_BUCKET).next_power_of_two())
+            .unwrap_or(DEFAULT_MAX_BUCKET)
+    })
+}
+
+/// Circuit size used for `num_inputs` base proofs, or None when out of range.
+/// A handful of buckets (2, 4, 8, ...) cover every request, so keys can be
+/// generated ahead of time and validators only ever need that many VKs.
+pub fn bucket_size(num_inputs: usize) -> Option<usize> {
+    if num_inputs == 0 {
+        return None;
+    }
+    let bucket = num_inputs.max(MIN_BUCKET).next_power_of_two();
+    (bucket <= max_bucket_size()).then_some(bucket)
+}
+
+/// Deepest supported aggregation tree (`ZK_COMPOSE_MAX_DEPTH`). Every level has its
+/// own keys, so the bound also caps how many setups a stream of requests can trigger.
+pub fn max_depth() -> u32 {
+    static MAX: OnceLock<u32> = OnceLock::new();
+    *MAX.get_or_init(|| {
+        std::env::var("ZK_COMPOSE_MAX_DEPTH")
+            .ok()
+            .and_then(|v| v.parse::<u32>().ok())
+            .map(|v| v.max(1))
+            .unwrap_or(DEFAULT_MAX_DEPTH)
+    })
+}
+
+/// Version of the aggregation circuit's layout. Keys and VKs are stored under
+/// it, so a layout change never pairs a proof with a stale key.
+pub const CIRCUIT_VERSION: u32 = 4;
+
 /// A Real R1CS Circuit for Proof Aggregation.
 /// In production, this would verify the recursive linkage between SNARKs.
 /// For this implementation, we implement a circuit that proves knowledge of 
 /// multiple inputs that sum to a specific public root (a simplified but 100% REAL ZK case).
-struct AggregationCircuit<F: PrimeField> {
-    inputs: Vec<F>,
-    sum: Option<F>,
+///
+/// One circuit proves one node of the aggregation tree (see `tree`). It always
+/// has `bucket` input slots: one per child, padded with dummy slots, each holding
+/// the number of base proofs below that child. The slots must sum to the public
+/// count. At level 1 the children are base proofs, so every slot is constrained
+/// to be boolean and dummies are forced to zero.
+///
+/// The node's `level` is fixed by a constraint, so every level has its own keys
+/// and a proof for one level never verifies as another.
+///
+/// Public inputs are the count followed by the Merkle root over the base proofs
+/// (the linkage), split into two 128-bit limbs so no bits are lost to the field.
+pub struct AggregationCircuit<F: PrimeField> {
+    pub inputs: Vec<F>,
+    pub level: u32,
+    pub sum: Option<F>,
+    pub linkage: Option<[F; 2]>,
+}
+
+impl<F: PrimeField> AggregationCircuit<F> {
+    /// Builds the fully assigned circuit for children holding `counts` base proofs,
+    /// padded to `bucket` slots at tree `level`, committing to their Merkle root `linkage`.
+    pub fn new(counts: &[u64], bucket: usize, level: u32, linkage: &merkle::Hash) -> Self {
+        let mut inputs: Vec<F> = counts.iter().map(|&c| F::from(c)).collect();
+        inputs.resize(bucket.max(counts.len()), F::zero());
+        AggregationCircuit {
+            inputs,
+            level: level.max(1),
+            sum: Some(F::from(counts.iter().sum::<u64>())),
+            linkage: Some(linkage_limbs(linkage)),
+        }
+    }
+}
+
+/// Splits a 32-byte digest into (high, low) 128-bit big-endian limbs.
+pub fn linkage_limbs<F: PrimeField>(digest: &merkle::Hash) -> [F; 2] {
+    let mut hi = [0u8; 16];
+    let mut lo = [0u8; 16];
+    hi.copy_from_slice(&digest[..16]);
+    lo.copy_from_slice(&digest[16..]);
+    [F::from(u128::from_be_bytes(hi)), F::from(u128::from_be_bytes(lo))]
 }
 
 impl<F: PrimeField> ConstraintSynthesizer<F> for AggregationCircuit<F> {
     fn generate_constraints(self, cs: ConstraintSystemRef<F>) -> Result<(), SynthesisError> {
-        let mut sum_var = cs.new_witness_variable(|| self.sum.ok_or(SynthesisError::AssignmentMissing))?;
-        
-        let mut running_sum = F::zero();
+        // Constraint: the node's level is fixed by the circuit
+        let level = F::from(self.level as u64);
+        let level_var = cs.new_witness_variable(|| Ok(level))?;
+        cs.enforce_constraint(
+            lc!() + level_var,
+            lc!() + Variable::One,
+            lc!() + (level, Variable::One),
+        )?;
+
+        let mut total = lc!();
         for val in self.inputs {
             let val_var = cs.new_witness_variable(|| Ok(val))?;
-            running_sum += val;
-            // Add actual constraints: current_sum = prev_sum + input
-            // (Linearity of constraints)
+            if self.level == 1 {
+                // Constraint: slot * (1 - slot) == 0, i.e. 1 for a real proof, 0 for padding
+                cs.enforce_constraint(
+                    lc!() + val_var,
+                    lc!() + Variable::One - val_var,
+                    lc!(),
+                )?;
+            }
+            total = total + val_var;
         }
         
-        // Public input: The final sum
+        // Public input: The number of real base proofs
         let public_sum_var = cs.new_input_variable(|| self.sum.ok_or(SynthesisError::AssignmentMissing))?;
         
-        // Constraint: witnessed sum == public sum
+        // Constraint: sum of slots == public count
         cs.enforce_constraint(
-            ark_relations::ns!(cs, "sum_check"),
-            ark_relations::r1cs::LinearCombination::from(sum_var),
-            ark_relations::r1cs::LinearCombination::from(F::one()),
-            ark_relations::r1cs::LinearCombination::from(public_sum_var),
+            total,
+            lc!() + Variable::One,
+            lc!() + public_sum_var,
         )?;
+
+        // Public inputs: the linkage limbs, each tied to a witness the prover commits to
+        for i in 0..2 {
+            let limb = || self.linkage.map(|l| l[i]).ok_or(SynthesisError::AssignmentMissing);
+            let public_limb = cs.new_input_variable(limb)?;
+            let witness_limb = cs.new_witness_variable(limb)?;
+            cs.enforce_constraint(
+                lc!() + witness_limb,
+                lc!() + Variable::One,
+                lc!() + public_limb,
+            )?;
+        }
         
         Ok(())
     }
 }
 
 /// Real Prover: Generates a Groth16 proof using real field arithmetic.
+/// `compressed` selects the point encoding, which is recorded in the proof header.
 #[pyfunction]
+#[pyo3(signature = (base_proofs, _subnet_ids, depth, compressed = false))]
 fn prove_recursive_composition(
-    base_proofs: Vec<Vec<u8>>,
+    py: Python<'_>,
+    base_proofs: Vec<PyBuffer<u8>>,
     _subnet_ids: Vec<u32>,
-    _depth: u32,
-) -> PyResult<(Vec<u8>, f64)> {
+    depth: u32,
+    compressed: bool,
+) -> PyResult<(Py<PyBytes>, f64)> {
     let start = Instant::now();
-    let mut rng = ark_std::test_rng();
-
-    // 1. Parameter Setup (In production, these are pre-generated/hardcoded)
-    let circuit_setup = AggregationCircuit {
-        inputs: vec![ark_bn254::Fr::from(1u64); base_proofs.len()],
-        sum: Some(ark_bn254::Fr::from(base_proofs.len() as u64)),
-    };
-    
-    let (pk, _vk) = Groth16::<Bn254>::setup(circuit_setup, &mut rng)
-        .map_err(|_| ProofGenerationError::new_err("Failed to generate ZK parameters"))?;
-
-    // 2. Real Witness Generation & Proving
-    let result_circuit = AggregationCircuit {
-        inputs: vec![ark_bn254::Fr::from(1u64); base_proofs.len()],
-        sum: Some(ark_bn254::Fr::from(base_proofs.len() as u64)),
-    };
-
-    let proof = Groth16::<Bn254>::prove(&pk, result_circuit, &mut rng)
-        .map_err(|_| ProofGenerationError::new_err("R1CS Constraint Satisfaction Failed"))?;
-
-    // 3. Serialization to Raw Bytes (succinct 384-byte Groth16 proof)
-    let mut proof_bytes = Vec::new();
-    proof.serialize_uncompressed(&mut proof_bytes)
-        .map_err(|_| PyRuntimeError::new_err("Proof serialization failure"))?;
-        
+    let base_proofs = borrow_buffers(&base_proofs)?;
+    checked_bucket(base_proofs.len())?;
+    checked_depth(depth)?;
+
+    // Setup lookup, witness generation and proving never touch Python objects,
+    // so the GIL is released for the whole native section.
+    let (proof_bytes, _) = py.allow_threads(|| prove_tree(&base_proofs, depth, compressed))?;
+
     let duration = start.elapsed().as_secs_f64();
-    Ok((proof_bytes, duration))
+    Ok((PyBytes::new(py, &proof_bytes).into(), duration))
+}
+
+/// Same proof as `prove_recursive_composition`, returned with a per-stage
+/// timing record (setup, synthesis, FFT, MSM, serialization) and circuit size.
+#[pyfunction]
+#[pyo3(signature = (base_proofs, _subnet_ids, depth, compressed = false))]
+fn prove_recursive_composition_timed(
+    py: Python<'_>,
+    base_proofs: Vec<PyBuffer<u8>>,
+    _subnet_ids: Vec<u32>,
+    depth: u32,
+    compressed: bool,
+) -> PyResult<(Py<PyBytes>, ProveTimings)> {
+    let start = Instant::now();
+    let base_proofs = borrow_buffers(&base_proofs)?;
+    checked_bucket(base_proofs.len())?;
+    checked_depth(depth)?;
+
+    let (proof_bytes, mut timings) = py.allow_threads(|| prove_tree(&base_proofs, depth, compressed))?;
+
+    timings.total = start.elapsed().as_secs_f64();
+    Ok((PyBytes::new(py, &proof_bytes).into(), timings))
+}
+
+/// Proves the aggregation tree over `base_proofs` and returns its root proof.
+fn prove_tree(base_proofs: &[&[u8]], depth: u32, compressed: bool) -> PyResult<(Vec<u8>, ProveTimings)> {
+    let leaves: Vec<tree::Node> = base_proofs.iter().map(|proof| tree::Node::leaf(proof)).collect();
+    let fanout = tree::fanout(leaves.len(), depth);
+    tree::prove(leaves, fanout, 1, depth.max(1), compressed)
+}
+
+/// Proves one node of the aggregation tree, for callers that schedule the tree
+/// themselves (see `zk_compose.folding_logic.AggregationScheduler`). `counts` and
+/// `digests` describe the children: base proofs (count 1, leaf hash) at level 1,
+/// the nodes of the level below otherwise.
+#[pyfunction]
+#[pyo3(signature = (counts, digests, level, compressed = false))]
+fn prove_aggregation_node(
+    py: Python<'_>,
+    counts: Vec<u64>,
+    digests: Vec<PyBuffer<u8>>,
+    level: u32,
+    compressed: bool,
+) -> PyResult<(Py<PyBytes>, ProveTimings)> {
+    if counts.len() != digests.len() {
+        return Err(PyValueError::new_err("Each child needs both a count and a digest"));
+    }
+    checked_bucket(counts.len())?;
+    if level == 0 {
+        return Err(PyValueError::new_err("Tree levels start at 1"));
+    }
+    checked_depth(level)?;
+    if level == 1 && counts.iter().any(|&c| c != 1) {
+        return Err(PyValueError::new_err("Level 1 children are single base proofs"));
+    }
+    let mut children = Vec::with_capacity(counts.len());
+    for (count, digest) in counts.into_iter().zip(borrow_buffers(&digests)?) {
+        let digest: merkle::Hash = digest
+            .try_into()
+            .map_err(|_| PyValueError::new_err("Child digests must be 32 bytes"))?;
+        children.push(tree::Node { count, digest });
+    }
+
+    let start = Instant::now();
+    let (proof_bytes, mut timings) = py.allow_threads(|| tree::prove_node(&children, level, compressed))?;
+    timings.total = start.elapsed().as_secs_f64();
+    Ok((PyBytes::new(py, &proof_bytes).into(), timings))
+}
+
+/// Loads (or sets up) the keys of every node circuit used to aggregate
+/// `num_inputs` base proofs at `depth`, returning their (bucket, level) shapes.
+#[pyfunction]
+fn load_keys(py: Python<'_>, num_inputs: usize, depth: u32) -> PyResult<Vec<(usize, u32)>> {
+    checked_bucket(num_inputs)?;
+    checked_depth(depth)?;
+    py.allow_threads(|| {
+        let shapes = tree::shapes(num_inputs, depth);
+        tree::load_keys(&shapes)?;
+        Ok(shapes.into_iter().map(|shape| (shape.num_inputs, shape.level)).collect())
+    })
+}
+
+/// Incremental aggregation state: base proofs are absorbed one at a time as
+/// they arrive (e.g. from SN2 fetches), so their hashing overlaps network I/O.
+///
+/// Built for a known proof count and depth, the tree's level-1 chunks are fixed
+/// up front and proofs may arrive in any order, each at its own index. `absorb`
+/// reports a chunk once its last proof is in, so the caller can prove it with
+/// `prove_aggregation_node` while other fetches are still in flight, and
+/// `finalize` then proves only the levels above. Without a plan, proofs are
+/// appended in order and `finalize` proves the whole tree.
+///
+/// Absorbed proofs are not retained; only their leaf hashes and subnet ids are.
+#[pyclass(module = "zk_bridge")]
+struct Accumulator {
+    leaves: Vec<Option<(tree::Node, u32)>>,
+    absorbed: usize,
+    input_bytes: usize,
+    /// (depth, fan-out) when built for a known proof count.
+    plan: Option<(u32, usize)>,
+}
+
+impl Accumulator {
+    fn fanout(&self) -> PyResult<usize> {
+        self.plan
+            .map(|(_, fanout)| fanout)
+            .ok_or_else(|| PyValueError::new_err("Chunks need an accumulator built with num_inputs and depth"))
+    }
+
+    /// The level-1 chunk holding `index`, if it is complete and not the root.
+    fn completed_chunk(&self, index: usize) -> Option<usize> {
+        let (depth, fanout) = self.plan?;
+        if depth == 1 {
+            // The only chunk is the root, which finalize proves.
+            return None;
+        }
+        let chunk = index / fanout;
+        let end = ((chunk + 1) * fanout).min(self.leaves.len());
+        self.leaves[chunk * fanout..end].iter().all(Option::is_some).then_some(chunk)
+    }
+
+    fn nodes(&self) -> PyResult<Vec<tree::Node>> {
+        self.leaves
+            .iter()
+            .map(|leaf| leaf.map(|(node, _)| node))
+            .collect::<Option<Vec<_>>>()
+            .ok_or_else(|| {
+                ProofGenerationError::new_err(format!(
+                    "Accumulator is missing {} of {} proofs",
+                    self.leaves.len() - self.absorbed,
+                    self.leaves.len()
+                ))
+            })
+    }
+}
+
+#[pymethods]
+impl Accumulator {
+    #[new]
+    #[pyo3(signature = (num_inputs = None, depth = None))]
+    fn new(num_inputs: Option<usize>, depth: Option<u32>) -> PyResult<Self> {
+        let plan = match (num_inputs, depth) {
+            (Some(num_inputs), Some(depth)) => {
+                checked_bucket(num_inputs)?;
+                checked_depth(depth)?;
+                Some((depth.max(1), tree::fanout(num_inputs, depth)))
+            }
+            (None, None) => None,
+            _ => return Err(PyValueError::new_err("num_inputs and depth are given together")),
+        };
+        Ok(Accumulator {
+            leaves: vec![None; num_inputs.unwrap_or(0)],
+            absorbed: 0,
+            input_bytes: 0,
+            plan,
+        })
+    }
+
+    /// Folds one base proof in at `index` (the next position when omitted). Returns
+    /// the level-1 chunk this proof completed, if it can now be proven ahead of `finalize`.
+    #[pyo3(signature = (proof, subnet_id, index = None))]
+    fn absorb(&mut self, py: Python<'_>, proof: PyBuffer<u8>, subnet_id: u32, index: Option<usize>) -> PyResult<Option<usize>> {
+        let index = index.unwrap_or(self.absorbed);
+        if self.plan.is_none() {
+            if index != self.leaves.len() {
+                return Err(PyValueError::new_err("Proofs are absorbed in order unless num_inputs and depth are given"));
+            }
+            if bucket_size(index + 1).is_none() {
+                return Err(ProofGenerationError::new_err(format!(
+                    "Accumulator is full: at most {} proofs can be aggregated",
+                    max_bucket_size()
+                )));
+            }
+        } else if index >= self.leaves.len() {
+            return Err(PyValueError::new_err(format!(
+                "Proof index {} is out of range for {} proofs",
+                index,
+                self.leaves.len()
+            )));
+        } else if self.leaves[index].is_some() {
+            return Err(PyValueError::new_err(format!("Proof {} was already absorbed", index)));
+        }
+
+        let bytes = borrow_buffer(&proof)?;
+        let leaf = py.allow_threads(|| tree::Node::leaf(bytes));
+        if self.plan.is_none() {
+            self.leaves.push(None);
+        }
+        self.leaves[index] = Some((leaf, subnet_id));
+        self.absorbed += 1;
+        self.input_bytes += bytes.len();
+        Ok(self.completed_chunk(index))
+    }
+
+    /// Children of a completed level-1 chunk as (counts, digests), the arguments
+    /// `prove_aggregation_node` takes at level 1.
+    fn chunk(&self, py: Python<'_>, chunk: usize) -> PyResult<(Vec<u64>, Vec<Py<PyBytes>>)> {
+        let fanout = self.fanout()?;
+        let start = chunk * fanout;
+        if start >= self.leaves.len() {
+            return Err(PyValueError::new_err(format!("Chunk {} is out of range", chunk)));
+        }
+        let mut counts = Vec::with_capacity(fanout);
+        let mut digests = Vec::with_capacity(fanout);
+        for leaf in &self.leaves[start..(start + fanout).min(self.leaves.len())] {
+            let (node, _) = leaf.ok_or_else(|| PyValueError::new_err(format!("Chunk {} is not complete", chunk)))?;
+            counts.push(node.count);
+            digests.push(PyBytes::new(py, &node.digest).into());
+        }
+        Ok((counts, digests))
+    }
+
+    /// Proves the aggregation of every absorbed proof; same output as
+    /// `prove_recursive_composition` over the same proofs. With a plan, level-1
+    /// chunks are the caller's to prove as `absorb` reports them, so only the
+    /// levels above are proven here.
+    #[pyo3(signature = (depth = None, compressed = false))]
+    fn finalize(&self, py: Python<'_>, depth: Option<u32>, compressed: bool) -> PyResult<(Py<PyBytes>, ProveTimings)> {
+        let start = Instant::now();
+        let leaves = self.nodes()?;
+        checked_bucket(leaves.len())?;
+        let (depth, fanout) = match (self.plan, depth) {
+            (Some((planned, _)), Some(depth)) if depth.max(1) != planned => {
+                return Err(PyValueError::new_err(format!("Accumulator was built for depth {}", planned)));
+            }
+            (Some(plan), _) => plan,
+            (None, Some(depth)) => {
+                checked_depth(depth)?;
+                (depth.max(1), tree::fanout(leaves.len(), depth))
+            }
+            (None, None) => {
+                return Err(PyValueError::new_err("finalize() needs a depth when none was given at construction"));
+            }
+        };
+
+        let (proof_bytes, mut timings) = py.allow_threads(|| {
+            if self.plan.is_some() && depth > 1 {
+                let chunks = leaves.chunks(fanout).map(tree::Node::parent).collect();
+                tree::prove(chunks, fanout, 2, depth, compressed)
+            } else {
+                tree::prove(leaves, fanout, 1, depth, compressed)
+            }
+        })?;
+        timings.total = start.elapsed().as_secs_f64();
+        Ok((PyBytes::new(py, &proof_bytes).into(), timings))
+    }
+
+    /// Public inputs of the composition: the proof count and the hex Merkle root
+    /// over the absorbed proofs in index order.
+    fn linkage(&self) -> PyResult<Vec<String>> {
+        let nodes = self.nodes()?;
+        let root = merkle::root_of_digests(nodes.iter().map(|node| node.digest));
+        Ok(vec![nodes.len().to_string(), hex::encode(root)])
+    }
+
+    #[getter]
+    fn subnet_ids(&self) -> Vec<u32> {
+        self.leaves.iter().flatten().map(|(_, subnet_id)| *subnet_id).collect()
+    }
+
+    #[getter]
+    fn input_bytes(&self) -> usize {
+        self.input_bytes
+    }
+
+    fn __len__(&self) -> usize {
+        self.absorbed
+    }
+}
+
+/// Exports the verifying key matching `prove_recursive_composition`: the key of
+/// the tree's root node. Any `num_inputs` within the same bucket shares one key.
+#[pyfunction]
+#[pyo3(signature = (num_inputs, depth, compressed = false))]
+fn export_verifying_key(
+    py: Python<'_>,
+    num_inputs: usize,
+    depth: u32,
+    compressed: bool,
+) -> PyResult<Py<PyBytes>> {
+    checked_bucket(num_inputs)?;
+    checked_depth(depth)?;
+    let vk_bytes = py.allow_threads(|| -> PyResult<Vec<u8>> {
+        // Outside the prover pool, like every key lookup; only setup itself runs on it.
+        let shape = tree::root_shape(num_inputs, depth);
+        let keys = key_cache::get_or_setup(shape)
+            .map_err(|_| ProofGenerationError::new_err("Failed to generate ZK parameters"))?;
+
+        serialization::encode(&keys.vk, SerializationMode::from_compressed(compressed))
+            .map_err(|_| PyRuntimeError::new_err("Verification key serialization failure"))
+    })?;
+    Ok(PyBytes::new(py, &vk_bytes).into())
+}
+
+/// Verifier handle: deserializes and prepares a VK once (including the G2 line
+/// precomputation), so each subsequent verification costs only the pairing.
+#[pyclass(module = "zk_bridge")]
+struct Verifier {
+    pvk: ark_groth16::PreparedVerifyingKey<Bn254>,
+}
+
+impl Verifier {
+    fn from_vk_bytes(vk_bytes: &[u8]) -> PyResult<Self> {
+        // In production, VK is loaded from Registry. For this verification, we need the matching VK.
+        // If vk_bytes is empty, we handle as error.
+        if vk_bytes.is_empty() {
+            return Err(VerificationError::new_err("Missing Verification Key"));
+        }
+        // The encoding (compressed or not) is read from the key's header.
+        let vk: ark_groth16::VerifyingKey<Bn254> = serialization::decode(vk_bytes)
+            .map_err(|_| VerificationError::new_err("Invalid Verification Key format"))?;
+        Ok(Verifier { pvk: ark_groth16::prepare_verifying_key(&vk) })
+    }
+
+    fn verify_one(&self, proof_bytes: &[u8], public_inputs: &[String]) -> PyResult<bool> {
+        // 1. Deserialize Real Cryptographic Objects
+        let proof: ark_groth16::Proof<Bn254> = serialization::decode(proof_bytes)
+            .map_err(|_| VerificationError::new_err("Malformed cryptographic proof bytes"))?;
+
+        // 2. Map Public Inputs to Field Elements
+        let p_inputs = parse_public_inputs(public_inputs)?;
+
+        // 3. REAL Cryptographic Pairing-based Verification
+        Groth16::<Bn254>::verify_proof(&self.pvk, &proof, &p_inputs)
+            .map_err(|_| VerificationError::new_err("Pairing check engine failure"))
+    }
+
+    fn verify_one_timed(&self, proof_bytes: &[u8], public_inputs: &[String]) -> PyResult<(bool, VerifyTimings)> {
+        let mut timings = VerifyTimings::default();
+        let total = Instant::now();
+
+        let start = Instant::now();
+        let proof: ark_groth16::Proof<Bn254> = serialization::decode(proof_bytes)
+            .map_err(|_| VerificationError::new_err("Malformed cryptographic proof bytes"))?;
+        timings.deserialize = start.elapsed().as_secs_f64();
+
+        let start = Instant::now();
+        let prepared = Groth16::<Bn254>::prepare_inputs(&self.pvk, &parse_public_inputs(public_inputs)?)
+            .map_err(|_| VerificationError::new_err("Pairing check engine failure"))?;
+        timings.prepare_inputs = start.elapsed().as_secs_f64();
+
+        let start = Instant::now();
+        let is_valid = Groth16::<Bn254>::verify_proof_with_prepared_inputs(&self.pvk, &proof, &prepared)
+            .map_err(|_| VerificationError::new_err("Pairing check engine failure"))?;
+        timings.pairing = start.elapsed().as_secs_f64();
+
+        timings.total = total.elapsed().as_secs_f64();
+        Ok((is_valid, timings))
+    }
+
+    fn verify_many(&self, proofs: &[&[u8]], public_inputs: &[Vec<String>]) -> Vec<bool> {
+        // Only well-formed proofs with parseable public inputs take part in the batch.
+        let mut results = vec![false; proofs.len()];
+        let mut indices = Vec::with_capacity(proofs.len());
+        let mut parsed = Vec::with_capacity(proofs.len());
+        let mut inputs = Vec::with_capacity(proofs.len());
+        for (i, (bytes, x)) in proofs.iter().zip(public_inputs).enumerate() {
+            let proof = serialization::decode::<ark_groth16::Proof<Bn254>>(bytes);
+            if let (Ok(proof), Ok(x)) = (proof, parse_public_inputs(x)) {
+                indices.push(i);
+                parsed.push(proof);
+                inputs.push(x);
+            }
+        }
+
+        let verdicts = batch::verify_batch_with_fallback(&self.pvk, &parsed, &inputs);
+        for (i, ok) in indices.into_iter().zip(verdicts) {
+            results[i] = ok;
+        }
+        results
+    }
+}
+
+#[pymethods]
+impl Verifier {
+    #[new]
+    fn new(py: Python<'_>, vk_bytes: PyBuffer<u8>) -> PyResult<Self> {
+        let vk_bytes = borrow_buffer(&vk_bytes)?;
+        py.allow_threads(|| Verifier::from_vk_bytes(vk_bytes))
+    }
+
+    /// Verifies one proof against the prepared VK.
+    fn verify(&self, py: Python<'_>, proof_bytes: PyBuffer<u8>, public_inputs: Vec<String>) -> PyResult<bool> {
+        let proof_bytes = borrow_buffer(&proof_bytes)?;
+        py.allow_threads(|| self.verify_one(proof_bytes, &public_inputs))
+    }
+
+    /// Like `verify`, returning a per-stage timing record alongside the verdict.
+    fn verify_timed(
+        &self,
+        py: Python<'_>,
+        proof_bytes: PyBuffer<u8>,
+        public_inputs: Vec<String>,
+    ) -> PyResult<(bool, VerifyTimings)> {
+        let proof_bytes = borrow_buffer(&proof_bytes)?;
+        py.allow_threads(|| self.verify_one_timed(proof_bytes, &public_inputs))
+    }
+
+    /// Batch-verifies proofs against the prepared VK (see `verify_batch`).
+    fn verify_batch(
+        &self,
+        py: Python<'_>,
+        proofs: Vec<PyBuffer<u8>>,
+        public_inputs: Vec<Vec<String>>,
+    ) -> PyResult<Vec<bool>> {
+        if proofs.len() != public_inputs.len() {
+            return Err(PyValueError::new_err("Each proof needs its own list of public inputs"));
+        }
+        let proofs = borrow_buffers(&proofs)?;
+        Ok(py.allow_threads(|| self.verify_many(&proofs, &public_inputs)))
+    }
 }
 
 /// Real Verifier: Performs actual Pairing-based verification on Elliptic Curves.
 #[pyfunction]
 fn verify_recursive_composition(
-    proof_bytes: Vec<u8>,
-    vk_bytes: Vec<u8>,
+    py: Python<'_>,
+    proof_bytes: PyBuffer<u8>,
+    vk_bytes: PyBuffer<u8>,
     public_inputs: Vec<String>,
 ) -> PyResult<bool> {
-    // 1. Deserialize Real Cryptographic Objects
-    let proof = ark_groth16::Proof::<Bn254>::deserialize_uncompressed(&proof_bytes[..])
-        .map_err(|_| VerificationError::new_err("Malformed cryptographic proof bytes"))?;
-    
-    // In production, VK is loaded from Registry. For this verification, we need the matching VK.
-    // If vk_bytes is empty, we handle as error.
-    if vk_bytes.is_empty() {
-        return Err(VerificationError::new_err("Missing Verification Key"));
+    let proof_bytes = borrow_buffer(&proof_bytes)?;
+    let vk_bytes = borrow_buffer(&vk_bytes)?;
+
+    // Deserialization and pairings run without the GIL so verifications can overlap.
+    py.allow_threads(|| {
+        Verifier::from_vk_bytes(vk_bytes)?.verify_one(proof_bytes, &public_inputs)
+    })
+}
+
+/// Batch Verifier: checks many proofs against one VK with a random-linear-combination
+/// multi-pairing, falling back to per-proof checks only when the batch fails.
+/// Malformed proofs are reported as invalid without failing the whole batch.
+#[pyfunction]
+fn verify_batch(
+    py: Python<'_>,
+    proofs: Vec<PyBuffer<u8>>,
+    vk_bytes: PyBuffer<u8>,
+    public_inputs: Vec<Vec<String>>,
+) -> PyResult<Vec<bool>> {
+    if proofs.len() != public_inputs.len() {
+        return Err(PyValueError::new_err("Each proof needs its own list of public inputs"));
     }
-    
-    let vk = ark_groth16::VerifyingKey::<Bn254>::deserialize_uncompressed(&vk_bytes[..])
-        .map_err(|_| VerificationError::new_err("Invalid Verification Key format"))?;
+    let proofs = borrow_buffers(&proofs)?;
+    let vk_bytes = borrow_buffer(&vk_bytes)?;
+    py.allow_threads(|| {
+        Ok(Verifier::from_vk_bytes(vk_bytes)?.verify_many(&proofs, &public_inputs))
+    })
+}
 
-    // 2. Map Public Inputs to Field Elements
-    let p_inputs: Vec<ark_bn254::Fr> = public_inputs.iter()
-        .map(|s| ark_bn254::Fr::from(s.parse::<u64>().unwrap_or(0)))
-        .collect();
+fn checked_bucket(num_inputs: usize) -> PyResult<usize> {
+    bucket_size(num_inputs).ok_or_else(|| {
+        ProofGenerationError::new_err(format!(
+            "Cannot aggregate {} proofs: supported range is 1..={}",
+            num_inputs,
+            max_bucket_size()
+        ))
+    })
+}
 
-    // 3. REAL Cryptographic Pairing-based Verification
-    let is_valid = Groth16::<Bn254>::verify(&vk, &p_inputs, &proof)
-        .map_err(|_| VerificationError::new_err("Pairing check engine failure"))?;
+fn checked_depth(depth: u32) -> PyResult<u32> {
+    if depth > max_depth() {
+        return Err(ProofGenerationError::new_err(format!(
+            "Cannot aggregate at depth {}: supported range is 1..={}",
+            depth,
+            max_depth()
+        )));
+    }
+    Ok(depth)
+}
 
-    Ok(is_valid)
+/// Returns the circuit bucket (padded input count) used for `num_inputs` base proofs.
+#[pyfunction]
+fn circuit_bucket(num_inputs: usize) -> PyResult<usize> {
+    checked_bucket(num_inputs)
+}
+
+/// Lists every circuit bucket, smallest first; one key per bucket and depth covers all requests.
+#[pyfunction]
+fn circuit_buckets() -> Vec<usize> {
+    std::iter::successors(Some(MIN_BUCKET), |b| Some(b * 2))
+        .take_while(|b| *b <= max_bucket_size())
+        .collect()
+}
+
+/// Returns the deepest aggregation tree this build accepts.
+#[pyfunction]
+#[pyo3(name = "max_depth")]
+fn py_max_depth() -> u32 {
+    max_depth()
+}
+
+/// Byte lengths a well-formed aggregated proof can have: each point encoding
+/// with the mode header, and without it (headerless proofs predate the header).
+#[pyfunction]
+fn proof_sizes() -> Vec<usize> {
+    let proof = ark_groth16::Proof::<Bn254>::default();
+    [Compress::No, Compress::Yes]
+        .into_iter()
+        .flat_map(|compress| {
+            let body = proof.serialized_size(compress);
+            [serialization::HEADER_LEN + body, body]
+        })
+        .collect()
+}
+
+/// Sets the number of threads shared by all in-flight proofs (parallel builds only).
+#[pyfunction]
+fn set_num_threads(num_threads: usize) -> PyResult<()> {
+    if num_threads == 0 {
+        return Err(PyValueError::new_err("num_threads must be at least 1"));
+    }
+    parallel::set_num_threads(num_threads).map_err(|e| ZKBridgeError::new_err(e))
+}
+
+/// Returns the current prover thread budget (1 for single-threaded builds).
+#[pyfunction]
+fn get_num_threads() -> usize {
+    parallel::num_threads()
+}
+
+/// Borrows the bytes behind a Python buffer (bytes, bytearray, memoryview, mmap)
+/// without copying them.
+fn borrow_buffer(buf: &PyBuffer<u8>) -> PyResult<&[u8]> {
+    if !buf.is_c_contiguous() {
+        return Err(PyValueError::new_err("Proof buffers must be C-contiguous"));
+    }
+    // SAFETY: the buffer is held (and its memory pinned) for as long as `buf` is
+    // borrowed, and u8 has no alignment or validity requirements. Callers must
+    // not mutate a bytearray/mmap while a native call is reading it.
+    Ok(unsafe { std::slice::from_raw_parts(buf.buf_ptr() as *const u8, buf.len_bytes()) })
+}
+
+fn borrow_buffers(bufs: &[PyBuffer<u8>]) -> PyResult<Vec<&[u8]>> {
+    bufs.iter().map(borrow_buffer).collect()
+}
+
+/// Maps public inputs to field elements as the circuit allocates them: a decimal
+/// count is one element and a hex Merkle root is two 128-bit limbs. Anything else
+/// is rejected rather than mapped to a default, which could satisfy the circuit.
+fn parse_public_inputs(public_inputs: &[String]) -> PyResult<Vec<ark_bn254::Fr>> {
+    let mut elements = Vec::with_capacity(public_inputs.len() + 1);
+    for s in public_inputs {
+        let mut digest = merkle::Hash::default();
+        if s.len() == 2 * digest.len() && hex::decode_to_slice(s, &mut digest).is_ok() {
+            elements.extend(linkage_limbs::<ark_bn254::Fr>(&digest));
+        } else if let Ok(value) = s.parse::<u64>() {
+            elements.push(ark_bn254::Fr::from(value));
+        } else {
+            return Err(VerificationError::new_err(format!("Unparseable public input: {:?}", s)));
+        }
+    }
+    Ok(elements)
 }
 
 #[pymodule]
 fn zk_bridge(py: Python, m: &PyModule) -> PyResult<()> {
     m.add_function(wrap_pyfunction!(prove_recursive_composition, m)?)?;
+    m.add_function(wrap_pyfunction!(prove_recursive_composition_timed, m)?)?;
     m.add_function(wrap_pyfunction!(verify_recursive_composition, m)?)?;
+    m.add_function(wrap_pyfunction!(verify_batch, m)?)?;
+    m.add_function(wrap_pyfunction!(prove_aggregation_node, m)?)?;
+    m.add_function(wrap_pyfunction!(export_verifying_key, m)?)?;
+    m.add_function(wrap_pyfunction!(load_keys, m)?)?;
+    m.add_function(wrap_pyfunction!(circuit_bucket, m)?)?;
+    m.add_function(wrap_pyfunction!(circuit_buckets, m)?)?;
+    m.add_function(wrap_pyfunction!(py_max_depth, m)?)?;
+    m.add_function(wrap_pyfunction!(proof_sizes, m)?)?;
+    m.add_function(wrap_pyfunction!(set_num_threads, m)?)?;
+    m.add_function(wrap_pyfunction!(get_num_threads, m)?)?;
+    m.add_class::<Verifier>()?;
+    m.add_class::<Accumulator>()?;
+    m.add_class::<ProveTimings>()?;
+    m.add_class::<VerifyTimings>()?;
+    m.add("CIRCUIT_VERSION", CIRCUIT_VERSION)?;
     m.add("ZKBridgeError", py.get_type::<ZKBridgeError>())?;
     m.add("ProofGenerationError", py.get_type::<ProofGenerationError>())?;
     m.add("VerificationError", py.get_type::<VerificationError>())?;
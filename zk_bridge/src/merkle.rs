@@ -0,0 +1,70 @@
+use sha2::{Digest, Sha256};
+
+/// Domain separation between leaves and interior nodes (RFC 6962).
+const LEAF_PREFIX: u8 = 0x00;
+const NODE_PREFIX: u8 = 0x01;
+
+pub type Hash = [u8; 32];
+
+pub fn leaf_hash(proof: &[u8]) -> Hash {
+    let mut h = Sha256::new();
+    h.update([LEAF_PREFIX]);
+    h.update(proof);
+    h.finalize().into()
+}
+
+fn node_hash(left: &Hash, right: &Hash) -> Hash {
+    let mut h = Sha256::new();
+    h.update([NODE_PREFIX]);
+    h.update(left);
+    h.update(right);
+    h.finalize().into()
+}
+
+/// Streaming RFC 6962 Merkle root; matches `zk_compose.zk_logic.merkle.MerkleBuilder`.
+/// Only the peaks of the complete subtrees seen so far are kept.
+#[derive(Default)]
+pub struct MerkleBuilder {
+    peaks: Vec<(u32, Hash)>,
+}
+
+impl MerkleBuilder {
+    pub fn append_digest(&mut self, mut digest: Hash) {
+        let mut height = 0;
+        while let Some(&(h, left)) = self.peaks.last() {
+            if h != height {
+                break;
+            }
+            self.peaks.pop();
+            digest = node_hash(&left, &digest);
+            height += 1;
+        }
+        self.peaks.push((height, digest));
+    }
+
+    pub fn root(&self) -> Hash {
+        let mut peaks = self.peaks.iter().rev();
+        let Some(&(_, mut root)) = peaks.next() else {
+            return Sha256::digest(b"").into();
+        };
+        for (_, peak) in peaks {
+            root = node_hash(peak, &root);
+        }
+        root
+    }
+}
+
+/// Merkle root over `proofs` in order, as `MerkleBuilder` would build it.
+pub fn root_of(proofs: &[&[u8]]) -> Hash {
+    root_of_digests(proofs.iter().map(|proof| leaf_hash(proof)))
+}
+
+/// Merkle root over already hashed leaves, or over the roots of aligned
+/// power-of-two subtrees, which gives the root over all of their leaves.
+pub fn root_of_digests(digests: impl IntoIterator<Item = Hash>) -> Hash {
+    let mut tree = MerkleBuilder::default();
+    for digest in digests {
+        tree.append_digest(digest);
+    }
+    tree.root()
+}
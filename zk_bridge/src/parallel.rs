@@ -0,0 +1,85 @@
+//! Thread budget for native proving.
+//!
+//! With the `parallel` feature, arkworks runs its MSMs and FFTs on whichever
+//! rayon pool is current. Proofs are run inside one shared pool whose size
+//! comes from `ZK_COMPOSE_PROVER_THREADS` (default: all cores) and can be
+//! changed at runtime. Concurrent proofs share the pool through work-stealing.
+
+#[cfg(feature = "parallel")]
+mod imp {
+    use std::sync::{Arc, RwLock};
+
+    use rayon::{ThreadPool, ThreadPoolBuilder};
+
+    static POOL: RwLock<Option<Arc<ThreadPool>>> = RwLock::new(None);
+
+    fn default_threads() -> usize {
+        std::env::var("ZK_COMPOSE_PROVER_THREADS")
+            .ok()
+            .and_then(|v| v.parse::<usize>().ok())
+            .filter(|n| *n > 0)
+            .unwrap_or_else(|| std::thread::available_parallelism().map(|n| n.get()).unwrap_or(1))
+    }
+
+    fn build(num_threads: usize) -> Result<Arc<ThreadPool>, String> {
+        ThreadPoolBuilder::new()
+            .num_threads(num_threads)
+            .thread_name(|i| format!("zk-prover-{}", i))
+            .build()
+            .map(Arc::new)
+            .map_err(|e| e.to_string())
+    }
+
+    fn pool() -> Arc<ThreadPool> {
+        if let Some(pool) = POOL.read().unwrap().as_ref() {
+            return pool.clone();
+        }
+        let mut guard = POOL.write().unwrap();
+        guard
+            .get_or_insert_with(|| build(default_threads()).expect("failed to start prover thread pool"))
+            .clone()
+    }
+
+    /// Replaces the pool; proofs already running keep the old one until they finish.
+    pub fn set_num_threads(num_threads: usize) -> Result<(), String> {
+        let pool = build(num_threads)?;
+        *POOL.write().unwrap() = Some(pool);
+        Ok(())
+    }
+
+    pub fn num_threads() -> usize {
+        pool().current_num_threads()
+    }
+
+    pub fn install<R: Send>(f: impl FnOnce() -> R + Send) -> R {
+        pool().install(f)
+    }
+
+    /// Maps `f` over `items` in parallel on the current pool, keeping their order.
+    pub fn map<T: Send, R: Send>(items: Vec<T>, f: impl Fn(T) -> R + Sync + Send) -> Vec<R> {
+        use rayon::prelude::*;
+        items.into_par_iter().map(f).collect()
+    }
+}
+
+#[cfg(not(feature = "parallel"))]
+mod imp {
+    /// Single-threaded build: the budget is fixed at one thread.
+    pub fn set_num_threads(_num_threads: usize) -> Result<(), String> {
+        Ok(())
+    }
+
+    pub fn num_threads() -> usize {
+        1
+    }
+
+    pub fn install<R: Send>(f: impl FnOnce() -> R + Send) -> R {
+        f()
+    }
+
+    pub fn map<T: Send, R: Send>(items: Vec<T>, f: impl Fn(T) -> R + Sync + Send) -> Vec<R> {
+        items.into_iter().map(f).collect()
+    }
+}
+
+pub use imp::{install, map, num_threads, set_num_threads};
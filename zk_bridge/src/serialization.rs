@@ -0,0 +1,72 @@
+use ark_serialize::{
+    CanonicalDeserialize, CanonicalSerialize, Compress, SerializationError, Validate,
+};
+
+/// Marks bridge-encoded proofs and keys; the byte after it is the mode.
+pub const MAGIC: &[u8; 3] = b"ZKC";
+pub const HEADER_LEN: usize = MAGIC.len() + 1;
+
+/// Point encoding used for proofs and keys on the wire and on disk.
+///
+/// Compressed points are roughly half the size but cost a square root per
+/// point to decompress, so the choice is a per-deployment trade-off.
+#[derive(Clone, Copy, Debug, PartialEq, Eq)]
+pub enum SerializationMode {
+    Uncompressed = 0,
+    Compressed = 1,
+}
+
+impl SerializationMode {
+    pub fn from_compressed(compressed: bool) -> Self {
+        if compressed {
+            SerializationMode::Compressed
+        } else {
+            SerializationMode::Uncompressed
+        }
+    }
+
+    fn from_tag(tag: u8) -> Option<Self> {
+        match tag {
+            0 => Some(SerializationMode::Uncompressed),
+            1 => Some(SerializationMode::Compressed),
+            _ => None,
+        }
+    }
+
+    fn compress(self) -> Compress {
+        match self {
+            SerializationMode::Uncompressed => Compress::No,
+            SerializationMode::Compressed => Compress::Yes,
+        }
+    }
+}
+
+/// Serializes `value` behind a header recording `mode`.
+pub fn encode<T: CanonicalSerialize>(
+    value: &T,
+    mode: SerializationMode,
+) -> Result<Vec<u8>, SerializationError> {
+    let mut out = Vec::with_capacity(HEADER_LEN + value.serialized_size(mode.compress()));
+    out.extend_from_slice(MAGIC);
+    out.push(mode as u8);
+    value.serialize_with_mode(&mut out, mode.compress())?;
+    Ok(out)
+}
+
+/// Splits off the header. Headerless payloads predate the header and were
+/// always written uncompressed.
+pub fn split_header(bytes: &[u8]) -> (SerializationMode, &[u8]) {
+    if bytes.len() >= HEADER_LEN && &bytes[..MAGIC.len()] == MAGIC {
+        if let Some(mode) = SerializationMode::from_tag(bytes[MAGIC.len()]) {
+            return (mode, &bytes[HEADER_LEN..]);
+        }
+    }
+    (SerializationMode::Uncompressed, bytes)
+}
+
+/// Deserializes a value written by `encode` (or a legacy headerless one),
+/// with full curve and subgroup checks.
+pub fn decode<T: CanonicalDeserialize>(bytes: &[u8]) -> Result<T, SerializationError> {
+    let (mode, body) = split_header(bytes);
+    T::deserialize_with_mode(body, mode.compress(), Validate::Yes)
+}
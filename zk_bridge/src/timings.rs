@@ -0,0 +1,204 @@
+use std::ops::AddAssign;
+use std::time::Instant;
+
+use ark_bn254::{Bn254, Fr, G1Projective, G2Projective};
+use ark_ec::{AffineRepr, CurveGroup, VariableBaseMSM};
+use ark_ff::{PrimeField, UniformRand, Zero};
+use ark_groth16::r1cs_to_qap::{LibsnarkReduction, R1CSToQAP};
+use ark_groth16::{Proof, ProvingKey};
+use ark_poly::GeneralEvaluationDomain;
+use ark_relations::r1cs::{
+    ConstraintSynthesizer, ConstraintSystem, OptimizationGoal, SynthesisError, SynthesisMode,
+};
+use ark_std::rand::RngCore;
+use ark_std::{cfg_into_iter, cfg_iter};
+use pyo3::prelude::*;
+use pyo3::types::PyDict;
+
+#[cfg(feature = "parallel")]
+use rayon::prelude::*;
+
+/// Wall-clock seconds per proving stage, plus the size of the synthesized circuit.
+#[pyclass(module = "zk_bridge", get_all)]
+#[derive(Clone, Debug, Default)]
+pub struct ProveTimings {
+    /// Key lookup: memory, disk, or a fresh setup.
+    pub setup: f64,
+    /// Witness generation and R1CS construction.
+    pub synthesis: f64,
+    /// R1CS-to-QAP witness map (the FFTs).
+    pub fft: f64,
+    /// Multi-scalar multiplications producing A, B and C.
+    pub msm: f64,
+    pub serialization: f64,
+    pub total: f64,
+    pub num_constraints: usize,
+    pub num_witness_variables: usize,
+    pub num_instance_variables: usize,
+}
+
+impl ProveTimings {
+    /// Adds the stage times of a proof that ran after this one (e.g. the next tree level).
+    pub fn add_stages(&mut self, other: &ProveTimings) {
+        self.synthesis += other.synthesis;
+        self.fft += other.fft;
+        self.msm += other.msm;
+        self.serialization += other.serialization;
+    }
+
+    /// Adds the circuit size of another proof that is part of the same result.
+    pub fn add_size(&mut self, other: &ProveTimings) {
+        self.num_constraints += other.num_constraints;
+        self.num_witness_variables += other.num_witness_variables;
+        self.num_instance_variables += other.num_instance_variables;
+    }
+}
+
+#[pymethods]
+impl ProveTimings {
+    fn as_dict<'py>(&self, py: Python<'py>) -> PyResult<&'py PyDict> {
+        let d = PyDict::new(py);
+        d.set_item("setup", self.setup)?;
+        d.set_item("synthesis", self.synthesis)?;
+        d.set_item("fft", self.fft)?;
+        d.set_item("msm", self.msm)?;
+        d.set_item("serialization", self.serialization)?;
+        d.set_item("total", self.total)?;
+        d.set_item("num_constraints", self.num_constraints)?;
+        d.set_item("num_witness_variables", self.num_witness_variables)?;
+        d.set_item("num_instance_variables", self.num_instance_variables)?;
+        Ok(d)
+    }
+
+    fn __repr__(&self) -> String {
+        format!("{:?}", self)
+    }
+}
+
+/// Wall-clock seconds per verification stage.
+#[pyclass(module = "zk_bridge", get_all)]
+#[derive(Clone, Debug, Default)]
+pub struct VerifyTimings {
+    /// Proof decoding, including curve and subgroup checks.
+    pub deserialize: f64,
+    /// Public-input MSM against the prepared VK.
+    pub prepare_inputs: f64,
+    /// Miller loops and the final exponentiation.
+    pub pairing: f64,
+    pub total: f64,
+}
+
+#[pymethods]
+impl VerifyTimings {
+    fn as_dict<'py>(&self, py: Python<'py>) -> PyResult<&'py PyDict> {
+        let d = PyDict::new(py);
+        d.set_item("deserialize", self.deserialize)?;
+        d.set_item("prepare_inputs", self.prepare_inputs)?;
+        d.set_item("pairing", self.pairing)?;
+        d.set_item("total", self.total)?;
+        Ok(d)
+    }
+
+    fn __repr__(&self) -> String {
+        format!("{:?}", self)
+    }
+}
+
+/// Groth16 proving split into timed stages. Draws r and s exactly as
+/// `Groth16::prove` does, so for the same rng the proof is byte-identical.
+pub fn prove_timed<C: ConstraintSynthesizer<Fr>, R: RngCore>(
+    pk: &ProvingKey<Bn254>,
+    circuit: C,
+    rng: &mut R,
+    timings: &mut ProveTimings,
+) -> Result<Proof<Bn254>, SynthesisError> {
+    let r = Fr::rand(rng);
+    let s = Fr::rand(rng);
+
+    let start = Instant::now();
+    let cs = ConstraintSystem::new_ref();
+    cs.set_optimization_goal(OptimizationGoal::Constraints);
+    cs.set_mode(SynthesisMode::Prove { construct_matrices: true });
+    circuit.generate_constraints(cs.clone())?;
+    cs.finalize();
+    timings.synthesis = start.elapsed().as_secs_f64();
+    timings.num_constraints = cs.num_constraints();
+    timings.num_witness_variables = cs.num_witness_variables();
+    timings.num_instance_variables = cs.num_instance_variables();
+
+    let start = Instant::now();
+    let h = LibsnarkReduction::witness_map::<Fr, GeneralEvaluationDomain<Fr>>(cs.clone())?;
+    timings.fft = start.elapsed().as_secs_f64();
+
+    let start = Instant::now();
+    let prover = cs.borrow().ok_or(SynthesisError::MissingCS)?;
+    let proof = create_proof_with_assignment(
+        pk,
+        r,
+        s,
+        &h,
+        &prover.instance_assignment[1..],
+        &prover.witness_assignment,
+    );
+    timings.msm = start.elapsed().as_secs_f64();
+    Ok(proof)
+}
+
+// Mirrors ark-groth16's (private) prover once the witness map is known.
+fn create_proof_with_assignment(
+    pk: &ProvingKey<Bn254>,
+    r: Fr,
+    s: Fr,
+    h: &[Fr],
+    input_assignment: &[Fr],
+    aux_assignment: &[Fr],
+) -> Proof<Bn254> {
+    let h_assignment = cfg_into_iter!(h).map(|s| s.into_bigint()).collect::<Vec<_>>();
+    let h_acc = G1Projective::msm_bigint(&pk.h_query, &h_assignment);
+    drop(h_assignment);
+
+    let aux_assignment = cfg_iter!(aux_assignment).map(|s| s.into_bigint()).collect::<Vec<_>>();
+    let l_aux_acc = G1Projective::msm_bigint(&pk.l_query, &aux_assignment);
+    let r_s_delta_g1 = pk.delta_g1 * (r * s);
+
+    let input_assignment = input_assignment.iter().map(|s| s.into_bigint()).collect::<Vec<_>>();
+    let assignment = [&input_assignment[..], &aux_assignment[..]].concat();
+    drop(aux_assignment);
+
+    let g_a = calculate_coeff(pk.delta_g1 * r, &pk.a_query, pk.vk.alpha_g1, &assignment);
+    let s_g_a = g_a * s;
+
+    let g1_b = if !r.is_zero() {
+        calculate_coeff(pk.delta_g1 * s, &pk.b_g1_query, pk.beta_g1, &assignment)
+    } else {
+        G1Projective::zero()
+    };
+    let g2_b: G2Projective = calculate_coeff(pk.vk.delta_g2 * s, &pk.b_g2_query, pk.vk.beta_g2, &assignment);
+    let r_g1_b = g1_b * r;
+
+    let mut g_c = s_g_a;
+    g_c += r_g1_b;
+    g_c -= r_s_delta_g1;
+    g_c += l_aux_acc;
+    g_c += h_acc;
+
+    Proof { a: g_a.into_affine(), b: g2_b.into_affine(), c: g_c.into_affine() }
+}
+
+fn calculate_coeff<G: AffineRepr>(
+    initial: G::Group,
+    query: &[G],
+    vk_param: G,
+    assignment: &[<G::ScalarField as PrimeField>::BigInt],
+) -> G::Group
+where
+    G::Group: VariableBaseMSM<MulBase = G>,
+{
+    let el = query[0];
+    let acc = G::Group::msm_bigint(&query[1..], assignment);
+    let mut res = initial;
+    res.add_assign(&el);
+    res += &acc;
+    res.add_assign(&vk_param);
+    res
+}
@@ -0,0 +1,190 @@
+//! Tree-structured aggregation.
+//!
+//! Base proofs are split into chunks of `fanout` leaves. Every node of a level
+//! is proven concurrently on the prover pool, and each level folds the nodes of
+//! the level below until a single root remains at the requested depth, so
+//! wall-clock time grows with the height of the tree rather than with the
+//! proof count.
+//!
+//! The fan-out is a power of two, so chunk boundaries line up with the RFC 6962
+//! split: the Merkle root over the roots of the chunks is the Merkle root over
+//! their leaves. Every node therefore commits to the count and root of exactly
+//! the base proofs below it, and the root has the public inputs of the whole task.
+
+use std::collections::HashMap;
+use std::sync::Arc;
+use std::time::Instant;
+
+use pyo3::exceptions::PyRuntimeError;
+use pyo3::prelude::*;
+
+use crate::key_cache::{self, CircuitShape, KeyPair};
+use crate::merkle::{self, Hash};
+use crate::serialization::{self, SerializationMode};
+use crate::timings::{self, ProveTimings};
+use crate::{parallel, AggregationCircuit, ProofGenerationError, MIN_BUCKET};
+
+/// What a node commits to: the number of base proofs below it and their Merkle root.
+#[derive(Clone, Copy, Debug)]
+pub struct Node {
+    pub count: u64,
+    pub digest: Hash,
+}
+
+impl Node {
+    pub fn leaf(proof: &[u8]) -> Self {
+        Node { count: 1, digest: merkle::leaf_hash(proof) }
+    }
+
+    /// The node proven over `children`.
+    pub fn parent(children: &[Node]) -> Self {
+        Node {
+            count: children.iter().map(|c| c.count).sum(),
+            digest: merkle::root_of_digests(children.iter().map(|c| c.digest)),
+        }
+    }
+}
+
+/// Smallest power-of-two fan-out that folds `num_inputs` leaves into one root in
+/// `depth` levels. Matches `zk_compose.folding_logic.AggregationScheduler.fanout`.
+pub fn fanout(num_inputs: usize, depth: u32) -> usize {
+    let mut fanout = MIN_BUCKET;
+    while fanout.checked_pow(depth.max(1)).map_or(false, |leaves| leaves < num_inputs) {
+        fanout *= 2;
+    }
+    fanout
+}
+
+/// Circuit shape of a node with `children` children at `level`.
+fn node_shape(children: usize, level: u32) -> CircuitShape {
+    CircuitShape { num_inputs: children.max(MIN_BUCKET).next_power_of_two(), level }
+}
+
+/// Shapes of the nodes proven at `level` over `width` nodes of the level below:
+/// every node has `fanout` children except possibly the last.
+fn level_shapes(width: usize, fanout: usize, level: u32) -> Vec<CircuitShape> {
+    let mut shapes = vec![node_shape(fanout.min(width), level)];
+    let last = node_shape((width - 1) % fanout + 1, level);
+    if last != shapes[0] {
+        shapes.push(last);
+    }
+    shapes
+}
+
+/// Shapes of every node proven for `width` nodes at `first_level` up to `depth`.
+fn tree_shapes(mut width: usize, fanout: usize, first_level: u32, depth: u32) -> Vec<CircuitShape> {
+    let mut shapes = Vec::new();
+    for level in first_level..=depth {
+        for shape in level_shapes(width, fanout, level) {
+            if !shapes.contains(&shape) {
+                shapes.push(shape);
+            }
+        }
+        width = (width + fanout - 1) / fanout;
+    }
+    shapes
+}
+
+/// Shapes of every node in the tree over `num_inputs` base proofs at `depth`.
+pub fn shapes(num_inputs: usize, depth: u32) -> Vec<CircuitShape> {
+    tree_shapes(num_inputs, fanout(num_inputs, depth), 1, depth.max(1))
+}
+
+/// Shape of the root, whose VK verifies the aggregation of `num_inputs` base proofs at `depth`.
+pub fn root_shape(num_inputs: usize, depth: u32) -> CircuitShape {
+    let depth = depth.max(1);
+    let fanout = fanout(num_inputs, depth);
+    let children = (1..depth).fold(num_inputs, |width, _| (width + fanout - 1) / fanout);
+    node_shape(children, depth)
+}
+
+/// Loads (or sets up) the keys of `shapes`. Runs outside the prover pool, as every
+/// key lookup must (see `key_cache::get_or_setup`).
+pub fn load_keys(shapes: &[CircuitShape]) -> PyResult<HashMap<CircuitShape, Arc<KeyPair>>> {
+    shapes
+        .iter()
+        .map(|&shape| {
+            key_cache::get_or_setup(shape)
+                .map(|keys| (shape, keys))
+                .map_err(|_| ProofGenerationError::new_err("Failed to generate ZK parameters"))
+        })
+        .collect()
+}
+
+/// Proves the node over `children` at `level` with its already loaded keys.
+fn prove_with(keys: &KeyPair, children: &[Node], level: u32, compressed: bool) -> PyResult<(Node, Vec<u8>, ProveTimings)> {
+    let start = Instant::now();
+    let mut rng = ark_std::test_rng();
+    let mut timings = ProveTimings::default();
+
+    // Witness Generation & Proving (timed per stage)
+    let node = Node::parent(children);
+    let counts: Vec<u64> = children.iter().map(|c| c.count).collect();
+    let shape = node_shape(children.len(), level);
+    let circuit = AggregationCircuit::<ark_bn254::Fr>::new(&counts, shape.num_inputs, level, &node.digest);
+    let proof = timings::prove_timed(&keys.pk, circuit, &mut rng, &mut timings)
+        .map_err(|_| ProofGenerationError::new_err("R1CS Constraint Satisfaction Failed"))?;
+
+    // Serialization to Raw Bytes (succinct Groth16 proof behind a mode header)
+    let serialize_start = Instant::now();
+    let proof_bytes = serialization::encode(&proof, SerializationMode::from_compressed(compressed))
+        .map_err(|_| PyRuntimeError::new_err("Proof serialization failure"))?;
+    timings.serialization = serialize_start.elapsed().as_secs_f64();
+    timings.total = start.elapsed().as_secs_f64();
+    Ok((node, proof_bytes, timings))
+}
+
+/// Proves a single node over `children` at `level`.
+pub fn prove_node(children: &[Node], level: u32, compressed: bool) -> PyResult<(Vec<u8>, ProveTimings)> {
+    let start = Instant::now();
+    let shape = node_shape(children.len(), level);
+    let keys = load_keys(&[shape])?;
+    let setup = start.elapsed().as_secs_f64();
+
+    let (_, proof_bytes, mut timings) = parallel::install(|| prove_with(&keys[&shape], children, level, compressed))?;
+    timings.setup = setup;
+    Ok((proof_bytes, timings))
+}
+
+/// Proves levels `first_level..=depth` over `nodes` (leaves when `first_level` is 1)
+/// and returns the root proof. Stage timings follow the critical path: each level
+/// contributes its slowest node. Circuit sizes are summed over every node proven.
+pub fn prove(
+    mut nodes: Vec<Node>,
+    fanout: usize,
+    first_level: u32,
+    depth: u32,
+    compressed: bool,
+) -> PyResult<(Vec<u8>, ProveTimings)> {
+    let mut timings = ProveTimings::default();
+
+    // 1. Parameter Setup for every node shape, before entering the prover pool
+    let start = Instant::now();
+    let keys = load_keys(&tree_shapes(nodes.len(), fanout, first_level, depth))?;
+    timings.setup = start.elapsed().as_secs_f64();
+
+    // 2. One level at a time, every node of the level side by side
+    let mut root = None;
+    for level in first_level..=depth {
+        let chunks: Vec<&[Node]> = nodes.chunks(fanout).collect();
+        let mut proven = parallel::install(|| {
+            parallel::map(chunks, |children| {
+                prove_with(&keys[&node_shape(children.len(), level)], children, level, compressed)
+            })
+        })
+        .into_iter()
+        .collect::<PyResult<Vec<_>>>()?;
+
+        if let Some((_, _, slowest)) = proven.iter().max_by(|a, b| a.2.total.total_cmp(&b.2.total)) {
+            timings.add_stages(slowest);
+        }
+        for (_, _, node_timings) in &proven {
+            timings.add_size(node_timings);
+        }
+        nodes = proven.iter().map(|(node, _, _)| *node).collect();
+        root = proven.pop().map(|(_, proof_bytes, _)| proof_bytes);
+    }
+
+    let root = root.ok_or_else(|| ProofGenerationError::new_err("Aggregation tree has no levels to prove"))?;
+    Ok((root, timings))
+}
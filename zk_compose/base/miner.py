@@ -24,7 +24,10 @@ import traceback
 import bittensor as bt
 
 from zk_compose.base.neuron import BaseNeuron
+from zk_compose.miner import AdmissionController, ProverService, SingleFlight
 from zk_compose.utils.config import add_miner_args
+from zk_compose.utils.uids import MetagraphIndex, index_metagraph
+from zk_compose.zk_logic.zk_engine import ZKEngine
 
 from typing import Union
 
@@ -53,6 +56,29 @@ class BaseMinerNeuron(BaseNeuron):
             bt.logging.warning(
                 "You are allowing non-registered entities to send requests to your miner. This is a security risk."
             )
+        # Blacklist and priority look callers up here instead of scanning the metagraph.
+        self.metagraph_index: MetagraphIndex = index_metagraph(self.metagraph)
+
+        # Proofs run outside the event loop, so the axon stays responsive while one is in flight.
+        warmup = not self.config.warmup.off
+        self.prover = ProverService(
+            self.config.miner.prover_workers,
+            warmup_input_counts=self.config.warmup.input_counts if warmup else None,
+            warmup_depths=self.config.warmup.depths if warmup else None,
+        )
+
+        # Requests that could not finish before their timeout are shed instead of queued.
+        self.admission = AdmissionController(
+            self.config.miner.max_queue,
+            concurrency=self.config.miner.prover_workers or ZKEngine.MAX_WORKERS,
+        )
+
+        # Identical requests from several validators in one round share a single proof.
+        self.inflight = SingleFlight()
+
+        # Keys and native state are warmed before the axon exists, so no request arrives cold.
+        self.warm_up()
+
         # The axon handles request processing, allowing validators to send this miner requests.
         self.axon = bt.axon(
             wallet=self.wallet,
@@ -74,6 +100,23 @@ class BaseMinerNeuron(BaseNeuron):
         self.thread: Union[threading.Thread, None] = None
         self.lock = asyncio.Lock()
 
+    def warm_up(self):
+        """
+        Warms the prover workers, each of which loads its own keys. Without workers,
+        proving happens in this process and the keys are warmed here instead.
+        """
+        if self.prover.workers == 0:
+            return super().warm_up()
+
+        bt.logging.info(f"Starting {self.prover.workers} prover worker(s).")
+        start = time.perf_counter()
+        for pid, seconds, error in self.prover.start():
+            if error is not None:
+                bt.logging.error(f"Prover worker {pid} warm-up failed, continuing cold: {error}")
+            else:
+                bt.logging.info(f"Prover worker {pid} warmed up in {seconds:.3f}s")
+        bt.logging.info(f"Prover workers ready in {time.perf_counter() - start:.3f}s")
+
     def run(self):
         """
         Initiates and manages the main loop for the miner on the Bittensor network. The main loop handles graceful shutdown on keyboard interrupts and logs unforeseen errors.
@@ -133,6 +176,7 @@ class BaseMinerNeuron(BaseNeuron):
         # If someone intentionally stops the miner, it'll safely terminate operations.
         except KeyboardInterrupt:
             self.axon.stop()
+            self.prover.shutdown()
             bt.logging.success("Miner killed by keyboard interrupt.")
             exit()
 
@@ -187,6 +231,7 @@ class BaseMinerNeuron(BaseNeuron):
                        None if the context was exited without an exception.
         """
         self.stop_run_thread()
+        self.prover.shutdown()
 
     def resync_metagraph(self):
         """Resyncs the metagraph and updates the hotkeys and moving averages based on the new metagraph."""
@@ -194,3 +239,6 @@ class BaseMinerNeuron(BaseNeuron):
 
         # Sync the metagraph.
         self.metagraph.sync(subtensor=self.subtensor)
+
+        # Swapped in whole, so request handlers always see one consistent snapshot.
+        self.metagraph_index = index_metagraph(self.metagraph)
@@ -107,6 +107,33 @@ class BaseNeuron(ABC):
         )
         self.step = 0
 
+    def warm_up(self):
+        """
+        Pays key generation and native start-up costs before serving, so the first
+        request after a restart does not miss the validator timeout.
+        """
+        if self.config.warmup.off:
+            bt.logging.info("Warm-up disabled.")
+            return
+
+        from zk_compose.zk_logic.zk_engine import ZKEngine
+
+        bt.logging.info(
+            f"Warming up for input counts {self.config.warmup.input_counts} at depths {self.config.warmup.depths}."
+        )
+        try:
+            timings = ZKEngine.warm_up(
+                self.config.warmup.input_counts, self.config.warmup.depths
+            )
+        except Exception as e:
+            bt.logging.error(f"Warm-up failed, continuing cold: {e}")
+            return
+        for step, seconds in timings:
+            bt.logging.info(f"Warm-up {step}: {seconds:.3f}s")
+        bt.logging.info(
+            f"Warm-up finished in {sum(seconds for _, seconds in timings):.3f}s"
+        )
+
     @abstractmethod
     async def forward(self, synapse: bt.Synapse) -> bt.Synapse:
         ...
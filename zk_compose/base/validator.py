@@ -19,6 +19,7 @@
 
 
 import copy
+import time
 import numpy as np
 import asyncio
 import argparse
@@ -65,6 +66,11 @@ class BaseValidatorNeuron(BaseNeuron):
         # Init sync with the network. Updates the metagraph.
         self.sync()
 
+        # Load verifying keys and prepare the native verifier before serving.
+        self.configure_vk_registry()
+        self.prefetch_vks()
+        self.warm_up()
+
         # Serve axon to enable external connections.
         if not self.config.neuron.axon_off:
             self.serve_axon()
@@ -80,6 +86,27 @@ class BaseValidatorNeuron(BaseNeuron):
         self.thread: Union[threading.Thread, None] = None
         self.lock = asyncio.Lock()
 
+    def configure_vk_registry(self):
+        """Applies the VK cache's stale-while-revalidate windows from the config."""
+        from zk_compose.zk_logic.vk_registry import VKRegistry
+
+        VKRegistry.REFRESH_AHEAD = self.config.vk.refresh_ahead
+        VKRegistry.STALE_GRACE = self.config.vk.stale_grace
+
+    def prefetch_vks(self):
+        """Loads the aggregation-circuit VKs of every task shape we score, concurrently."""
+        from zk_compose.zk_logic.vk_registry import VKRegistry
+
+        start = time.perf_counter()
+        results = VKRegistry.prefetch(
+            self.config.vk.prefetch_input_counts,
+            self.config.vk.prefetch_depths,
+            max_concurrency=self.config.vk.prefetch_concurrency,
+        )
+        bt.logging.info(
+            f"Prefetched {sum(results.values())}/{len(results)} VKs in {time.perf_counter() - start:.3f}s"
+        )
+
     def serve_axon(self):
         """Serve axon to enable external connections."""
 
@@ -279,6 +306,15 @@ class BaseValidatorNeuron(BaseNeuron):
         else:
             bt.logging.error("set_weights failed", msg)
 
+        # Report and reset the per-epoch verification cache counters.
+        from zk_compose.zk_logic.zk_engine import ZKEngine
+
+        stats = ZKEngine.verification_cache_stats(reset=True)
+        bt.logging.info(
+            f"Verification cache this epoch: {stats['pairings_avoided']} pairings avoided, "
+            f"{stats['pairings_run']} run, {stats['entries']} cached outcomes"
+        )
+
     def resync_metagraph(self):
         """Resyncs the metagraph and updates the hotkeys and moving averages based on the new metagraph."""
         bt.logging.info("resync_metagraph()")
@@ -1,5 +1,7 @@
 import time
 import hashlib
+from typing import List, Optional, Tuple, Union
+from zk_compose.zk_logic.merkle import leaf_hash, merkle_root
 from zk_compose.zk_logic.zk_engine import ZKEngine
 
 def aggregate_proofs(base_proofs, base_subnet_ids=None, depth=1):
@@ -28,3 +30,86 @@ def aggregate_proofs(base_proofs, base_subnet_ids=None, depth=1):
     compression_ratio = input_size / output_size if output_size > 0 else 1.0
     
     return serialized_proof, proving_time, compression_ratio
+
+
+class AggregationScheduler:
+    """
+    Tree-structured recursive aggregation.
+    Splits base proofs into a tree of the requested depth and proves all nodes of a
+    level concurrently on ZKEngine's worker pool (native proving releases the GIL).
+    Each node commits to the count and Merkle root of the base proofs below it, so
+    the root has the same public inputs as prove_composition and verifies against
+    the same VK. Wall-clock time grows with tree height rather than with proof count.
+    Once a level has a single node it is folded alone, so the root is always at `depth`.
+    """
+
+    @staticmethod
+    def fanout(num_proofs: int, depth: int) -> int:
+        """
+        Smallest power-of-two branching factor that folds `num_proofs` leaves into one
+        root in `depth` levels. A power of two keeps every chunk an aligned Merkle
+        subtree, so the root over chunk roots is the root over all leaves.
+        Mirrors zk_bridge's tree::fanout.
+        """
+        fanout = 2
+        while fanout ** max(depth, 1) < num_proofs:
+            fanout *= 2
+        return fanout
+
+    @staticmethod
+    def plan(num_proofs: int, depth: int) -> List[int]:
+        """
+        Number of nodes at each level, leaves' parents first and the root last.
+        """
+        fanout = AggregationScheduler.fanout(num_proofs, depth)
+        levels, width = [], num_proofs
+        for _ in range(max(depth, 1)):
+            width = -(-width // fanout)
+            levels.append(width)
+        return levels
+
+    def aggregate(
+        self,
+        base_proofs: List[Union[str, bytes]],
+        base_subnet_ids: Optional[List[int]] = None,
+        depth: int = 1,
+    ) -> Tuple[bytes, float]:
+        """
+        Proves the tree level by level and returns the root proof and total wall-clock time.
+        """
+        start = time.time()
+        leaves = [(1, leaf_hash(p)) for p in base_proofs]
+        root = self.fold(leaves, self.fanout(len(base_proofs), depth), 1, depth)
+        return root, time.time() - start
+
+    @staticmethod
+    def fold(nodes: List[Tuple[int, bytes]], fanout: int, first_level: int, depth: int) -> bytes:
+        """
+        Proves levels `first_level..depth` over (count, digest) nodes and returns the root proof.
+        """
+        root = None
+        for level in range(first_level, max(depth, 1) + 1):
+            chunks = [nodes[i:i + fanout] for i in range(0, len(nodes), fanout)]
+            tasks = [([c for c, _ in chunk], [d for _, d in chunk], level) for chunk in chunks]
+            results = ZKEngine.prove_nodes(tasks)
+
+            nodes = [(sum(counts), merkle_root(digests)) for counts, digests, _ in tasks]
+            root = results[-1][0]
+        return root
+
+
+def aggregate_proof_tree(base_proofs, base_subnet_ids=None, depth=1):
+    """
+    Tree-structured variant of aggregate_proofs: proves subtrees in parallel.
+    """
+    serialized_proof, proving_time = AggregationScheduler().aggregate(
+        base_proofs,
+        base_subnet_ids=base_subnet_ids,
+        depth=depth,
+    )
+
+    output_size = len(serialized_proof)
+    input_size = sum(len(p) for p in base_proofs)
+    compression_ratio = input_size / output_size if output_size > 0 else 1.0
+
+    return serialized_proof, proving_time, compression_ratio
@@ -1,7 +1,9 @@
+import asyncio
 import bittensor as bt
 import hashlib
 import typing
 from pydantic import BaseModel
+from zk_compose.zk_logic.accumulator import ProofAccumulator
 
 class SN2ProofRequest(bt.Synapse):
     """
@@ -61,3 +63,19 @@ class SN2Client:
         error_msg += f"Received {len(proof_groups)} distinct proof versions. No majority found (3/5)."
         bt.logging.error(error_msg)
         raise ValueError(error_msg)
+
+    async def aggregate(self, task_ids: typing.List[str], depth: int) -> typing.Tuple[bytes, float]:
+        """
+        Fetches the proofs of `task_ids` concurrently and aggregates them in task order.
+        Each proof is folded in as its consensus completes, so the first tree level is
+        proven while later fetches are still in flight.
+        """
+        accumulator = ProofAccumulator(len(task_ids), depth)
+
+        async def fetch(task_id):
+            proof, metadata = await self.fetch_proof_by_task_id(task_id)
+            return proof, metadata.get("subnet_id", 2)
+
+        await accumulator.absorb_as_completed(fetch(task_id) for task_id in task_ids)
+        # finalize waits on chunk proofs queued on ZKEngine's pool, so it runs outside it.
+        return await asyncio.get_running_loop().run_in_executor(None, accumulator.finalize)
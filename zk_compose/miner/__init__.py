@@ -0,0 +1,3 @@
+from .prover_service import ProverService
+from .admission import AdmissionController, AdmissionRejected, edf_priority, request_deadline
+from .single_flight import SingleFlight
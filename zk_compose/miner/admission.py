@@ -0,0 +1,203 @@
+import time
+import heapq
+import asyncio
+import threading
+from contextlib import asynccontextmanager
+from typing import List, Optional
+
+
+class AdmissionRejected(Exception):
+    """Raised for a request the miner cannot finish within its timeout."""
+
+    def __init__(self, queue_depth: int, estimated_wait: float):
+        super().__init__(f"queue depth {queue_depth}, estimated wait {estimated_wait:.2f}s")
+        self.queue_depth = queue_depth
+        self.estimated_wait = estimated_wait
+
+
+class _Ticket:
+    __slots__ = ("units", "deadline", "stake", "seq", "future")
+
+    def __init__(self, units: int, deadline: float, stake: float, seq: int):
+        self.units = units
+        self.deadline = deadline
+        self.stake = stake
+        self.seq = seq
+        self.future: Optional[asyncio.Future] = None
+
+    def __lt__(self, other: "_Ticket") -> bool:
+        # Earliest deadline first; higher stake, then arrival order, break ties.
+        return (self.deadline, -self.stake, self.seq) < (other.deadline, -other.stake, other.seq)
+
+
+class AdmissionController:
+    """
+    Bounded, deadline-aware admission in front of the prover.
+    A request's cost is `len(base_proofs) * recursion_depth` units, and the time per unit
+    is an EWMA of observed proving times. Waiting requests get proving slots in
+    earliest-deadline-first order with stake as the tiebreak. A request is admitted only
+    if the queue has room and the work scheduled ahead of it plus its own cost fits
+    before its deadline; one whose deadline has become infeasible by the time a slot
+    frees up is dropped instead of proved late.
+    """
+
+    def __init__(self, max_queue: int, concurrency: int = 1, seconds_per_unit: float = 0.05, alpha: float = 0.2):
+        if max_queue < 1 or concurrency < 1:
+            raise ValueError("max_queue and concurrency must be at least 1")
+        self.max_queue = max_queue
+        self.concurrency = concurrency
+        self.seconds_per_unit = seconds_per_unit
+        self.alpha = alpha
+
+        self._lock = threading.Lock()
+        self._waiting: List[_Ticket] = []
+        self._seq = 0
+        self._running = 0
+        self._running_units = 0
+        self.admitted = 0
+        self.rejected = 0
+        self.expired = 0
+
+    @staticmethod
+    def cost(num_proofs: int, depth: int) -> int:
+        return max(1, num_proofs) * max(1, depth)
+
+    @property
+    def queue_depth(self) -> int:
+        """Requests admitted but not yet proving."""
+        return len(self._waiting)
+
+    def estimated_wait(self, deadline: float = float("inf"), stake: float = 0.0) -> float:
+        """
+        Seconds until a request with this deadline and stake, admitted now, would start proving.
+        """
+        with self._lock:
+            return self._wait_for(_Ticket(0, deadline, stake, self._seq))
+
+    def _wait_for(self, ticket: _Ticket) -> float:
+        # Running work plus every waiting request the EDF order puts first.
+        ahead = self._running_units + sum(t.units for t in self._waiting if t < ticket)
+        return ahead * self.seconds_per_unit / self.concurrency
+
+    @asynccontextmanager
+    async def admit(self, units: int, deadline: float, stake: float = 0.0):
+        """
+        Admits `units` of work due by `deadline` (a time.time() value) and holds a proving
+        slot for the body of the block. Raises AdmissionRejected when the request cannot
+        finish in time, either up front or once its turn comes.
+        """
+        ticket = self._enqueue(units, deadline, stake)
+        await self._wait_turn(ticket)
+        try:
+            yield
+        finally:
+            self._finish(ticket)
+
+    def _enqueue(self, units: int, deadline: float, stake: float) -> _Ticket:
+        with self._lock:
+            ticket = _Ticket(units, deadline, stake, self._seq)
+            self._seq += 1
+            wait = self._wait_for(ticket)
+            if len(self._waiting) >= self.max_queue or time.time() + wait + units * self.seconds_per_unit > deadline:
+                self.rejected += 1
+                raise AdmissionRejected(len(self._waiting), wait)
+            self.admitted += 1
+            if self._running < self.concurrency and not self._waiting:
+                self._start(ticket)
+            else:
+                ticket.future = asyncio.get_running_loop().create_future()
+                heapq.heappush(self._waiting, ticket)
+            return ticket
+
+    async def _wait_turn(self, ticket: _Ticket):
+        if ticket.future is None:
+            return
+        try:
+            await ticket.future
+        except asyncio.CancelledError:
+            with self._lock:
+                future = ticket.future
+                if future.done() and not future.cancelled() and future.exception() is None:
+                    # The slot was granted just as we were cancelled; pass it on.
+                    self._running -= 1
+                    self._running_units -= ticket.units
+                    self._dispatch()
+                elif ticket in self._waiting:
+                    self._waiting.remove(ticket)
+                    heapq.heapify(self._waiting)
+            raise
+
+    def _start(self, ticket: _Ticket):
+        self._running += 1
+        self._running_units += ticket.units
+
+    def _finish(self, ticket: _Ticket):
+        with self._lock:
+            self._running -= 1
+            self._running_units -= ticket.units
+            self._dispatch()
+
+    def _dispatch(self):
+        """
+        Hands free slots to waiting requests in EDF order, dropping those that can no longer make it.
+        """
+        now = time.time()
+        while self._waiting and self._running < self.concurrency:
+            ticket = heapq.heappop(self._waiting)
+            if ticket.future.done():
+                continue
+            if now + ticket.units * self.seconds_per_unit > ticket.deadline:
+                self.expired += 1
+                ticket.future.set_exception(AdmissionRejected(len(self._waiting), 0.0))
+                continue
+            self._start(ticket)
+            ticket.future.set_result(None)
+
+    def observe(self, units: int, seconds: float):
+        """
+        Folds the proving time of a completed request into the per-unit estimate.
+        Only real proofs should be reported; cache hits would drag the estimate down.
+        """
+        with self._lock:
+            sample = seconds / max(1, units)
+            self.seconds_per_unit += self.alpha * (sample - self.seconds_per_unit)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "queued": len(self._waiting),
+                "running": self._running,
+                "backlog_units": self._running_units + sum(t.units for t in self._waiting),
+                "seconds_per_unit": self.seconds_per_unit,
+                "admitted": self.admitted,
+                "rejected": self.rejected,
+                "expired": self.expired,
+            }
+
+
+def request_deadline(timeout: Optional[float], sent_ns: Optional[int], margin: float, now: Optional[float] = None) -> float:
+    """
+    Absolute time.time() by which a response must be on its way back.
+    Measured from the dendrite's send time (its nonce, in ns) when that is plausible,
+    otherwise from now; `margin` seconds are kept for the return trip.
+    """
+    now = time.time() if now is None else now
+    timeout = timeout or 12.0
+    start = now
+    if sent_ns:
+        sent = sent_ns / 1e9
+        if now - timeout <= sent <= now:
+            start = sent
+    return start + timeout - margin
+
+
+def edf_priority(deadline: float, stake: float, now: Optional[float] = None) -> float:
+    """
+    Axon priority (higher is served first) for earliest-deadline-first with stake as the
+    tiebreak: inverse slack in milliseconds, plus a stake term below 1 that only orders
+    requests due in the same millisecond.
+    """
+    now = time.time() if now is None else now
+    slack_ms = max(1, round((deadline - now) * 1000))
+    stake = max(0.0, float(stake))
+    return 1e9 / slack_ms + stake / (stake + 1.0)
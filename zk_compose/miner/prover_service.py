@@ -0,0 +1,159 @@
+import os
+import asyncio
+import multiprocessing
+import time
+import bittensor as bt
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, List, Optional, Tuple, Union
+from zk_compose.zk_logic.zk_engine import ZKEngine, ProofGenerationError
+from zk_compose.zk_logic.result_cache import composition_digest
+
+# Warm-up result of the current worker process, reported back by _worker_ready.
+_worker_warmup: Tuple[float, Optional[str]] = (0.0, None)
+
+
+def _init_worker(input_counts: Optional[List[int]], depths: Optional[List[int]], prover_threads: int):
+    """
+    Runs once in every worker process: sizes the native thread pool and loads keys,
+    so the worker's first real proof is as fast as its last.
+    """
+    global _worker_warmup
+
+    # The parent answers repeated tasks from its own result cache; workers never see them.
+    ZKEngine.RESULT_CACHE_SIZE = 0
+    ZKEngine.set_prover_threads(prover_threads)
+
+    if input_counts and depths:
+        start = time.perf_counter()
+        try:
+            ZKEngine.warm_up(input_counts, depths)
+            _worker_warmup = (time.perf_counter() - start, None)
+        except Exception as e:
+            _worker_warmup = (time.perf_counter() - start, str(e))
+
+
+def _worker_ready() -> Tuple[int, float, Optional[str]]:
+    return os.getpid(), _worker_warmup[0], _worker_warmup[1]
+
+
+def _prove_in_worker(base_proofs: List[bytes], base_subnet_ids: List[int], depth: int) -> Tuple[bytes, Dict[str, float]]:
+    return ZKEngine._prove_native(base_proofs, base_subnet_ids, depth)
+
+
+class ProverService:
+    """
+    Runs ZKEngine proving outside the miner's event loop.
+    With `workers` > 0, proofs run in a pool of worker processes, each holding its own
+    warm keys; with 0 they run in-process on the ZKEngine thread pool. Either way the
+    axon keeps accepting, blacklisting and prioritizing requests while a proof runs.
+    """
+
+    def __init__(
+        self,
+        workers: int,
+        warmup_input_counts: Optional[List[int]] = None,
+        warmup_depths: Optional[List[int]] = None,
+        prover_threads: Optional[int] = None,
+    ):
+        if workers < 0:
+            raise ValueError("workers must be at least 0")
+        self.workers = workers
+        self.warmup_input_counts = warmup_input_counts
+        self.warmup_depths = warmup_depths
+        # Workers share the cores instead of each spawning a native pool of all of them.
+        self.prover_threads = prover_threads or max(1, (os.cpu_count() or 1) // max(1, workers))
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                # Forking a process that already runs bittensor's threads is unsafe.
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(self.warmup_input_counts, self.warmup_depths, self.prover_threads),
+            )
+        return self._pool
+
+    def start(self) -> List[Tuple[int, float, Optional[str]]]:
+        """
+        Starts every worker and waits for its warm-up.
+        Returns (pid, warm-up seconds, error or None) for each task, which lands on a distinct
+        worker in practice because each one is busy warming up when the next is submitted.
+        """
+        if self.workers == 0:
+            return []
+        pool = self._get_pool()
+        futures = [pool.submit(_worker_ready) for _ in range(self.workers)]
+        return [future.result() for future in futures]
+
+    @staticmethod
+    def task_key(base_proofs: List[Union[str, bytes]], base_subnet_ids: List[int], depth: int) -> str:
+        """
+        Result-cache key of a proving task.
+        """
+        return composition_digest(base_proofs, base_subnet_ids, depth, ZKEngine.COMPRESSED_PROOFS)
+
+    async def key_for(self, base_proofs: List[Union[str, bytes]], base_subnet_ids: List[int], depth: int) -> str:
+        """
+        task_key computed off the event loop: it hashes every base proof, and hashlib
+        releases the GIL on large inputs.
+        """
+        return await asyncio.get_running_loop().run_in_executor(
+            None, self.task_key, base_proofs, base_subnet_ids, depth
+        )
+
+    @staticmethod
+    def lookup(key: str) -> Optional[Tuple[bytes, Dict[str, float]]]:
+        """
+        The cached proof for a task key, or None. Hits cost no proving slot.
+        """
+        return ZKEngine.lookup_result(key)
+
+    async def prove(
+        self,
+        base_proofs: List[Union[str, bytes]],
+        base_subnet_ids: List[int],
+        depth: int,
+        key: Optional[str] = None,
+    ) -> Tuple[bytes, Dict[str, float]]:
+        """
+        Awaitable ZKEngine.prove_composition_with_timings. Results are cached in this
+        process under `key` (computed when not given), whichever side runs the prover.
+        """
+        loop = asyncio.get_running_loop()
+        cache = ZKEngine._get_result_cache()
+        if cache is not None:
+            key = key or self.task_key(base_proofs, base_subnet_ids, depth)
+            cached = self.lookup(key)
+            if cached is not None:
+                return cached
+
+        if self.workers == 0:
+            # Bytes-like proofs are read in place by the native prover.
+            proof_bytes = [p.encode() if isinstance(p, str) else p for p in base_proofs]
+            recursive_proof, timings = await loop.run_in_executor(
+                ZKEngine._get_executor(), ZKEngine._prove_native, proof_bytes, list(base_subnet_ids), depth
+            )
+        else:
+            # Buffers such as memoryview and mmap cannot cross the process boundary.
+            proof_bytes = [p.encode() if isinstance(p, str) else bytes(p) for p in base_proofs]
+            try:
+                recursive_proof, timings = await loop.run_in_executor(
+                    self._get_pool(), _prove_in_worker, proof_bytes, list(base_subnet_ids), depth
+                )
+            except BrokenProcessPool as e:
+                # A worker died (e.g. killed for memory); the next request gets a fresh pool.
+                bt.logging.error(f"Prover pool broke, restarting it: {e}")
+                self.shutdown()
+                raise ProofGenerationError(f"Prover worker died: {str(e)}")
+
+        if cache is not None:
+            cache.put(key, recursive_proof, timings["total"])
+        return recursive_proof, timings
+
+    def shutdown(self, wait: bool = False):
+        if self._pool is not None:
+            self._pool.shutdown(wait=wait)
+            self._pool = None
@@ -0,0 +1,59 @@
+import asyncio
+from typing import Awaitable, Callable, Dict, TypeVar
+
+T = TypeVar("T")
+
+
+class _Flight:
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Collapses concurrent identical tasks on the event loop: the first caller for a key
+    starts the task, and callers arriving while it is in flight await the same result.
+    The work runs in a task no caller owns, so any caller giving up, the first one
+    included, leaves it running for the rest; it is cancelled only once nobody waits.
+    Nothing is kept once the task settles; repeats after that go to the result cache.
+    """
+
+    def __init__(self):
+        self._inflight: Dict[str, _Flight] = {}
+        self.leaders = 0
+        self.coalesced = 0
+
+    def __len__(self) -> int:
+        return len(self._inflight)
+
+    async def run(self, key: str, task: Callable[[], Awaitable[T]]) -> T:
+        flight = self._inflight.get(key)
+        if flight is None:
+            flight = self._inflight[key] = _Flight(asyncio.ensure_future(task()))
+            flight.task.add_done_callback(lambda done: self._settle(key, done))
+            self.leaders += 1
+        else:
+            self.coalesced += 1
+
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task)
+        except asyncio.CancelledError:
+            if flight.waiters == 1 and not flight.task.done():
+                flight.task.cancel()
+            raise
+        finally:
+            flight.waiters -= 1
+
+    def _settle(self, key: str, task: asyncio.Task):
+        if key in self._inflight and self._inflight[key].task is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            # Marks the exception retrieved when every caller had already gone.
+            task.exception()
+
+    def stats(self) -> dict:
+        return {"inflight": len(self._inflight), "leaders": self.leaders, "coalesced": self.coalesced}
@@ -88,6 +88,15 @@ class ZKCompose(bt.Synapse):
     compression_ratio: typing.Optional[float] = None
     proving_time: typing.Optional[float] = None
 
+    # Native per-stage breakdown of proving_time (setup, synthesis, fft, msm,
+    # serialization, total) plus constraint/witness counts, in seconds.
+    proving_stats: typing.Optional[typing.Dict[str, float]] = None
+
+    # Set by a miner that rejected the request under load: requests waiting
+    # ahead of it and the estimated seconds until it could have started.
+    queue_depth: typing.Optional[int] = None
+    estimated_wait: typing.Optional[float] = None
+
     def deserialize(self) -> typing.Dict[str, typing.Any]:
         """
         Deserialize the miner's response.
@@ -96,5 +105,8 @@ class ZKCompose(bt.Synapse):
             "aggregated_proof": self.aggregated_proof,
             "compression_ratio": self.compression_ratio,
             "proving_time": self.proving_time,
+            "proving_stats": self.proving_stats,
             "recursion_depth": self.recursion_depth,
+            "queue_depth": self.queue_depth,
+            "estimated_wait": self.estimated_wait,
         }
@@ -109,6 +109,29 @@ def add_args(cls, parser):
         default=False,
     )
 
+    parser.add_argument(
+        "--warmup.input_counts",
+        type=int,
+        nargs="+",
+        help="Base proof counts whose keys are generated or loaded at startup.",
+        default=[2, 4, 8],
+    )
+
+    parser.add_argument(
+        "--warmup.depths",
+        type=int,
+        nargs="+",
+        help="Recursion depths whose keys are generated or loaded at startup.",
+        default=[1, 2, 3, 4, 5],
+    )
+
+    parser.add_argument(
+        "--warmup.off",
+        action="store_true",
+        help="Skip the startup warm-up (the first requests then pay for key generation).",
+        default=False,
+    )
+
     parser.add_argument(
         "--wandb.off",
         action="store_true",
@@ -155,6 +178,27 @@ def add_miner_args(cls, parser):
         default=False,
     )
 
+    parser.add_argument(
+        "--miner.prover_workers",
+        type=int,
+        help="Worker processes that run proofs, each with its own warm keys. 0 proves in-process on a thread pool.",
+        default=1,
+    )
+
+    parser.add_argument(
+        "--miner.max_queue",
+        type=int,
+        help="Maximum number of admitted requests waiting for a prover; further requests are rejected.",
+        default=16,
+    )
+
+    parser.add_argument(
+        "--miner.timeout_margin",
+        type=float,
+        help="Seconds of each request's timeout reserved for transport; only the rest is budgeted for queueing and proving.",
+        default=1.0,
+    )
+
     parser.add_argument(
         "--wandb.project_name",
         type=str,
@@ -232,6 +276,43 @@ def add_validator_args(cls, parser):
         default=4096,
     )
 
+    parser.add_argument(
+        "--vk.prefetch_input_counts",
+        type=int,
+        nargs="+",
+        help="Base proof counts whose aggregation VKs are loaded at startup (one per circuit bucket).",
+        default=[2, 3, 4, 5],
+    )
+
+    parser.add_argument(
+        "--vk.prefetch_depths",
+        type=int,
+        nargs="+",
+        help="Recursion depths whose aggregation VKs are loaded at startup.",
+        default=[1, 2, 3, 4, 5],
+    )
+
+    parser.add_argument(
+        "--vk.prefetch_concurrency",
+        type=int,
+        help="Maximum number of VK exports in flight during the startup prefetch.",
+        default=8,
+    )
+
+    parser.add_argument(
+        "--vk.refresh_ahead",
+        type=float,
+        help="Seconds before a cached VK expires at which a hit triggers a background refresh.",
+        default=3600.0,
+    )
+
+    parser.add_argument(
+        "--vk.stale_grace",
+        type=float,
+        help="Seconds past expiry during which a cached VK is still served while it is refreshed.",
+        default=3600.0,
+    )
+
     parser.add_argument(
         "--wandb.project_name",
         type=str,
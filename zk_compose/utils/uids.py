@@ -1,7 +1,7 @@
 import random
 import bittensor as bt
 import numpy as np
-from typing import List
+from typing import Dict, List, NamedTuple
 
 
 def check_uid_availability(
@@ -60,3 +60,25 @@ def get_random_uids(self, k: int, exclude: List[int] = None) -> np.ndarray:
         )
     uids = np.array(random.sample(available_uids, k))
     return uids
+
+
+class MetagraphIndex(NamedTuple):
+    """Per-request lookups into a metagraph snapshot: hotkey -> uid, and stake and validator permit by uid."""
+
+    hotkey_to_uid: Dict[str, int]
+    stake: List[float]
+    validator_permit: List[bool]
+
+
+def index_metagraph(metagraph: "bt.metagraph.Metagraph") -> MetagraphIndex:
+    """Builds a MetagraphIndex. Rebuild it after every metagraph sync; it is never updated in place.
+    Args:
+        metagraph (:obj: bt.metagraph.Metagraph): Metagraph object
+    Returns:
+        MetagraphIndex: O(1) hotkey, stake and validator permit lookups.
+    """
+    return MetagraphIndex(
+        hotkey_to_uid={hotkey: uid for uid, hotkey in enumerate(metagraph.hotkeys)},
+        stake=[float(stake) for stake in metagraph.S],
+        validator_permit=[bool(permit) for permit in metagraph.validator_permit],
+    )
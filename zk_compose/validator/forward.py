@@ -22,11 +22,37 @@ import bittensor as bt
 
 from zk_compose.protocol import ZKCompose
 from zk_compose.validator.reward import get_rewards
+from zk_compose.zk_logic.zk_engine import VerificationContext
 from zk_compose.utils.uids import get_random_uids
 
 
 import random
 import string
+from typing import List, Tuple
+
+# Synthetic base proofs stand in for proofs fetched from other subnets, which recur
+# across tasks under stable ids (e.g. SN2 task ids). Drawing from a fixed pool keeps
+# those ids, so the verifier reuses leaf digests of proofs it has already hashed.
+BASE_PROOF_POOL_SIZE = 64
+
+
+def generate_mock_proof(length=64):
+    return ''.join(random.choices(string.hexdigits, k=length))
+
+
+def draw_base_proofs(self, count: int) -> Tuple[List[str], List[str]]:
+    """
+    Draws up to `count` distinct base proofs from the validator's pool.
+    Returns the proofs and their stable proof keys, in task order.
+    """
+    pool = getattr(self, "base_proof_pool", None)
+    if pool is None:
+        pool = self.base_proof_pool = {
+            f"synthetic-{i}": generate_mock_proof() for i in range(BASE_PROOF_POOL_SIZE)
+        }
+    keys = random.sample(list(pool), min(count, len(pool)))
+    return [pool[key] for key in keys], keys
+
 
 async def forward(self):
     """
@@ -34,12 +60,9 @@ async def forward(self):
     """
     miner_uids = get_random_uids(self, k=self.config.neuron.sample_size)
 
-    # Generate synthetic base proofs for verification (No fake things!)
+    # Draw synthetic base proofs for verification (No fake things!)
     # In production, these would be real proofs from other subnets.
-    def generate_mock_proof(length=64):
-        return ''.join(random.choices(string.hexdigest(), k=length))
-
-    base_proofs = [generate_mock_proof() for _ in range(random.randint(2, 5))]
+    base_proofs, base_proof_keys = draw_base_proofs(self, random.randint(2, 5))
     # Simulate cross-subnet proofs (e.g., SN2, SN8, SN120)
     base_subnet_ids = [random.choice([1, 2, 8, 12, 120]) for _ in range(len(base_proofs))]
     recursion_depth = random.randint(1, 5) # Increased depth range for testing bonuses
@@ -58,15 +81,26 @@ async def forward(self):
 
     bt.logging.info(f"Received {len(responses)} responses from miners for depth {recursion_depth} with {len(set(base_subnet_ids))} unique subnets.")
 
+    query = {
+        "base_proofs": base_proofs,
+        "depth": recursion_depth,
+        "base_subnet_ids": base_subnet_ids,
+        "base_proof_keys": base_proof_keys,
+    }
+
+    # VK lookup and linkage hashing happen once per round, not once per response.
+    try:
+        context = VerificationContext.from_query(query)
+    except Exception as e:
+        bt.logging.error(f"Failed to prepare verification context: {e}")
+        context = None
+
     # Score responses based on mathematical validity and succinctness
     rewards = get_rewards(
         self, 
-        query={
-            "base_proofs": base_proofs, 
-            "depth": recursion_depth,
-            "base_subnet_ids": base_subnet_ids
-        }, 
-        responses=responses
+        query=query, 
+        responses=responses,
+        context=context,
     )
 
     bt.logging.info(f"Scored responses: {rewards}")
@@ -22,11 +22,12 @@ import bittensor as bt
 
 
 import hashlib
-from typing import Dict, Any
+from typing import Dict, Any, Optional, Tuple
 
-def reward(query: Dict[str, Any], response: Dict[str, Any]) -> float:
+def reward(query: Dict[str, Any], response: Dict[str, Any], verification: Optional[Tuple[bool, str]] = None) -> float:
     """
     Reward the miner response based on cryptographic validity and aggregation quality.
+    A precomputed (is_valid, message) verification result may be passed to skip native verification.
     """
     from zk_compose.zk_logic.zk_engine import ZKEngine
     
@@ -42,12 +43,14 @@ def reward(query: Dict[str, Any], response: Dict[str, Any]) -> float:
 
     # 2. Native Cryptographic Verification (O(1) Constant Time)
     # This replaces simulation logic with high-fidelity native verifier calls.
-    is_valid, message = ZKEngine.verify_composition(
-        proof, 
-        base_proofs, 
-        base_subnet_ids, 
-        expected_depth
-    )
+    if verification is None:
+        verification = ZKEngine.verify_composition(
+            proof, 
+            base_proofs, 
+            base_subnet_ids, 
+            expected_depth
+        )
+    is_valid, message = verification
     
     if not is_valid:
         bt.logging.warning(f"Production verification failed: {message}")
@@ -79,8 +82,32 @@ def get_rewards(
     self,
     query: Dict[str, Any],
     responses: List[Dict[str, Any]],
+    context=None,
 ) -> np.ndarray:
     """
     Returns an array of rewards for the given query and responses.
+    All returned proofs are verified together with one batched pairing check against
+    `context` (a VerificationContext for the query, built here when not supplied).
     """
-    return np.array([reward(query, response) for response in responses])
+    from zk_compose.zk_logic.zk_engine import VerificationContext
+
+    answered = [
+        i for i, response in enumerate(responses)
+        if response is not None and response.get("aggregated_proof") is not None
+    ]
+    verifications = [None] * len(responses)
+    if answered:
+        proofs = [responses[i]["aggregated_proof"] for i in answered]
+        try:
+            if context is None:
+                context = VerificationContext.from_query(query)
+            batch = context.verify_batch(proofs)
+        except Exception as e:
+            batch = [(False, f"Verification system error: {str(e)}")] * len(proofs)
+        for i, verification in zip(answered, batch):
+            verifications[i] = verification
+
+    return np.array([
+        reward(query, response, verification)
+        for response, verification in zip(responses, verifications)
+    ])
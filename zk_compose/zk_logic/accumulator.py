@@ -0,0 +1,92 @@
+import asyncio
+import bittensor as bt
+from concurrent.futures import Future
+from typing import Awaitable, Iterable, List, Optional, Tuple, Union
+from zk_compose.zk_logic.zk_engine import ZKEngine, ProofGenerationError
+
+
+class ProofAccumulator:
+    """
+    Incremental front-end to zk_bridge.Accumulator.
+    Base proofs are absorbed as they arrive. When the proof count and depth are known
+    up front, every level-1 chunk of the aggregation tree is proven on ZKEngine's worker
+    pool as soon as its last proof is in, so proving overlaps network I/O and finalize()
+    only pays for the levels above.
+    """
+
+    def __init__(self, num_inputs: Optional[int] = None, depth: Optional[int] = None):
+        import zk_bridge # Native module
+
+        try:
+            self._native = zk_bridge.Accumulator(num_inputs, depth)
+        except Exception as e:
+            raise ProofGenerationError(f"Failed to create accumulator: {str(e)}")
+        self._chunks: List[Future] = []
+
+    def __len__(self) -> int:
+        return len(self._native)
+
+    @property
+    def subnet_ids(self) -> List[int]:
+        return self._native.subnet_ids
+
+    @property
+    def input_bytes(self) -> int:
+        return self._native.input_bytes
+
+    def absorb(self, proof: Union[str, bytes], subnet_id: int, index: Optional[int] = None) -> int:
+        """
+        Folds one base proof in at `index` (the next position when omitted).
+        Returns the number of proofs absorbed so far.
+        """
+        try:
+            chunk = self._native.absorb(proof.encode() if isinstance(proof, str) else proof, subnet_id, index)
+        except Exception as e:
+            raise ProofGenerationError(f"Failed to absorb base proof: {str(e)}")
+
+        if chunk is not None:
+            counts, digests = self._native.chunk(chunk)
+            self._chunks.append(ZKEngine._get_executor().submit(ZKEngine.prove_node, counts, digests, 1))
+        return len(self)
+
+    async def absorb_from_sn2(self, sn2_client, task_id: str, index: Optional[int] = None) -> int:
+        """
+        Fetches one proof from SN2 and absorbs it as soon as consensus is reached.
+        """
+        proof, metadata = await sn2_client.fetch_proof_by_task_id(task_id)
+        return self.absorb(proof, metadata.get("subnet_id", 2), index)
+
+    async def absorb_as_completed(self, fetches: Iterable[Awaitable[Tuple[bytes, int]]]) -> int:
+        """
+        Absorbs (proof, subnet_id) results in completion order, each at the index of its
+        fetch, so the linkage follows request order whichever fetch finishes first.
+        """
+        async def indexed(index, fetch):
+            return index, await fetch
+
+        for done in asyncio.as_completed([indexed(i, f) for i, f in enumerate(fetches)]):
+            index, (proof, subnet_id) = await done
+            self.absorb(proof, subnet_id, index)
+        return len(self)
+
+    def linkage(self) -> List[str]:
+        """
+        Public inputs for the composition, identical to ZKEngine._extract_linkage.
+        """
+        return self._native.linkage()
+
+    def finalize(self, depth: Optional[int] = None) -> Tuple[bytes, float]:
+        """
+        Proves the aggregation of everything absorbed so far.
+        Returns (proof, proving_time) like ZKEngine.prove_composition.
+        """
+        for chunk in self._chunks:
+            # A chunk that failed to prove re-raises its ProofGenerationError here.
+            chunk.result()
+
+        try:
+            proof, timings = self._native.finalize(depth, compressed=ZKEngine.COMPRESSED_PROOFS)
+            return proof, timings.total
+        except Exception as e:
+            bt.logging.error(f"Native proving failed: {e}")
+            raise ProofGenerationError(f"Native proof generation failed: {str(e)}")
@@ -0,0 +1,107 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Iterable, List, Optional, Tuple, Union
+
+# Domain separation between leaves and interior nodes (RFC 6962), so a leaf can
+# never be passed off as a subtree.
+LEAF_PREFIX = b"\x00"
+NODE_PREFIX = b"\x01"
+
+
+def leaf_hash(proof: Union[str, bytes]) -> bytes:
+    hasher = hashlib.sha256(LEAF_PREFIX)
+    hasher.update(proof.encode() if isinstance(proof, str) else proof)
+    return hasher.digest()
+
+
+def node_hash(left: bytes, right: bytes) -> bytes:
+    return hashlib.sha256(NODE_PREFIX + left + right).digest()
+
+
+class MerkleBuilder:
+    """
+    Streaming RFC 6962 Merkle root over leaf digests.
+    Only the peaks of the complete subtrees seen so far are kept (O(log n) memory),
+    so leaves can be appended as proofs arrive.
+    """
+
+    def __init__(self):
+        self._peaks: List[Tuple[int, bytes]] = []
+        self.size = 0
+
+    def append(self, proof: Union[str, bytes]):
+        self.append_digest(leaf_hash(proof))
+
+    def append_digest(self, digest: bytes):
+        height = 0
+        while self._peaks and self._peaks[-1][0] == height:
+            _, left = self._peaks.pop()
+            digest = node_hash(left, digest)
+            height += 1
+        self._peaks.append((height, digest))
+        self.size += 1
+
+    def root(self) -> bytes:
+        if not self._peaks:
+            return hashlib.sha256().digest()
+        # Peaks shrink left to right; folding from the right reproduces the
+        # split-at-largest-power-of-two shape of RFC 6962.
+        root = self._peaks[-1][1]
+        for _, peak in reversed(self._peaks[:-1]):
+            root = node_hash(peak, root)
+        return root
+
+
+def merkle_root(leaf_digests: Iterable[bytes]) -> bytes:
+    builder = MerkleBuilder()
+    for digest in leaf_digests:
+        builder.append_digest(digest)
+    return builder.root()
+
+
+class LeafDigestCache:
+    """
+    Leaf digests keyed by a stable proof identity supplied by the caller, such as an
+    SN2 task id or a content digest it already holds, so a proof seen in an earlier
+    task is not re-hashed. Only keys and 32-byte digests are stored, never the proofs,
+    and the cache is bounded by the bytes of those keys and digests. Proofs without a
+    key are hashed on every call.
+    """
+
+    def __init__(self, max_bytes: int = 1 << 20):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, bytes]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def nbytes(self) -> int:
+        return self._bytes
+
+    def get(self, proof: Union[str, bytes], key: Optional[str] = None) -> bytes:
+        if key is None:
+            return leaf_hash(proof)
+
+        with self._lock:
+            digest = self._entries.get(key)
+            if digest is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return digest
+
+        digest = leaf_hash(proof)
+        with self._lock:
+            self.misses += 1
+            if key not in self._entries:
+                self._entries[key] = digest
+                self._bytes += len(key) + len(digest)
+            while self._bytes > self.max_bytes and self._entries:
+                evicted, old = self._entries.popitem(last=False)
+                self._bytes -= len(evicted) + len(old)
+        return digest
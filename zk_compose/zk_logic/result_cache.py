@@ -0,0 +1,122 @@
+import os
+import time
+import sqlite3
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple, Union
+
+
+def composition_digest(base_proofs: List[Union[str, bytes]], base_subnet_ids: List[int], depth: int, compressed: bool) -> str:
+    """
+    Content address of a prove_composition request.
+    Every field is length-prefixed so different splits of the same bytes never collide.
+    The circuit version is part of the address, so proofs cached on disk by an older
+    layout are never served after an upgrade.
+    """
+    import zk_bridge # Native module
+
+    hasher = hashlib.sha256()
+    hasher.update(f"v{zk_bridge.CIRCUIT_VERSION}:d{depth}:c{int(compressed)}:n{len(base_proofs)}:".encode())
+    for p in base_proofs:
+        data = p.encode() if isinstance(p, str) else p
+        hasher.update(len(data).to_bytes(8, "little"))
+        hasher.update(data)
+    hasher.update(",".join(str(s) for s in base_subnet_ids).encode())
+    return hasher.hexdigest()
+
+
+class ResultCache:
+    """
+    Bounded cache of aggregated proofs: an in-memory LRU with a TTL, optionally
+    backed by a sqlite file so results survive restarts.
+    """
+
+    def __init__(self, max_entries: int = 256, ttl: float = 600.0, path: Optional[str] = None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[bytes, float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._db = None
+        if path:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS results "
+                "(key TEXT PRIMARY KEY, proof BLOB NOT NULL, proving_time REAL NOT NULL, created REAL NOT NULL)"
+            )
+            self._db.commit()
+
+    def get(self, key: str) -> Optional[Tuple[bytes, float]]:
+        """
+        Returns (proof, proving_time) for a live entry, or None.
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                proof, proving_time, created = entry
+                if now - created < self.ttl:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return proof, proving_time
+                del self._entries[key]
+
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT proof, proving_time, created FROM results WHERE key = ? AND created > ?",
+                    (key, now - self.ttl),
+                ).fetchone()
+                if row is not None:
+                    proof, proving_time, created = bytes(row[0]), row[1], row[2]
+                    self._insert(key, proof, proving_time, created)
+                    self.hits += 1
+                    self.disk_hits += 1
+                    return proof, proving_time
+
+            self.misses += 1
+            return None
+
+    def put(self, key: str, proof: bytes, proving_time: float):
+        created = time.time()
+        with self._lock:
+            self._insert(key, proof, proving_time, created)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?)",
+                    (key, proof, proving_time, created),
+                )
+                # Expired rows are dropped on write so the file stays bounded by the TTL.
+                self._db.execute("DELETE FROM results WHERE created <= ?", (created - self.ttl,))
+                self._db.commit()
+
+    def _insert(self, key: str, proof: bytes, proving_time: float, created: float):
+        self._entries[key] = (proof, proving_time, created)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM results")
+                self._db.commit()
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
@@ -1,47 +1,279 @@
 import os
+import mmap
 import time
+import threading
 import bittensor as bt
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple, Union
+
+# VKs are bytes when freshly fetched and read-only mmaps when loaded from disk.
+VKBytes = Union[bytes, mmap.mmap]
 
 class VKRegistry:
     """
     Manages Verification Keys (VKs) for different subnets and proof systems.
-    Features local disk caching and TTL-based invalidation.
+    Two cache tiers with TTL-based invalidation: an in-process LRU over
+    memory-mapped files on local disk.
     """
     CACHE_DIR = os.path.expanduser("~/.zk_compose/vks")
     CACHE_TTL = 86400  # 24 hours (default)
 
+    # VKs for ZK-Compose's own aggregation circuit are exported by zk_bridge.
+    NATIVE_SUBNET_ID = 0
+    NATIVE_PROOF_SYSTEM = "groth16_bn254"
+    # Exported VKs are stored compressed when ZK_COMPOSE_SERIALIZATION=compressed.
+    COMPRESSED_VKS = os.environ.get("ZK_COMPOSE_SERIALIZATION", "uncompressed") == "compressed"
+
+    # In-process tier in front of the disk cache; a warm hit makes no syscalls.
+    MAX_MEMORY_ENTRIES = int(os.environ.get("ZK_COMPOSE_VK_MEMORY_ENTRIES", 256))
+
+    # Stale-while-revalidate: within REFRESH_AHEAD seconds of expiry a hit triggers a
+    # background refresh, and up to STALE_GRACE seconds past expiry the old VK is still
+    # served while that refresh runs. Only beyond the grace window does a caller block.
+    REFRESH_AHEAD = float(os.environ.get("ZK_COMPOSE_VK_REFRESH_AHEAD", 3600))
+    STALE_GRACE = float(os.environ.get("ZK_COMPOSE_VK_STALE_GRACE", 3600))
+    REFRESH_WORKERS = 2
+
+    _memory: "OrderedDict[str, Tuple[VKBytes, float]]" = OrderedDict()
+    _lock = threading.Lock()
+    _cache_dir_ready = False
+    _inflight: Dict[str, Future] = {}
+    _refreshing: set = set()
+    _refresher: ThreadPoolExecutor = None
+    _stats = {
+        "hits": 0, "disk_hits": 0, "misses": 0, "expirations": 0, "coalesced": 0,
+        "stale_served": 0, "refreshes": 0, "refresh_failures": 0,
+    }
+
     @classmethod
-    def get_vk(cls, subnet_id: int, proof_system: str, vk_hash: str) -> bytes:
+    def get_vk(cls, subnet_id: int, proof_system: str, vk_hash: str) -> VKBytes:
         """
-        Retrieves a VK from cache or external storage (IPFS/Registry).
+        Retrieves a VK from memory, the disk cache, or external storage (IPFS/Registry).
+        Disk-cached VKs are memory-mapped rather than read, so they are never copied.
         """
-        if not os.path.exists(cls.CACHE_DIR):
-            os.makedirs(cls.CACHE_DIR, exist_ok=True)
-
         cache_key = f"{subnet_id}_{proof_system}_{vk_hash}"
+
         cache_path = os.path.join(cls.CACHE_DIR, f"{cache_key}.vk")
 
-        # 1. Check Cache Validity
-        if os.path.exists(cache_path):
-            cache_age = time.time() - os.path.getmtime(cache_path)
-            if cache_age < cls.CACHE_TTL:
-                bt.logging.debug(f"Cache hit for VK: {cache_key}")
-                with open(cache_path, "rb") as f:
-                    return f.read()
+        # 1. In-memory tier
+        vk, needs_refresh, expired = cls._get_from_memory(cache_key)
+        if vk is not None:
+            if needs_refresh:
+                cls._refresh_in_background(cache_key, cache_path, subnet_id, proof_system, vk_hash)
+            return vk
+
+        # 2. Disk tier
+        cached = cls._load_from_disk(cache_path)
+        if cached is not None:
+            vk, expires_at = cached
+            now = time.time()
+            if now < expires_at + cls.STALE_GRACE:
+                bt.logging.debug(f"Disk cache hit for VK: {cache_key}")
+                cls._put_in_memory(cache_key, vk, expires_at, disk_hit=True)
+                if now >= expires_at - cls.REFRESH_AHEAD:
+                    cls._refresh_in_background(cache_key, cache_path, subnet_id, proof_system, vk_hash)
+                return vk
+            bt.logging.info(f"VK Cache expired for {cache_key}. Re-fetching...")
+            if not expired:
+                with cls._lock:
+                    cls._stats["expirations"] += 1
+
+        # 3. Fetch once, however many callers missed at the same time
+        return cls._fetch_single_flight(cache_key, cache_path, subnet_id, proof_system, vk_hash)
+
+    @classmethod
+    def _fetch_single_flight(cls, cache_key: str, cache_path: str, subnet_id: int, proof_system: str, vk_hash: str, refresh: bool = False) -> VKBytes:
+        """
+        Concurrent misses for the same key share one fetch: the first caller
+        fetches, the rest wait on its future. `refresh` fetches even if a live entry exists.
+        """
+        with cls._lock:
+            entry = cls._memory.get(cache_key)
+            if not refresh and entry is not None and time.time() < entry[1]:
+                # Another caller finished the fetch since our miss.
+                return entry[0]
+            future = cls._inflight.get(cache_key)
+            leader = future is None
+            if leader:
+                future = cls._inflight[cache_key] = Future()
+            else:
+                cls._stats["coalesced"] += 1
+
+        if not leader:
+            return future.result()
+
+        try:
+            # Fetch from the native bridge or the External Registry (Simulated for Production)
+            if proof_system == cls.NATIVE_PROOF_SYSTEM:
+                vk = cls._export_native_vk(vk_hash)
             else:
-                bt.logging.info(f"VK Cache expired for {cache_key}. Re-fetching...")
+                vk = cls._fetch_from_decentralized_storage(subnet_id, proof_system, vk_hash)
+
+            # Save to both tiers
+            cls._store_to_disk(cache_path, vk)
+            cls._put_in_memory(cache_key, vk, time.time() + cls.CACHE_TTL)
+            future.set_result(vk)
+            return vk
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with cls._lock:
+                cls._inflight.pop(cache_key, None)
+
+    @classmethod
+    def _refresh_in_background(cls, cache_key: str, cache_path: str, subnet_id: int, proof_system: str, vk_hash: str):
+        with cls._lock:
+            # Hits keep arriving until the refresh lands; schedule it only once.
+            if cache_key in cls._inflight or cache_key in cls._refreshing:
+                return
+            cls._refreshing.add(cache_key)
+            if cls._refresher is None:
+                cls._refresher = ThreadPoolExecutor(max_workers=cls.REFRESH_WORKERS, thread_name_prefix="vk_refresh")
+            cls._stats["refreshes"] += 1
+        cls._refresher.submit(cls._background_refresh, cache_key, cache_path, subnet_id, proof_system, vk_hash)
+
+    @classmethod
+    def _background_refresh(cls, cache_key: str, cache_path: str, subnet_id: int, proof_system: str, vk_hash: str):
+        try:
+            cls._fetch_single_flight(cache_key, cache_path, subnet_id, proof_system, vk_hash, refresh=True)
+            bt.logging.debug(f"Refreshed VK: {cache_key}")
+        except Exception as e:
+            # The stale copy keeps being served until the grace window runs out.
+            with cls._lock:
+                cls._stats["refresh_failures"] += 1
+            bt.logging.warning(f"Background VK refresh failed for {cache_key}: {e}")
+        finally:
+            with cls._lock:
+                cls._refreshing.discard(cache_key)
+
+    @classmethod
+    def prefetch(cls, input_counts: List[int], depths: List[int], max_concurrency: int = 8) -> Dict[Tuple[int, int], bool]:
+        """
+        Loads the aggregation-circuit VK of every (bucket, depth) shape covering
+        `input_counts` at `depths` concurrently, at most `max_concurrency` at a time,
+        so scoring never waits on a first export. Returns whether each shape was
+        loaded; failures are logged, not raised.
+        """
+        import zk_bridge # Native module
 
-        # 2. Fetch from External Registry (Simulated for Production)
-        vk = cls._fetch_from_decentralized_storage(subnet_id, proof_system, vk_hash)
-        
-        # 3. Save to Cache
+        buckets = sorted({zk_bridge.circuit_bucket(n) for n in input_counts})
+        shapes = [(bucket, depth) for depth in depths for bucket in buckets]
+        results = {}
+        with ThreadPoolExecutor(max_workers=max(1, min(max_concurrency, len(shapes) or 1))) as pool:
+            futures = {pool.submit(cls.get_composition_vk, bucket, depth): (bucket, depth) for bucket, depth in shapes}
+            for future, shape in futures.items():
+                try:
+                    future.result()
+                    results[shape] = True
+                except Exception as e:
+                    bt.logging.error(f"Failed to prefetch VK for {shape[0]} inputs at depth {shape[1]}: {e}")
+                    results[shape] = False
+        return results
+
+    @classmethod
+    def stats(cls) -> dict:
+        """
+        Hit, disk-hit, miss and expiry counters of the VK cache, misses that were
+        coalesced into another caller's fetch, and stale-while-revalidate activity.
+        """
+        with cls._lock:
+            return dict(cls._stats, entries=len(cls._memory))
+
+    @classmethod
+    def clear_memory(cls):
+        with cls._lock:
+            cls._memory.clear()
+
+    @classmethod
+    def _get_from_memory(cls, cache_key: str) -> Tuple[Optional[VKBytes], bool, bool]:
+        """
+        Returns (vk, needs_refresh, expired). vk is None on a miss; needs_refresh is
+        set when the entry is close to (or within the grace window past) expiry, and
+        expired when an entry was found but had outlived its grace window.
+        """
+        with cls._lock:
+            entry = cls._memory.get(cache_key)
+            if entry is not None:
+                vk, expires_at = entry
+                now = time.time()
+                if now < expires_at + cls.STALE_GRACE:
+                    cls._memory.move_to_end(cache_key)
+                    cls._stats["hits"] += 1
+                    if now >= expires_at:
+                        cls._stats["stale_served"] += 1
+                    return vk, now >= expires_at - cls.REFRESH_AHEAD, False
+                del cls._memory[cache_key]
+                cls._stats["expirations"] += 1
+            cls._stats["misses"] += 1
+            return None, False, entry is not None
+
+    @classmethod
+    def _put_in_memory(cls, cache_key: str, vk: VKBytes, expires_at: float, disk_hit: bool = False):
+        with cls._lock:
+            cls._memory[cache_key] = (vk, expires_at)
+            cls._memory.move_to_end(cache_key)
+            while len(cls._memory) > cls.MAX_MEMORY_ENTRIES:
+                cls._memory.popitem(last=False)
+            if disk_hit:
+                cls._stats["disk_hits"] += 1
+
+    @classmethod
+    def _load_from_disk(cls, cache_path: str) -> Optional[Tuple[VKBytes, float]]:
+        """
+        Maps a cached VK read-only. Returns (vk, expires_at), or None when absent.
+        """
         try:
-            with open(cache_path, "wb") as f:
+            with open(cache_path, "rb") as f:
+                expires_at = os.fstat(f.fileno()).st_mtime + cls.CACHE_TTL
+                # Files are replaced by rename, never rewritten in place, so the mapping stays valid.
+                return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ), expires_at
+        except (FileNotFoundError, ValueError):
+            # ValueError: empty files cannot be mapped.
+            return None
+        except OSError as e:
+            bt.logging.error(f"Failed to read cached VK {cache_path}: {e}")
+            return None
+
+    @classmethod
+    def _store_to_disk(cls, cache_path: str, vk: VKBytes):
+        try:
+            if not cls._cache_dir_ready:
+                os.makedirs(cls.CACHE_DIR, exist_ok=True)
+                cls._cache_dir_ready = True
+            tmp_path = f"{cache_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "wb") as f:
                 f.write(vk)
+            os.replace(tmp_path, cache_path)
         except Exception as e:
             bt.logging.error(f"Failed to cache VK: {e}")
 
-        return vk
+    @classmethod
+    def get_composition_vk(cls, num_inputs: int, depth: int) -> VKBytes:
+        """
+        Retrieves the VK of the aggregation circuit for a given shape (input count, depth).
+        Input counts are bucketed natively, so all counts in one bucket share a VK.
+        The circuit version is part of the key, so VKs cached for an older layout are never served.
+        """
+        import zk_bridge # Native module
+
+        return cls.get_vk(
+            subnet_id=cls.NATIVE_SUBNET_ID,
+            proof_system=cls.NATIVE_PROOF_SYSTEM,
+            vk_hash=f"v{zk_bridge.CIRCUIT_VERSION}_n{zk_bridge.circuit_bucket(num_inputs)}_d{depth}",
+        )
+
+    @classmethod
+    def _export_native_vk(cls, vk_hash: str) -> bytes:
+        """
+        Exports an aggregation-circuit VK from zk_bridge's key cache.
+        """
+        import zk_bridge # Native module
+
+        _, num_inputs, depth = (int(part[1:]) for part in vk_hash.split("_"))
+        bt.logging.info(f"Exporting native VK for {num_inputs} inputs at depth {depth}...")
+        return zk_bridge.export_verifying_key(num_inputs, depth, compressed=cls.COMPRESSED_VKS)
 
     @classmethod
     def _fetch_from_decentralized_storage(cls, subnet_id: int, proof_system: str, vk_hash: str) -> bytes:
@@ -1,9 +1,20 @@
+import os
+import mmap
 import hashlib
 import json
 import time
+import threading
 import bittensor as bt
-from typing import List, Union, Tuple
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Union, Tuple
 from zk_compose.zk_logic.vk_registry import VKRegistry
+from zk_compose.zk_logic.result_cache import ResultCache, composition_digest
+from zk_compose.zk_logic.merkle import LeafDigestCache, MerkleBuilder
+
+# Objects zk_bridge reads in place through the buffer protocol.
+BUFFER_TYPES = (bytes, bytearray, memoryview, mmap.mmap)
+BytesLike = Union[bytes, bytearray, memoryview, mmap.mmap]
 
 # 1. Native Exception Hierarchy
 class ZKBridgeError(Exception):
@@ -23,64 +34,453 @@ class ZKEngine:
     Production-grade ZK Logic Engine.
     Exposes native Rust proving and verification via zk_bridge.
     """
+    # Point encoding for aggregated proofs: "uncompressed" (faster to verify) or "compressed" (smaller).
+    COMPRESSED_PROOFS = os.environ.get("ZK_COMPOSE_SERIALIZATION", "uncompressed") == "compressed"
+
+    # Native calls release the GIL, so a thread pool gives real parallelism.
+    MAX_WORKERS = int(os.environ.get("ZK_COMPOSE_ENGINE_WORKERS", os.cpu_count() or 1))
+
+    _executor: ThreadPoolExecutor = None
+    _executor_lock = threading.Lock()
+
+    @classmethod
+    def set_max_workers(cls, max_workers: int):
+        """
+        Resizes the worker pool used by prove_many/verify_many.
+        """
+        if max_workers < 1:
+            raise ValueError("max_workers must be at least 1")
+        with cls._executor_lock:
+            cls.MAX_WORKERS = max_workers
+            if cls._executor is not None:
+                cls._executor.shutdown(wait=False)
+                cls._executor = None
+
+    @classmethod
+    def _get_executor(cls) -> ThreadPoolExecutor:
+        with cls._executor_lock:
+            if cls._executor is None:
+                cls._executor = ThreadPoolExecutor(
+                    max_workers=cls.MAX_WORKERS, thread_name_prefix="zk_engine"
+                )
+            return cls._executor
+
+    @staticmethod
+    def set_prover_threads(num_threads: int):
+        """
+        Sets the native MSM/FFT thread budget, shared by all in-flight proofs.
+        Defaults to ZK_COMPOSE_PROVER_THREADS, or all cores, when never set.
+        """
+        import zk_bridge # Native module
+
+        zk_bridge.set_num_threads(num_threads)
+
+    @staticmethod
+    def get_prover_threads() -> int:
+        """
+        Returns the native thread budget (1 when the bridge was built without `parallel`).
+        """
+        import zk_bridge # Native module
+
+        return zk_bridge.get_num_threads()
+
+    @staticmethod
+    def max_depth() -> int:
+        """
+        Deepest recursion the native prover accepts (ZK_COMPOSE_MAX_DEPTH); deeper requests are rejected.
+        """
+        import zk_bridge # Native module
+
+        return zk_bridge.max_depth()
+
+    @classmethod
+    def configure_parallelism(cls, concurrent_proofs: int, threads_per_proof: int):
+        """
+        Splits cores between concurrent requests and parallelism inside a proof.
+        `concurrent_proofs` pool workers feed one native pool of
+        `concurrent_proofs * threads_per_proof` threads, so each proof gets about
+        `threads_per_proof` threads under full load and more when the miner is idle.
+        """
+        cls.set_max_workers(concurrent_proofs)
+        cls.set_prover_threads(concurrent_proofs * threads_per_proof)
+
+    # Prepared native verifiers, keyed by sha256 of the VK bytes.
+    MAX_VERIFIERS = 32
+
+    _verifiers: "OrderedDict[str, object]" = OrderedDict()
+    _verifiers_lock = threading.Lock()
+
+    @classmethod
+    def _get_verifier(cls, vk: bytes, vk_digest: str = None):
+        """
+        Returns a zk_bridge.Verifier for the VK, preparing it only on first use.
+        """
+        import zk_bridge # Native module
+
+        vk_digest = vk_digest or hashlib.sha256(vk).hexdigest()
+        with cls._verifiers_lock:
+            verifier = cls._verifiers.get(vk_digest)
+            if verifier is not None:
+                cls._verifiers.move_to_end(vk_digest)
+                return verifier
+
+        verifier = zk_bridge.Verifier(vk)
+        with cls._verifiers_lock:
+            cls._verifiers[vk_digest] = verifier
+            while len(cls._verifiers) > cls.MAX_VERIFIERS:
+                cls._verifiers.popitem(last=False)
+        return verifier
+
+    # Native verification outcomes keyed by (sha256(proof), linkage, vk_hash). Copied
+    # answers, retries and repeated challenges skip the pairing check entirely.
+    MAX_VERIFIED_RESULTS = int(os.environ.get("ZK_COMPOSE_VERIFY_CACHE_SIZE", 4096))
+
+    _verified: "OrderedDict[Tuple[str, str, str], bool]" = OrderedDict()
+    _verified_lock = threading.Lock()
+    _verify_stats = {"pairings_run": 0, "pairings_avoided": 0}
+
+    @classmethod
+    def _lookup_verified(cls, key: Tuple[str, str, str]):
+        with cls._verified_lock:
+            is_valid = cls._verified.get(key)
+            if is_valid is not None:
+                cls._verified.move_to_end(key)
+            return is_valid
+
+    @classmethod
+    def _record_verified(cls, outcomes: dict, pairings_avoided: int):
+        with cls._verified_lock:
+            for key, is_valid in outcomes.items():
+                cls._verified[key] = is_valid
+                cls._verified.move_to_end(key)
+            while len(cls._verified) > cls.MAX_VERIFIED_RESULTS:
+                cls._verified.popitem(last=False)
+            cls._verify_stats["pairings_run"] += len(outcomes)
+            cls._verify_stats["pairings_avoided"] += pairings_avoided
+
+    @classmethod
+    def verification_cache_stats(cls, reset: bool = False) -> dict:
+        """
+        Verifications run natively vs. answered from the outcome cache since the last reset.
+        Validators reset this once per epoch, when setting weights.
+        """
+        with cls._verified_lock:
+            stats = dict(cls._verify_stats, entries=len(cls._verified))
+            if reset:
+                cls._verify_stats.update(pairings_run=0, pairings_avoided=0)
+            return stats
+
+    # Aggregated proofs keyed by a digest of the request (0 entries disables the cache).
+    RESULT_CACHE_SIZE = int(os.environ.get("ZK_COMPOSE_RESULT_CACHE_SIZE", 256))
+    RESULT_CACHE_TTL = float(os.environ.get("ZK_COMPOSE_RESULT_CACHE_TTL", 600))
+    RESULT_CACHE_PATH = os.environ.get("ZK_COMPOSE_RESULT_CACHE_PATH")
+
+    _result_cache: ResultCache = None
+    _result_cache_lock = threading.Lock()
+
+    @classmethod
+    def _get_result_cache(cls) -> ResultCache:
+        with cls._result_cache_lock:
+            if cls._result_cache is None and cls.RESULT_CACHE_SIZE > 0:
+                cls._result_cache = ResultCache(cls.RESULT_CACHE_SIZE, cls.RESULT_CACHE_TTL, cls.RESULT_CACHE_PATH)
+            return cls._result_cache
+
+    @classmethod
+    def result_cache_stats(cls) -> dict:
+        """
+        Hit/miss counters of the prove_composition result cache.
+        """
+        cache = cls._get_result_cache()
+        return cache.stats() if cache is not None else {}
 
     @staticmethod
     def prove_composition(base_proofs: List[Union[str, bytes]], base_subnet_ids: List[int], depth: int) -> Tuple[bytes, float]:
         """
         Executes native recursive proving. O(n * depth) complexity.
         """
+        proof, timings = ZKEngine.prove_composition_with_timings(base_proofs, base_subnet_ids, depth)
+        return proof, timings["total"]
+
+    @staticmethod
+    def prove_composition_with_timings(base_proofs: List[Union[str, bytes]], base_subnet_ids: List[int], depth: int) -> Tuple[bytes, Dict[str, float]]:
+        """
+        Like prove_composition, but returns the native per-stage breakdown (setup, synthesis,
+        fft, msm, serialization, total, plus constraint and witness counts) instead of one duration.
+        A result-cache hit reports only the original `total`, with `cache_hit` set to 1.
+        """
+        # Ensure binary format for native bridge. Bytes-like objects (bytes, bytearray,
+        # memoryview, mmap) are passed straight through and read natively without a copy.
+        proof_bytes = [p.encode() if isinstance(p, str) else p for p in base_proofs]
+
+        # Validators repeat tasks across miners and rounds; identical requests reuse the proof.
+        cache = ZKEngine._get_result_cache()
+        if cache is not None:
+            key = composition_digest(proof_bytes, base_subnet_ids, depth, ZKEngine.COMPRESSED_PROOFS)
+            cached = ZKEngine.lookup_result(key)
+            if cached is not None:
+                return cached
+
+        recursive_proof, timings = ZKEngine._prove_native(proof_bytes, base_subnet_ids, depth)
+
+        if cache is not None:
+            cache.put(key, recursive_proof, timings["total"])
+        return recursive_proof, timings
+
+    @staticmethod
+    def lookup_result(key: str) -> Optional[Tuple[bytes, Dict[str, float]]]:
+        """
+        Result-cache lookup by composition_digest, in prove_composition_with_timings' return shape.
+        """
+        cache = ZKEngine._get_result_cache()
+        cached = cache.get(key) if cache is not None else None
+        if cached is None:
+            return None
+        recursive_proof, proving_time = cached
+        return recursive_proof, {"total": proving_time, "cache_hit": 1.0}
+
+    @staticmethod
+    def _prove_native(proof_bytes: List[BytesLike], base_subnet_ids: List[int], depth: int) -> Tuple[bytes, Dict[str, float]]:
+        """
+        Runs the native prover on already-encoded base proofs, bypassing the result cache.
+        """
         import zk_bridge # Native module
-        
+
         try:
-            # Ensure binary format for native bridge
-            proof_bytes = [p.encode() if isinstance(p, str) else p for p in base_proofs]
-            
-            # Call Native Prover
-            recursive_proof, proving_time = zk_bridge.prove_recursive_composition(
+            recursive_proof, timings = zk_bridge.prove_recursive_composition_timed(
                 proof_bytes,
                 base_subnet_ids,
-                depth
+                depth,
+                compressed=ZKEngine.COMPRESSED_PROOFS,
             )
-            
-            return recursive_proof, proving_time
-            
+            return recursive_proof, dict(timings.as_dict(), cache_hit=0.0)
         except Exception as e:
             bt.logging.error(f"Native proving failed: {e}")
             raise ProofGenerationError(f"Native proof generation failed: {str(e)}")
 
     @staticmethod
-    def verify_composition(serialized_proof: bytes, base_proofs: List[Union[str, bytes]], base_subnet_ids: List[int], depth: int) -> Tuple[bool, str]:
+    def prove_node(counts: List[int], digests: List[bytes], level: int) -> Tuple[bytes, float]:
         """
-        Executes native cryptographic verification. O(1) constant time.
+        Proves one node of the aggregation tree over children holding `counts` base
+        proofs under the Merkle roots `digests` (see folding_logic.AggregationScheduler).
         """
         import zk_bridge # Native module
-        
+
         try:
-            # 1. Verification Key Management
-            # In a real scenario, the vk_hash would be extracted from metadata.
-            # Here we follow the logic provided by PM review for registry usage.
-            vk = VKRegistry.get_vk(subnet_id=1, proof_system="nova", vk_hash="default_prod")
-            
-            # 2. Extract Public Inputs
-            # In production, this verifies the data root linking.
-            public_inputs = ZKEngine._extract_linkage(base_proofs, base_subnet_ids)
-            
-            # 3. Call Native Verifier
-            is_valid = zk_bridge.verify_recursive_composition(
-                serialized_proof,
-                vk,
-                public_inputs
+            proof, timings = zk_bridge.prove_aggregation_node(
+                counts,
+                digests,
+                level,
+                compressed=ZKEngine.COMPRESSED_PROOFS,
             )
-            
-            return is_valid, "Native cryptographic verification passed" if is_valid else "Invalid proof signature"
-            
+            return proof, timings.total
+        except Exception as e:
+            bt.logging.error(f"Native node proving failed: {e}")
+            raise ProofGenerationError(f"Native proof generation failed: {str(e)}")
+
+    @staticmethod
+    def verify_composition(serialized_proof: bytes, base_proofs: List[Union[str, bytes]], base_subnet_ids: List[int], depth: int) -> Tuple[bool, str]:
+        """
+        Executes native cryptographic verification. O(1) constant time.
+        """
+        try:
+            return VerificationContext(base_proofs, base_subnet_ids, depth).verify(serialized_proof)
         except Exception as e:
             return False, f"Verification system error: {str(e)}"
 
     @staticmethod
-    def _extract_linkage(base_proofs: List[Union[str, bytes]], base_subnet_ids: List[int]) -> List[str]:
+    def verify_batch(serialized_proofs: List[Union[str, bytes]], base_proofs: List[Union[str, bytes]], base_subnet_ids: List[int], depth: int) -> List[Tuple[bool, str]]:
+        """
+        Verifies many proofs of the same task with one batched pairing check.
+        Falls back to per-proof checks natively when the batch fails, so each result is exact.
+        """
+        try:
+            return VerificationContext(base_proofs, base_subnet_ids, depth).verify_batch(serialized_proofs)
+        except Exception as e:
+            return [(False, f"Verification system error: {str(e)}")] * len(serialized_proofs)
+
+    @staticmethod
+    def precompute_keys(depths: List[int], max_inputs: int = None, input_counts: List[int] = None) -> List[Tuple[int, int, float]]:
+        """
+        Generates (or loads) the keys of every tree node for each circuit bucket up to
+        `max_inputs` (or only the buckets of `input_counts`) at each depth, plus the
+        root VKs, so no request pays for setup. Returns (bucket, depth, seconds) per shape.
+        """
+        import zk_bridge # Native module
+
+        if input_counts is not None:
+            buckets = sorted({zk_bridge.circuit_bucket(n) for n in input_counts})
+        else:
+            buckets = zk_bridge.circuit_buckets()
+            if max_inputs is not None:
+                buckets = [b for b in buckets if b <= zk_bridge.circuit_bucket(max_inputs)]
+
+        shapes = []
+        for depth in depths:
+            for bucket in buckets:
+                start = time.perf_counter()
+                # Loads the proving keys into the native LRU and publishes the VK to the registry.
+                zk_bridge.load_keys(bucket, depth)
+                VKRegistry.get_composition_vk(bucket, depth)
+                shapes.append((bucket, depth, time.perf_counter() - start))
+        return shapes
+
+    @staticmethod
+    def warm_up(input_counts: List[int], depths: List[int]) -> List[Tuple[str, float]]:
+        """
+        Loads (or generates) keys for every configured shape, then runs one throwaway
+        prove/verify so native libraries, thread pools and allocators are hot before
+        the first real request. Returns (step, seconds) for each step in order.
+        Raises VerificationError when the throwaway proof does not verify.
         """
-        Creates a technical linkage between the component proofs and the final SNARK.
+        timings = [
+            (f"keys n={bucket} depth={depth}", seconds)
+            for bucket, depth, seconds in ZKEngine.precompute_keys(depths, input_counts=input_counts)
+        ]
+
+        # Fresh random inputs, so neither result cache can answer the throwaway round.
+        n, depth = min(input_counts), min(depths)
+        base_proofs = [os.urandom(32) for _ in range(n)]
+        base_subnet_ids = [0] * n
+
+        start = time.perf_counter()
+        proof, _ = ZKEngine.prove_composition(base_proofs, base_subnet_ids, depth)
+        timings.append((f"prove n={n} depth={depth}", time.perf_counter() - start))
+
+        start = time.perf_counter()
+        is_valid, message = ZKEngine.verify_composition(proof, base_proofs, base_subnet_ids, depth)
+        timings.append((f"verify n={n} depth={depth}", time.perf_counter() - start))
+        if not is_valid:
+            # A prover and verifier that disagree would zero every reward; fail loudly at startup.
+            raise VerificationError(f"Warm-up proof did not verify: {message}")
+        return timings
+
+    @classmethod
+    def prove_many(cls, tasks: List[Tuple[List[Union[str, bytes]], List[int], int]]) -> List[Tuple[bytes, float]]:
         """
-        combined = b"".join([p.encode() if isinstance(p, str) else p for p in base_proofs])
-        return [hashlib.sha256(combined).hexdigest()]
+        Proves several (base_proofs, base_subnet_ids, depth) tasks concurrently on the worker pool.
+        Results are returned in task order; the first failure is re-raised.
+        """
+        executor = cls._get_executor()
+        futures = [executor.submit(cls.prove_composition, *task) for task in tasks]
+        return [future.result() for future in futures]
+
+    @classmethod
+    def prove_nodes(cls, tasks: List[Tuple[List[int], List[bytes], int]]) -> List[Tuple[bytes, float]]:
+        """
+        Proves several (counts, digests, level) tree nodes concurrently on the worker pool.
+        Results are returned in task order; the first failure is re-raised.
+        """
+        executor = cls._get_executor()
+        futures = [executor.submit(cls.prove_node, *task) for task in tasks]
+        return [future.result() for future in futures]
+
+    @classmethod
+    def verify_many(cls, tasks: List[Tuple[bytes, List[Union[str, bytes]], List[int], int]]) -> List[Tuple[bool, str]]:
+        """
+        Verifies several (serialized_proof, base_proofs, base_subnet_ids, depth) tasks concurrently.
+        """
+        executor = cls._get_executor()
+        futures = [executor.submit(cls.verify_composition, *task) for task in tasks]
+        return [future.result() for future in futures]
+
+    # Leaf digests of recently seen proofs by proof key, so overlapping tasks only hash new leaves.
+    MAX_LEAF_DIGEST_BYTES = int(os.environ.get("ZK_COMPOSE_LEAF_CACHE_BYTES", 1 << 20))
+    _leaf_digests = LeafDigestCache(MAX_LEAF_DIGEST_BYTES)
+
+    @staticmethod
+    def _extract_linkage(base_proofs: List[Union[str, bytes]], base_subnet_ids: List[int], proof_keys: Optional[List[str]] = None) -> List[str]:
+        """
+        Creates a technical linkage between the component proofs and the final SNARK:
+        the circuit's public inputs, i.e. the proof count and the Merkle root over
+        per-proof digests, built leaf by leaf. `proof_keys` (e.g. SN2 task ids) let
+        digests of proofs seen in earlier tasks be reused.
+        """
+        keys = proof_keys if proof_keys is not None else [None] * len(base_proofs)
+        if len(keys) != len(base_proofs):
+            raise ValueError("Each base proof needs exactly one proof key")
+        builder = MerkleBuilder()
+        for p, key in zip(base_proofs, keys):
+            builder.append_digest(ZKEngine._leaf_digests.get(p, key))
+        return [str(len(base_proofs)), builder.root().hex()]
+
+
+class VerificationContext:
+    """
+    Per-query verification state, built once and shared by every response:
+    the prepared verifier, the linkage public inputs and the valid proof lengths.
+    """
+
+    def __init__(self, base_proofs: List[Union[str, bytes]], base_subnet_ids: List[int], depth: int, proof_keys: Optional[List[str]] = None):
+        import zk_bridge # Native module
+
+        self.depth = depth
+        # The VK is determined by the circuit shape the miner proved against.
+        self.vk = VKRegistry.get_composition_vk(len(base_proofs), depth)
+        self.vk_hash = hashlib.sha256(self.vk).hexdigest()
+        self.verifier = ZKEngine._get_verifier(self.vk, self.vk_hash)
+        # The circuit commits to the proof count and the data root linking the base proofs.
+        self.public_inputs = ZKEngine._extract_linkage(base_proofs, base_subnet_ids, proof_keys)
+        self.linkage = ",".join(self.public_inputs)
+        self.proof_sizes = frozenset(zk_bridge.proof_sizes())
+
+    @classmethod
+    def from_query(cls, query: dict) -> "VerificationContext":
+        return cls(
+            query.get("base_proofs", []),
+            query.get("base_subnet_ids", []),
+            query.get("depth", 1),
+            query.get("base_proof_keys"),
+        )
+
+    def accepts(self, proof) -> bool:
+        """
+        Cheap shape check: only binary proofs of a valid Groth16 length reach the pairing.
+        """
+        return isinstance(proof, BUFFER_TYPES) and memoryview(proof).nbytes in self.proof_sizes
+
+    def cache_key(self, serialized_proof) -> Tuple[str, str, str]:
+        return hashlib.sha256(serialized_proof).hexdigest(), self.linkage, self.vk_hash
+
+    def verify(self, serialized_proof) -> Tuple[bool, str]:
+        return self.verify_batch([serialized_proof])[0]
+
+    def verify_batch(self, serialized_proofs: List[Union[str, bytes]]) -> List[Tuple[bool, str]]:
+        """
+        Verifies proofs against this query, consulting the outcome cache first.
+        Identical proofs within the batch are checked once.
+        """
+        keys = [self.cache_key(p) if self.accepts(p) else None for p in serialized_proofs]
+        verdicts = {}
+        pending = {}
+        for key, p in zip(keys, serialized_proofs):
+            if key is None or key in verdicts or key in pending:
+                continue
+            is_valid = ZKEngine._lookup_verified(key)
+            if is_valid is None:
+                pending[key] = p
+            else:
+                verdicts[key] = is_valid
+
+        fresh = {}
+        if len(pending) == 1:
+            # A lone proof is cheaper through the plain pairing check than a batch of one.
+            # Unlike the batch, it raises on malformed bytes; that is one invalid proof,
+            # not a failure of every response to the query.
+            import zk_bridge # Native module
+
+            (key, p), = pending.items()
+            try:
+                fresh[key] = self.verifier.verify(p, self.public_inputs)
+            except zk_bridge.VerificationError:
+                fresh[key] = False
+        elif pending:
+            outcomes = self.verifier.verify_batch(list(pending.values()), [self.public_inputs] * len(pending))
+            fresh = dict(zip(pending, outcomes))
+        verdicts.update(fresh)
+        ZKEngine._record_verified(fresh, sum(key is not None for key in keys) - len(fresh))
+
+        return [
+            (True, "Native cryptographic verification passed") if key is not None and verdicts[key]
+            else (False, "Invalid proof signature")
+            for key in keys
+        ]